@@ -1,8 +1,29 @@
+import importlib
+
 from . import structures, loaders, plugins
-from .structures import StructuredDataFrame
-from .loaders import load_file, load_csv
+from .structures import StructuredDataFrame, StructuredCollection
+from .structures.structureddataframe import save_many
+from .loaders import load_file, load_files, load_csv
 
 __version__ = '0.1.4'
 
-plugins.import_structures()
-plugins.import_loaders()
+plugins.import_plugins()
+loaders.loaders.defer({".rdfa": [__name__ + ".archive"]})  # the archive module registers its own loader
+
+# submodules and functions imported on first access, to keep `import radie` light
+_lazy_submodules = ("archive", "watcher", "aio")
+_lazy_functions = {
+    "save_archive": "archive",
+    "append_archive": "archive",
+    "load_archive": "archive",
+    "aload_file": "aio",
+    "aload_files": "aio",
+}
+
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        return importlib.import_module("." + name, __name__)
+    elif name in _lazy_functions:
+        return getattr(importlib.import_module("." + _lazy_functions[name], __name__), name)
+    raise AttributeError("module {:s} has no attribute {:s}".format(__name__, name))
@@ -0,0 +1,25 @@
+"""command line entry point, `python -m radie <command> [options]` or `radie <command> [options]` when installed"""
+import sys
+
+commands = ("convert", "benchmark")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] not in commands:
+        print("usage: radie {{{:s}}} ... (use radie <command> --help for details)".format(",".join(commands)),
+              file=sys.stderr)
+        return 2
+
+    import radie  # imports the plugins
+
+    command, argv = argv[0], argv[1:]
+    if command == "convert":
+        from radie.convert import main as command_main
+    else:
+        from radie.benchmarks.runner import main as command_main
+    return command_main(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""asyncio coroutines around `radie.loaders.load_file`, for services that must not block their event loop
+
+The loader plugins read and parse a file in one call, so a file is loaded in an executor and the event loop only
+awaits the result.  Lazy loads, which only read the file header, and the data of deferred StructuredDataFrames go to a
+thread pool for file reads.  Full loads go to the parse executor, by default the same thread pool, which can be
+replaced with a `concurrent.futures.ProcessPoolExecutor` by `set_parse_executor` so that the cpu-bound parsers run
+outside of the GIL.
+
+Cancelling a coroutine cancels its load if it has not started yet.  A load that is already running in a worker is
+not interrupted, its result is discarded.
+"""
+import os
+import asyncio
+import functools
+import threading
+from collections import OrderedDict
+from concurrent import futures
+
+from . import loaders
+from .structures.structureddataframe import StructuredDataFrame
+
+DEFAULT_CONCURRENCY = 8
+io_workers = min(32, (os.cpu_count() or 1) + 4)
+
+_io_executor = None  # type: futures.ThreadPoolExecutor
+_parse_executor = None  # type: futures.Executor
+_executors_lock = threading.Lock()
+
+
+def io_executor():
+    """the thread pool used for file reads, created on first use with `io_workers` threads"""
+    global _io_executor
+    with _executors_lock:
+        if _io_executor is None:
+            _io_executor = futures.ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="radie-io")
+        return _io_executor
+
+
+def parse_executor():
+    """the executor used for full loads, by default the `io_executor`"""
+    return _parse_executor if _parse_executor is not None else io_executor()
+
+
+def set_parse_executor(executor):
+    """
+    set the executor used for full loads
+
+    Parameters
+    ----------
+    executor : concurrent.futures.Executor or None
+        e.g. a ProcessPoolExecutor for the cpu-bound parsers.  None goes back to the `io_executor`.  The previous
+        executor is not shut down
+
+    """
+    global _parse_executor
+    with _executors_lock:
+        _parse_executor = executor
+
+
+async def aload_file(fname, lazy=False, executor=None, limit=None):
+    """
+    load a data-file without blocking the event loop, see `radie.loaders.load_file`
+
+    Parameters
+    ----------
+    fname : str
+    lazy : bool
+        only read the metadata, in the `io_executor`.  The data of the deferred StructuredDataFrames is read on first
+        access, which blocks, so use `aload_data` to read it in the background
+    executor : concurrent.futures.Executor, optional
+        overrides the `parse_executor` of full loads
+    limit : asyncio.Semaphore, optional
+        held while the file is loaded, to limit the number of concurrent loads
+
+    Returns
+    -------
+    StructuredDataFrame or list
+
+    """
+    if limit is not None:
+        async with limit:
+            return await aload_file(fname, lazy, executor)
+
+    loop = asyncio.get_running_loop()
+    if lazy:
+        executor = io_executor()
+    elif executor is None:
+        executor = parse_executor()
+    return await loop.run_in_executor(executor, functools.partial(loaders.load_file, fname, lazy=lazy))
+
+
+async def aload_data(dfs):
+    """read the data of deferred StructuredDataFrames, from `aload_file(..., lazy=True)`, in the `io_executor`
+
+    Parameters
+    ----------
+    dfs : StructuredDataFrame or list of StructuredDataFrame
+
+    Returns
+    -------
+    StructuredDataFrame or list
+        the same objects, now holding their data
+
+    """
+    deferred = [dfs] if isinstance(dfs, StructuredDataFrame) else list(dfs)
+    deferred = [df for df in deferred if df.is_deferred]
+    if deferred:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(io_executor(), df._load_deferred) for df in deferred))
+    return dfs
+
+
+async def aiter_files(paths_or_globs, lazy=False, concurrency=DEFAULT_CONCURRENCY, executor=None):
+    """
+    load many data-files concurrently, yielding each as soon as it is loaded
+
+    Parameters
+    ----------
+    paths_or_globs : str or Path or list
+        filenames and/or glob patterns, see `radie.loaders.expand_paths`
+    lazy : bool
+    concurrency : int
+        the maximum number of files loading at the same time
+    executor : concurrent.futures.Executor, optional
+
+    Yields
+    ------
+    fname : str
+    result : StructuredDataFrame or list or None
+    error : Exception or None
+
+    """
+    async for loaded in _iter_loads(loaders.expand_paths(paths_or_globs), lazy, concurrency, executor):
+        yield loaded
+
+
+async def _iter_loads(fnames, lazy, concurrency, executor):
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def load(fname):
+        try:
+            return fname, await aload_file(fname, lazy, executor, limit), None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return fname, None, e
+
+    tasks = [asyncio.ensure_future(load(fname)) for fname in fnames]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:  # closing or cancelling the consumer cancels the remaining loads
+            task.cancel()
+
+
+async def aload_files(paths_or_globs, lazy=False, concurrency=DEFAULT_CONCURRENCY, executor=None):
+    """
+    load many data-files concurrently, the coroutine version of `radie.loaders.load_files`
+
+    Parameters
+    ----------
+    paths_or_globs : str or Path or list
+        filenames and/or glob patterns, see `radie.loaders.expand_paths`
+    lazy : bool
+    concurrency : int
+        the maximum number of files loading at the same time
+    executor : concurrent.futures.Executor, optional
+        overrides the `parse_executor` of full loads
+
+    Returns
+    -------
+    dfs : list of StructuredDataFrame
+        the loaded StructuredDataFrames, in order of the input files
+    errors : OrderedDict
+        filename: exception pairs for each file that could not be loaded
+
+    """
+    fnames = loaders.expand_paths(paths_or_globs)
+    results = dict()
+    async for fname, result, error in _iter_loads(fnames, lazy, concurrency, executor):
+        results[fname] = (result, error)
+
+    dfs = []
+    errors = OrderedDict()
+    for fname in fnames:
+        result, error = results[fname]
+        if error is not None:
+            errors[fname] = error
+        elif isinstance(result, StructuredDataFrame):
+            dfs.append(result)
+        else:
+            dfs.extend(result)
+    return dfs, errors
@@ -0,0 +1,384 @@
+"""single-file archives holding many StructuredDataFrames of mixed classes
+
+An archive (.rdfa) is a sequence of binary records in the format of `StructuredDataFrame.save_binary`, followed by a
+json index of the records and a fixed size trailer:
+
+    ARCHIVE_MAGIC, padded to RDF_ALIGNMENT bytes
+    record 0, record 1, ... each starting on a multiple of RDF_ALIGNMENT bytes
+    json index
+    trailer: index offset (<Q), index length (<Q), ARCHIVE_MAGIC
+
+The index lists the class, name, date, uuid, byte offset and number of rows of every record, so a single dataset can
+be found and memory-mapped without reading the others.  Appending adds a segment of the same form after the trailer:
+the new records, an index of only the new records that also holds the location of the previous index, and a new
+trailer, written last.  Nothing that is already in the file is overwritten, so the archive stays readable from its
+previous trailer until an append is complete, and reading an archive whose last append was cut short, e.g. by a crash
+or a full disk, falls back on the last complete trailer.  The records are converted to a temporary file before the
+archive is opened for writing, so a dataset that cannot be saved leaves an existing archive untouched.
+"""
+import os
+import json
+import uuid
+import shutil
+import struct
+import tempfile
+import warnings
+from collections import OrderedDict
+
+from . import exceptions
+from . import loaders
+from .structures.structureddataframe import StructuredDataFrame, rdf_align
+
+ARCHIVE_MAGIC = b"RADIEARC"
+ARCHIVE_EXTENSION = ".rdfa"
+TRAILER_SIZE = 16 + len(ARCHIVE_MAGIC)
+RECOVERY_BLOCK = 2 ** 20  # bytes read at a time when searching backwards for a complete trailer
+
+
+def _as_list(dfs):
+    if isinstance(dfs, StructuredDataFrame):
+        return [dfs]
+    dfs = list(dfs)
+    if not all(isinstance(df, StructuredDataFrame) for df in dfs):
+        raise TypeError("archives can only hold StructuredDataFrame objects")
+    return dfs
+
+
+def _read_trailer(fid, end):
+    """the (index offset, index length) of the trailer ending at byte offset `end`, None if there is no complete
+    trailer and index there"""
+    if end < rdf_align(len(ARCHIVE_MAGIC)) + TRAILER_SIZE:
+        return None
+    fid.seek(end - TRAILER_SIZE)
+    trailer = fid.read(TRAILER_SIZE)
+    if trailer[16:] != ARCHIVE_MAGIC:
+        return None
+    index_offset, index_length = struct.unpack("<QQ", trailer[:16])
+    if index_offset + index_length != end - TRAILER_SIZE:
+        return None
+    return index_offset, index_length
+
+
+def _recover_trailer(fid, end):
+    """search backwards from `end` for the last complete trailer, followed by an append that was cut short
+
+    Returns
+    -------
+    end : int
+        the byte offset just after the trailer
+    location : (int, int)
+        the offset and length of its index
+
+    """
+    minimum = rdf_align(len(ARCHIVE_MAGIC)) + TRAILER_SIZE
+    block_end = end
+    while block_end > minimum:
+        block_start = max(block_end - RECOVERY_BLOCK, 0)
+        fid.seek(block_start)
+        block = fid.read(block_end - block_start)
+        position = len(block)
+        while True:
+            position = block.rfind(ARCHIVE_MAGIC, 0, position)
+            if position < 0:
+                break
+            trailer_end = block_start + position + len(ARCHIVE_MAGIC)
+            location = _read_trailer(fid, trailer_end)
+            if location is not None and _read_index_segment(fid, location) is not None:
+                return trailer_end, location
+            position += len(ARCHIVE_MAGIC) - 1  # continue with the magics starting before this one
+        block_end = block_start + len(ARCHIVE_MAGIC) - 1  # a magic split over two blocks
+        if block_start == 0:
+            break
+    raise exceptions.LoaderException("archive trailer is corrupt, the file may have been truncated")
+
+
+def _read_index_segment(fid, location):
+    """the json index at an (offset, length) location, None if it is not a valid index"""
+    index_offset, index_length = location
+    fid.seek(index_offset)
+    try:
+        index = json.loads(fid.read(index_length).decode("utf-8"), object_pairs_hook=OrderedDict)
+    except ValueError:
+        return None
+    if not isinstance(index, dict) or "entries" not in index:
+        return None
+    return index
+
+
+def _archive_tail(fid):
+    """the end of the last complete segment of an open archive and the location of its index
+
+    Returns
+    -------
+    end : int
+        the byte offset just after the last complete trailer, where the next segment is written when appending
+    location : (int, int)
+        the offset and length of the last index
+
+    """
+    fid.seek(0, os.SEEK_END)
+    end = fid.tell()
+    if end < rdf_align(len(ARCHIVE_MAGIC)) + TRAILER_SIZE:
+        raise exceptions.IncorrectFileType("file is too short to be a radie archive")
+    fid.seek(0)
+    if fid.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC:
+        raise exceptions.IncorrectFileType("file does not start with the archive signature")
+
+    location = _read_trailer(fid, end)
+    if location is None:
+        end, location = _recover_trailer(fid, end)
+        warnings.warn("{:s}: ignoring an incomplete append at the end of the archive".format(
+            getattr(fid, "name", "archive")))
+    return end, location
+
+
+def _read_index(fid):
+    """read the index of an open archive, following the chain of index segments from the last one
+
+    Returns
+    -------
+    entries : list of OrderedDict
+    end : int
+        the byte offset just after the last complete trailer
+
+    """
+    end, location = _archive_tail(fid)
+    segments = []
+    while location is not None:
+        index = _read_index_segment(fid, location)
+        if index is None:
+            raise exceptions.LoaderException("archive index is corrupt")
+        segments.append(index["entries"])
+        location = index.get("previous")
+    entries = []
+    for segment in reversed(segments):
+        entries.extend(segment)
+    return entries, end
+
+
+def _convert_records(dfs):
+    """convert every dataset to its record in a temporary file, before anything is written to the archive
+
+    Returns
+    -------
+    records : tempfile.TemporaryFile
+        the records, each starting on a multiple of RDF_ALIGNMENT bytes
+    entries : list of OrderedDict
+        the index entries of the records, with offsets into `records`
+
+    """
+    records = tempfile.TemporaryFile()
+    entries = []
+    try:
+        for df in dfs:  # type: StructuredDataFrame
+            records.write(b"\x00" * (rdf_align(records.tell()) - records.tell()))
+            entry = OrderedDict()
+            entry["class"] = df.__class__.__name__
+            entry["name"] = df.metadata.get("name")
+            entry["date"] = df.metadata.get("date")
+            entry["uuid"] = df.uuid or str(uuid.uuid1())  # without setting a uuid on the caller's dataset
+            entry["offset"] = records.tell()
+            entry["rows"] = len(df)
+            df.write_binary(records)
+            entries.append(entry)
+    except Exception:
+        records.close()
+        raise
+    return records, entries
+
+
+def _write_records(fid, records, entries, previous=None):
+    """copy converted records into the archive at the current position of the file, followed by their index and the
+    trailer.  The records and index are flushed to disk before the trailer is written
+
+    Parameters
+    ----------
+    fid : io.BufferedIOBase
+    records : tempfile.TemporaryFile
+    entries : list of OrderedDict
+        the entries of the records, from `_convert_records`
+    previous : (int, int), optional
+        the location of the previous index when appending
+
+    """
+    start = rdf_align(fid.tell())
+    fid.write(b"\x00" * (start - fid.tell()))
+    for entry in entries:
+        entry["offset"] += start
+    records.seek(0)
+    shutil.copyfileobj(records, fid)
+
+    index = OrderedDict((("file-type", "Radie archive version1"), ("entries", entries)))
+    if previous is not None:
+        index["previous"] = list(previous)
+    index_bytes = json.dumps(index).encode("utf-8")
+    index_offset = fid.tell()
+    fid.write(index_bytes)
+    fid.flush()
+    os.fsync(fid.fileno())
+    fid.write(struct.pack("<QQ", index_offset, len(index_bytes)))
+    fid.write(ARCHIVE_MAGIC)
+    fid.truncate()
+
+
+def save_archive(dfs, filename, overwrite=False):
+    """
+    save many StructuredDataFrames, of any class, to a single archive file
+
+    Parameters
+    ----------
+    dfs : StructuredDataFrame or iterable of StructuredDataFrame
+    filename : str
+    overwrite : bool
+
+    """
+    if not filename.endswith(ARCHIVE_EXTENSION):
+        filename += ARCHIVE_EXTENSION
+
+    if os.path.isfile(filename) and overwrite is not True:
+        raise FileExistsError(
+            "You must specify overwrite to be True to overwrite the file")
+
+    records, entries = _convert_records(_as_list(dfs))
+    with records, open(filename, "wb") as fid:
+        fid.write(ARCHIVE_MAGIC)
+        _write_records(fid, records, entries)
+
+
+def append_archive(dfs, filename):
+    """
+    add StructuredDataFrames to the end of an archive, creating it if necessary.  Nothing in an existing archive is
+    rewritten, see the module docstring
+
+    Parameters
+    ----------
+    dfs : StructuredDataFrame or iterable of StructuredDataFrame
+    filename : str
+
+    """
+    if not filename.endswith(ARCHIVE_EXTENSION):
+        filename += ARCHIVE_EXTENSION
+
+    if not os.path.isfile(filename):
+        save_archive(dfs, filename)
+        return
+
+    records, entries = _convert_records(_as_list(dfs))
+    with records, open(filename, "r+b") as fid:
+        end, location = _archive_tail(fid)
+        fid.seek(end)
+        try:
+            _write_records(fid, records, entries, location)
+        except BaseException:
+            fid.truncate(end)  # drop the partial segment, the previous trailer is last again
+            raise
+
+
+def read_index(filename):
+    """
+    read the index of an archive without reading any of the datasets
+
+    Parameters
+    ----------
+    filename : str
+
+    Returns
+    -------
+    list of OrderedDict
+        one entry per dataset with the keys class, name, date, uuid, offset and rows
+
+    """
+    with open(filename, "rb") as fid:
+        entries, end = _read_index(fid)
+    return entries
+
+
+def select_entries(entries, select=None):
+    """
+    pick index entries by position, name, uuid or an arbitrary test
+
+    Parameters
+    ----------
+    entries : list of OrderedDict
+        the output of `read_index`
+    select : int, str, callable or iterable of int and str, optional
+        integers are positions in the archive, strings match either the name or the uuid of a dataset, and a callable
+        is called with each index entry and should return True for the entries to keep.  None selects everything
+
+    Returns
+    -------
+    list of OrderedDict
+
+    """
+    if select is None:
+        return list(entries)
+    elif callable(select):
+        return [entry for entry in entries if select(entry)]
+    elif isinstance(select, (int, str)):
+        select = [select]
+
+    selected = []
+    for key in select:
+        if isinstance(key, int):
+            selected.append(entries[key])
+        else:
+            matches = [entry for entry in entries if key in (entry["name"], entry["uuid"])]
+            if not matches:
+                raise KeyError("no dataset named {:s} in the archive".format(key))
+            selected.extend(matches)
+    return selected
+
+
+def load_archive(filename, select=None, mmap=True):
+    """
+    load datasets from an archive
+
+    Parameters
+    ----------
+    filename : str
+    select : int, str, callable or iterable of int and str, optional
+        the datasets to load, see `select_entries`.  By default all datasets are loaded
+    mmap : bool
+        memory-map the column arrays, see `radie.loaders.load_rdf`
+
+    Returns
+    -------
+    list of StructuredDataFrame
+
+    """
+    dfs = []
+    with open(filename, "rb") as fid:
+        entries, end = _read_index(fid)
+        for entry in select_entries(entries, select):
+            fid.seek(entry["offset"])
+            dfs.append(loaders.read_rdf_record(fid, filename, mmap))
+    return dfs
+
+
+def load_archive_metadata(filename):
+    """read the metadata of every dataset in an archive, reading only the header of each record
+
+    Returns
+    -------
+    list of dict
+
+    """
+    metadata = []
+    with open(filename, "rb") as fid:
+        entries, end = _read_index(fid)
+        for entry in entries:
+            fid.seek(entry["offset"])
+            cls, header, data_start = loaders.read_rdf_header(fid)
+            meta_data = header["metadata"]
+            meta_data["class"] = cls.__name__
+            metadata.append(meta_data)
+    return metadata
+
+
+def probe_archive(head_bytes):
+    return head_bytes.startswith(ARCHIVE_MAGIC)
+
+
+archive_loader = loaders.Loader(load_archive, StructuredDataFrame, [ARCHIVE_EXTENSION], "radie archive",
+                                probe=probe_archive, metadata_function=load_archive_metadata)
+loaders.register_loaders(archive_loader)
@@ -0,0 +1,8 @@
+"""benchmarks of the loaders on deterministic synthetic files of every supported format
+
+Run from the command line with `python -m radie.benchmarks`, use `--output` to store results and `--baseline` to
+compare a later run against them.
+"""
+from . import generators
+from .generators import generate
+from .runner import run, benchmark_file, compare, save_results, load_results
@@ -0,0 +1,6 @@
+import sys
+
+import radie
+from radie.benchmarks.runner import main
+
+sys.exit(main())
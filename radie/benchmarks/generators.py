@@ -0,0 +1,309 @@
+"""deterministic synthetic data-files for each supported format, at any number of points
+
+Every generator has the signature `write_<format>(fname, n_points, seed=0)` and writes the same file for the same
+arguments.  The files follow the layouts that the loader plugins expect, with realistic header sizes, so that loading
+them exercises the same code paths as instrument output.
+"""
+import struct
+from collections import OrderedDict
+
+import numpy as np
+
+from ..plugins.loaders.psd_LA960 import STARTING_LINES as LA960_STARTING_LINES
+
+
+def diffraction_pattern(n_points, seed=0, start=10., step=0.02):
+    """a powder diffraction pattern of a few gaussian peaks over a decaying background
+
+    Returns
+    -------
+    twotheta : np.ndarray
+    intensity : np.ndarray
+        integer counts
+    """
+    rng = np.random.RandomState(seed)
+    twotheta = start + step * np.arange(n_points)
+    intensity = 200. * np.exp(-(twotheta - start) / 40.) + 20.
+    span = max(twotheta[-1] - start, step)
+    for position in start + span * rng.uniform(0.05, 0.95, size=8):
+        intensity += rng.uniform(500., 5000.) * np.exp(-0.5 * ((twotheta - position) / 0.05) ** 2)
+    return twotheta, rng.poisson(intensity).astype(float)
+
+
+def thermal_curve(n_points, seed=0):
+    """time (min), temperature (C) and a decaying weight (mg) for a 10 C/min ramp, plus a noisy heat flow (mW)"""
+    rng = np.random.RandomState(seed)
+    time = np.linspace(0., 60., n_points)
+    temperature = 25. + 10. * time + rng.normal(0., 0.05, n_points)
+    weight = 5. + 5. / (1. + np.exp((temperature - 400.) / 30.)) + rng.normal(0., 1e-4, n_points)
+    heat_flow = -0.5 + 0.1 * np.sin(time / 5.) + rng.normal(0., 1e-3, n_points)
+    return time, temperature, weight, heat_flow
+
+
+def write_rigaku_ras(fname, n_points, seed=0):
+    start, step = 10., 0.02
+    twotheta, intensity = diffraction_pattern(n_points, seed, start, step)
+    header = [
+        "*RAS_DATA_START",
+        "*RAS_HEADER_START",
+        '*FILE_COMMENT ""',
+        '*FILE_MD5 "0"',
+        '*FILE_SAMPLE "benchmark-{:d}"'.format(seed),
+        '*HW_XG_TARGET_NAME "Cu"',
+        '*HW_XG_WAVE_LENGTH_ALPHA1 "1.540593"',
+        '*HW_XG_WAVE_LENGTH_ALPHA2 "1.544414"',
+        '*HW_XG_WAVE_LENGTH_BETA "1.392250"',
+        '*MEAS_SCAN_AXIS_X "TwoThetaTheta"',
+        '*MEAS_SCAN_MODE "CONTINUOUS"',
+        '*MEAS_SCAN_SPEED "10.0"',
+        '*MEAS_SCAN_START "{:.4f}"'.format(start),
+        '*MEAS_SCAN_STEP "{:.4f}"'.format(step),
+        '*MEAS_SCAN_STOP "{:.4f}"'.format(twotheta[-1]),
+    ]
+    header += ['*MEAS_COND_AXIS_NAME-{:d} "Axis{:d}"'.format(i, i) for i in range(60)]  # typical header length
+    header += ["*RAS_HEADER_END", "*RAS_INT_START"]
+    data = ["{:.4f} {:.0f} 1.0000".format(x, y) for x, y in zip(twotheta, intensity)]
+    footer = ["*RAS_INT_END", "*RAS_DATA_END"]
+    with open(fname, "wb") as fid:
+        fid.write("\r\n".join(header + data + footer).encode("ascii") + b"\r\n")
+
+
+def write_rigaku_asc(fname, n_points, seed=0):
+    twotheta, intensity = diffraction_pattern(n_points, seed)
+    lines = ["*FILLER = {:d}".format(i) for i in range(78)]
+    lines[0] = "*TYPE = Raw"
+    lines[2] = "*SAMPLE = benchmark-{:d}".format(seed)
+    lines[8] = "*GONIO = Benchmark"
+    lines[23] = "*WAVE_LENGTH1 = 1.54059"
+    lines[24] = "*WAVE_LENGTH2 = 1.54441"
+    lines[41] = "*BEGIN"
+    lines[43] = "*START = {:.4f}".format(twotheta[0])
+    lines[44] = "*STOP = {:.4f}".format(twotheta[-1])
+    lines[77] = "*COUNT = {:d}".format(n_points)
+    for i in range(0, n_points, 4):
+        lines.append(", ".join("{:.0f}".format(y) for y in intensity[i:i + 4]))
+    lines.append("*END")
+    with open(fname, "w") as fid:
+        fid.write("\n".join(lines) + "\n")
+
+
+def write_bruker_raw(fname, n_points, seed=0, ranges=1):
+    """a Bruker RAW version 1.01 file with `ranges` ranges of n_points each"""
+    header = bytearray(712)
+    header[0:7] = b"RAW1.01"
+    struct.pack_into("<ii", header, 8, 1, ranges)  # file status done
+    header[16:24] = b"10/17/26"
+    header[26:34] = b"07:00:00"
+    sample = "benchmark-{:d}".format(seed).encode("ascii")
+    header[326:326 + len(sample)] = sample
+    header[608:610] = b"Cu"
+    struct.pack_into("<ddddd", header, 616, 1.54187, 1.54060, 1.54443, 1.39225, 0.5)
+
+    with open(fname, "wb") as fid:
+        fid.write(header)
+        for i in range(ranges):
+            twotheta, intensity = diffraction_pattern(n_points, seed + i)
+            range_header = bytearray(304)
+            struct.pack_into("<iidd", range_header, 0, 304, n_points, twotheta[0] / 2, twotheta[0])
+            struct.pack_into("<d", range_header, 176, twotheta[1] - twotheta[0])
+            struct.pack_into("<d", range_header, 240, 1.54060)
+            fid.write(range_header)
+            fid.write(intensity.astype("<f4").tobytes())
+
+
+def write_bruker_raw_multi(fname, n_points, seed=0):
+    write_bruker_raw(fname, n_points, seed, ranges=4)
+
+
+def write_ta_instruments(fname, n_points, seed=0, instrument="TGA Q500"):
+    """a TA Instruments file: a utf-16 header, terminated by \\x0c, and float32 records of each signal"""
+    time, temperature, weight, heat_flow = thermal_curve(n_points, seed)
+    if instrument.startswith("TGA"):
+        signals = [("Time (min)", time), ("Temperature (\xb0C)", temperature), ("Weight (mg)", weight)]
+    else:
+        signals = [("Time (min)", time), ("Temperature (\xb0C)", temperature), ("Heat Flow (mW)", heat_flow)]
+
+    header = [
+        "Filed",
+        "VERSION 2.0",
+        "Language English",
+        "Instrument {:s} V20.13 Build 39".format(instrument),
+        "Module {:s}".format(instrument.split()[0]),
+        "Sample benchmark-{:d}".format(seed),
+        "Size 5.4350 mg",
+        "Method Ramp",
+        "Nsig {:d}".format(len(signals)),
+    ]
+    header += ["Sig{:d} {:s}".format(i + 1, label) for i, (label, values) in enumerate(signals)]
+    header += ["Date 2026-10-17", "Time 07:00:00", "OrgMethod 1: Ramp 10.00 \xb0C/min to 600.00 \xb0C", ""]
+
+    data = np.column_stack([values for label, values in signals]).astype("<f4")
+    with open(fname, "wb") as fid:
+        fid.write("\r\n".join(header).encode("utf-16"))
+        fid.write(b"\x0c\x00\x05")
+        fid.write(data.tobytes())
+        fid.write(np.array([-100.] * len(signals), dtype="<f4").tobytes())
+
+
+def write_ta_q500(fname, n_points, seed=0):
+    write_ta_instruments(fname, n_points, seed, "TGA Q500")
+
+
+def write_ta_q2000(fname, n_points, seed=0):
+    write_ta_instruments(fname, n_points, seed, "DSC Q2000")
+
+
+def write_la960_csv(fname, n_points, seed=0):
+    rng = np.random.RandomState(seed)
+    diameter = np.logspace(-2, 3.5, n_points)
+    frequency = np.exp(-0.5 * ((np.log(diameter) - rng.uniform(0., 3.)) / 0.6) ** 2)
+    frequency *= 100. / frequency.sum()
+
+    lines = ["{:s},{:.4f}".format(key, rng.uniform(1., 50.)) for key in LA960_STARTING_LINES]
+    lines += ["Sample Name,benchmark-{:d}".format(seed), "Lot Number,{:d}".format(seed), "Diameter (\xb5m),q(%)"]
+    lines += ["{:.6g},{:.6g}".format(d, f) for d, f in zip(diameter, frequency)]
+    lines += ["", ""]
+    with open(fname, "w") as fid:
+        fid.write("\n".join(lines) + "\n")
+
+
+def gsas_header(seed, bank):
+    return [
+        "benchmark-{:d} GSAS file".format(seed),
+        "# Calibrated wavelength = 0.414581",
+        "# User sample name = benchmark-{:d}".format(seed),
+        "# Temperature = 295.0",
+        bank,
+    ]
+
+
+def write_gsas_fxye(fname, n_points, seed=0):
+    twotheta, intensity = diffraction_pattern(n_points, seed, 1., 0.001)
+    bank = "BANK 1 {:d} {:d} CONS {:.2f} {:.2f} 0 0 FXYE".format(n_points, n_points, 100., 0.1)
+    lines = gsas_header(seed, bank)
+    lines += ["{:.3f} {:.2f} {:.4f}".format(x * 100, y, np.sqrt(y + 1.)) for x, y in zip(twotheta, intensity)]
+    with open(fname, "w") as fid:
+        fid.write("\n".join(lines) + "\n")
+
+
+def write_gsas_raw(fname, n_points, seed=0):
+    twotheta, intensity = diffraction_pattern(n_points, seed, 1., 0.001)
+    records = -(-n_points // 5)
+    bank = "BANK 1 {:d} {:d} CONST {:.2f} {:.2f} 0 0 STD".format(n_points, records, 100., 0.1)
+    lines = gsas_header(seed, bank)
+    pairs = ["{:8.0f}{:8.0f}".format(y, np.sqrt(y + 1.)) for y in intensity]
+    lines += ["".join(pairs[i:i + 5]) for i in range(0, n_points, 5)]
+    with open(fname, "w") as fid:
+        fid.write("\n".join(lines) + "\n")
+
+
+def hysteresis_loop(n_points, seed=0):
+    rng = np.random.RandomState(seed)
+    field = 10000. * np.sin(np.linspace(0., 2. * np.pi, n_points))
+    moment = 0.05 * np.tanh((field + 500. * np.sign(np.gradient(field))) / 2000.)
+    return field, moment + rng.normal(0., 1e-5, n_points)
+
+
+def write_lakeshore_dat(fname, n_points, seed=0):
+    field, moment = hysteresis_loop(n_points, seed)
+    lines = ["Lakeshore IDEAs VSM", "Sample ID: benchmark-{:d}".format(seed)]
+    lines += ["Setting{:d}: {:d}".format(i, i) for i in range(40)]
+    lines += ["**** Experiment Data ****", "Segments 2", "Points {:d}".format(n_points), "Field Data"]
+    lines += ["{:.6g}".format(x) for x in field]
+    lines += ["MomentX Data"]
+    lines += ["{:.6g}".format(y) for y in moment]
+    lines += ["End of Data", "**** Results ****", "Ms 0.05"]
+    with open(fname, "w") as fid:
+        fid.write("\n".join(lines) + "\n")
+
+
+def write_lakeshore_txt(fname, n_points, seed=0):
+    field, moment = hysteresis_loop(n_points, seed)
+    lines = [
+        "Start Time: 10/17/2026 07:00:00",
+        "Sample ID: benchmark-{:d}".format(seed),
+        "",
+        "Experiment: Hysteresis",
+        "Data File: benchmark.dat",
+        "Operator: benchmark",
+        "",
+        "Mass: 1.0",
+        "Density: 1.0",
+        "***DATA***",
+        "",
+        "Field(G)\t Moment(emu)",
+    ]
+    lines += ["{:.6g}\t {:.6g}".format(x, y) for x, y in zip(field, moment)]
+    with open(fname, "w") as fid:
+        fid.write("\n".join(lines) + "\n")
+
+
+def benchmark_dataframe(n_points, seed=0):
+    from ..plugins.structures.powderdiffraction import PowderDiffraction
+    twotheta, intensity = diffraction_pattern(n_points, seed)
+    return PowderDiffraction(data=np.column_stack((twotheta, intensity)), columns=["twotheta", "intensity"],
+                             name="benchmark-{:d}".format(seed), wavelength=1.54187)
+
+
+def write_dftxt(fname, n_points, seed=0):
+    benchmark_dataframe(n_points, seed).savetxt(fname, overwrite=True)
+
+
+def write_rdf(fname, n_points, seed=0):
+    benchmark_dataframe(n_points, seed).save_binary(fname, overwrite=True)
+
+
+def write_csv_preamble(fname, n_points, seed=0):
+    """a generic csv file with an instrument preamble of key, value lines above a 4 column datablock"""
+    rng = np.random.RandomState(seed)
+    lines = ["Instrument,Benchmark", "Sample,benchmark-{:d}".format(seed), "Operator,benchmark"]
+    lines += ["Parameter {:d},{:.4f}".format(i, rng.uniform()) for i in range(25)]
+    lines += ["", "time,temperature,pressure,flow"]
+    data = np.column_stack((np.arange(n_points) * 0.5, rng.normal(25., 1., (n_points, 3))))
+    lines += ["{:.1f},{:.5f},{:.5f},{:.5f}".format(*row) for row in data]
+    with open(fname, "w") as fid:
+        fid.write("\n".join(lines) + "\n")
+
+
+# format name: (file extension, generator function)
+generators = OrderedDict((
+    ("rigaku_ras", (".ras", write_rigaku_ras)),
+    ("rigaku_asc", (".asc", write_rigaku_asc)),
+    ("bruker_raw", (".raw", write_bruker_raw)),
+    ("bruker_raw_multi", (".raw", write_bruker_raw_multi)),
+    ("ta_q500", (".001", write_ta_q500)),
+    ("ta_q2000", (".001", write_ta_q2000)),
+    ("la960_csv", (".csv", write_la960_csv)),
+    ("gsas_fxye", (".fxye", write_gsas_fxye)),
+    ("gsas_raw", (".gsas", write_gsas_raw)),
+    ("lakeshore_dat", (".dat", write_lakeshore_dat)),
+    ("lakeshore_txt", (".txt", write_lakeshore_txt)),
+    ("dftxt", (".df", write_dftxt)),
+    ("rdf", (".rdf", write_rdf)),
+    ("csv_preamble", (".csv", write_csv_preamble)),
+))
+
+
+def generate(format_name, fname_base, n_points, seed=0):
+    """
+    write a synthetic file of a given format
+
+    Parameters
+    ----------
+    format_name : str
+        a key of `generators`
+    fname_base : str
+        the path of the file without extension
+    n_points : int
+    seed : int
+
+    Returns
+    -------
+    str
+        the filename, with the extension of the format
+
+    """
+    extension, generator = generators[format_name]
+    fname = fname_base + extension
+    generator(fname, n_points, seed)
+    return fname
@@ -0,0 +1,297 @@
+"""time `load_file` and the individual loaders on the synthetic files of `radie.benchmarks.generators`"""
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import tracemalloc
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .. import exceptions, loaders, util
+from ..structures.structureddataframe import StructuredDataFrame
+from . import generators
+
+FORMAT_VERSION = 1
+KEY_FIELDS = ("format", "points", "target")  # identify the same measurement in two result sets
+
+
+def drop_file_cache(fname):
+    """ask the operating system to evict a file from the page cache, so that the next read comes from disk.  Only
+    supported where os.posix_fadvise is available, elsewhere "cold" timings include the page cache"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(fname, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def count_rows(result):
+    if isinstance(result, StructuredDataFrame):
+        return len(result)
+    return sum(len(df) for df in result)
+
+
+def measure(function, fname, repeat=5):
+    """
+    time a load function on a file, once cold and `repeat` times warm, and measure its peak memory
+
+    Parameters
+    ----------
+    function : function
+        accepts the filename
+    fname : str
+    repeat : int
+
+    Returns
+    -------
+    OrderedDict
+        cold, warm_median and warm_min times in seconds, peak_memory in bytes of a separate traced call, rows loaded
+
+    """
+    drop_file_cache(fname)
+    start = time.perf_counter()
+    result = function(fname)
+    cold = time.perf_counter() - start
+
+    warm = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(fname)
+        warm.append(time.perf_counter() - start)
+
+    # traced separately, tracemalloc slows down allocations
+    tracemalloc.start()
+    try:
+        function(fname)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return OrderedDict((
+        ("cold", cold),
+        ("warm_median", float(np.median(warm)) if warm else cold),
+        ("warm_min", min(warm) if warm else cold),
+        ("peak_memory", peak),
+        ("rows", count_rows(result)),
+    ))
+
+
+def targets(fname):
+    """the functions to benchmark for a file: `load_file` and each registered loader that does not reject its head
+
+    Returns
+    -------
+    list of (str, function) tuples
+
+    """
+    candidates = loaders.loaders.get(os.path.splitext(fname)[1], [])
+    candidates = loaders.rank_loaders(candidates, loaders.read_head(fname))
+    if not candidates:
+        candidates = [loaders.csv_loader]
+    return [("load_file", loaders.load_file)] + [(loader.label, loader.load) for loader in candidates]
+
+
+def benchmark_file(format_name, fname, points, repeat=5):
+    """
+    benchmark `load_file` and the candidate loaders of a file
+
+    Returns
+    -------
+    list of OrderedDict
+        one record per target, with the outcome "success", "rejected" or "failed"
+
+    """
+    records = []
+    for target, function in targets(fname):
+        record = OrderedDict((
+            ("format", format_name), ("points", points), ("bytes", os.path.getsize(fname)), ("target", target),
+        ))
+        try:
+            record.update(measure(function, fname, repeat))
+            record["outcome"] = "success"
+        except exceptions.IncorrectFileType:
+            record["outcome"] = "rejected"
+        except Exception as e:
+            record["outcome"] = "failed"
+            record["error"] = "{:s}: {:s}".format(type(e).__name__, str(e).splitlines()[0] if str(e) else "")
+        records.append(record)
+    return records
+
+
+def run(formats=None, sizes=(1000, 100000), repeat=5, directory=None, seed=0, progress=None):
+    """
+    generate synthetic files of each format and size and benchmark loading them
+
+    Parameters
+    ----------
+    formats : list of str, optional
+        keys of `radie.benchmarks.generators.generators`, by default all formats
+    sizes : list of int
+        the numbers of points of the generated files
+    repeat : int
+        the number of warm timings
+    directory : str, optional
+        where to write the files, by default a temporary directory that is removed afterwards
+    seed : int
+    progress : function, optional
+        called with a message before each file is benchmarked
+
+    Returns
+    -------
+    list of OrderedDict
+
+    """
+    formats = list(generators.generators) if formats is None else list(formats)
+    unknown = set(formats).difference(generators.generators)
+    if unknown:
+        raise KeyError("unknown formats: {:s}".format(", ".join(sorted(unknown))))
+
+    # the parse cache would turn every warm load into a cache hit
+    parse_cache, loaders.parse_cache = loaders.parse_cache, None
+    tmp_directory = None
+    if directory is None:
+        tmp_directory = tempfile.TemporaryDirectory(prefix="radie-benchmarks-")
+        directory = tmp_directory.name
+    os.makedirs(directory, exist_ok=True)
+
+    records = []
+    try:
+        for format_name in formats:
+            for points in sizes:
+                if progress is not None:
+                    progress("{:s} {:d} points".format(format_name, points))
+                fname_base = os.path.join(directory, "{:s}-{:d}".format(format_name, points))
+                fname = generators.generate(format_name, fname_base, points, seed)
+                records.extend(benchmark_file(format_name, fname, points, repeat))
+    finally:
+        loaders.parse_cache = parse_cache
+        if tmp_directory is not None:
+            tmp_directory.cleanup()
+    return records
+
+
+def environment():
+    return OrderedDict((
+        ("date", util.iso_date_string()),
+        ("python", platform.python_version()),
+        ("numpy", np.__version__),
+        ("pandas", pd.__version__),
+        ("platform", platform.platform()),
+        ("processor", platform.processor()),
+    ))
+
+
+def save_results(records, fname):
+    """write benchmark records, and a description of the environment they were measured in, to a json file"""
+    results = OrderedDict((("format-version", FORMAT_VERSION), ("environment", environment()), ("records", records)))
+    with open(fname, "w") as fid:
+        json.dump(results, fid, indent=2)
+
+
+def load_results(fname):
+    """read the records of a file written by `save_results`"""
+    with open(fname, "r") as fid:
+        results = json.load(fid, object_pairs_hook=OrderedDict)
+    if results.get("format-version") != FORMAT_VERSION:
+        raise ValueError("{:s} is not a radie benchmark results file of version {:d}".format(fname, FORMAT_VERSION))
+    return results["records"]
+
+
+def compare(records, baseline, tolerance=0.25, metric="warm_median"):
+    """
+    compare benchmark records against a baseline
+
+    Parameters
+    ----------
+    records : list of OrderedDict
+    baseline : list of OrderedDict
+    tolerance : float
+        the allowed relative slow-down before a measurement counts as a regression
+    metric : str
+        the timing to compare, "cold", "warm_median" or "warm_min"
+
+    Returns
+    -------
+    list of OrderedDict
+        one entry per measurement in both sets, with the ratio of the new to the baseline value and a regression flag.
+        A successful baseline measurement that no longer succeeds is always a regression
+
+    """
+    base = OrderedDict((tuple(record[key] for key in KEY_FIELDS), record) for record in baseline)
+    comparisons = []
+    for record in records:
+        key = tuple(record[field] for field in KEY_FIELDS)
+        reference = base.get(key)
+        if reference is None:
+            continue
+        comparison = OrderedDict(zip(KEY_FIELDS, key))
+        comparison["baseline"] = reference.get(metric)
+        comparison["current"] = record.get(metric)
+        if reference["outcome"] == "success" and record["outcome"] != "success":
+            comparison["ratio"] = None
+            comparison["regression"] = True
+        elif comparison["baseline"] and comparison["current"] is not None:
+            comparison["ratio"] = comparison["current"] / comparison["baseline"]
+            comparison["regression"] = comparison["ratio"] > 1. + tolerance
+        else:
+            comparison["ratio"] = None
+            comparison["regression"] = False
+        comparisons.append(comparison)
+    return comparisons
+
+
+def main(argv=None):
+    """command line interface, see `python -m radie.benchmarks --help`"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m radie.benchmarks",
+                                     description="benchmark the radie loaders on synthetic files")
+    parser.add_argument("--formats", nargs="+", metavar="FORMAT", help="formats to benchmark, default all")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 100000], metavar="N",
+                        help="number of points of the generated files")
+    parser.add_argument("--repeat", type=int, default=5, help="number of warm timings")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--directory", help="keep the generated files in this directory")
+    parser.add_argument("--output", help="save the results to a json file, e.g. to use as a baseline")
+    parser.add_argument("--baseline", help="compare against the results of a previous --output")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="relative slow-down that counts as a regression, default 0.25")
+    parser.add_argument("--metric", default="warm_median", choices=["cold", "warm_median", "warm_min"])
+    parser.add_argument("--list", action="store_true", help="list the available formats and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for format_name, (extension, generator) in generators.generators.items():
+            print("{:20s} {:s}".format(format_name, extension))
+        return 0
+
+    def progress(message):
+        print(message, file=sys.stderr)
+
+    records = run(args.formats, args.sizes, args.repeat, args.directory, args.seed, progress)
+    columns = ["format", "points", "target", "outcome", "cold", "warm_median", "warm_min", "peak_memory", "rows"]
+    with pd.option_context("display.width", 200, "display.max_rows", None):
+        print(pd.DataFrame(records).reindex(columns=columns).to_string(index=False))
+
+    if args.output:
+        save_results(records, args.output)
+
+    if args.baseline:
+        comparisons = compare(records, load_results(args.baseline), args.tolerance, args.metric)
+        regressions = [comparison for comparison in comparisons if comparison["regression"]]
+        print("\n{:d} of {:d} measurements regressed by more than {:.0%} in {:s}".format(
+            len(regressions), len(comparisons), args.tolerance, args.metric))
+        if regressions:
+            with pd.option_context("display.width", 200, "display.max_rows", None):
+                print(pd.DataFrame(regressions).to_string(index=False))
+            return 1
+    return 0
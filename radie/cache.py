@@ -0,0 +1,304 @@
+"""persistent on-disk cache of parsed data-files, used by `radie.loaders.load_file` when enabled
+
+Each cache entry is a numpy .npz archive holding a json header (class names, metadata and column labels) and the raw
+column arrays of the StructuredDataFrame(s) that a loader returned for a file.  Entries are keyed by the absolute
+path, size and modification time of the file, and by the module path and source file of the loader function, so
+changing either the data-file or the loader plugin invalidates the entry.  The least recently used entries are
+evicted once the cache directory grows beyond its size cap.
+"""
+import os
+import sys
+import json
+import hashlib
+import zipfile
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import structures
+from .structures.structureddataframe import StructuredDataFrame
+
+FORMAT_VERSION = 1
+ENTRY_EXTENSION = ".npz"
+default_directory = os.path.join(os.path.expanduser("~"), ".radie", "cache")
+
+
+def loader_fingerprint(loader):
+    """identify the version of a loader plugin by the module path and source file stats of its loader function
+
+    Parameters
+    ----------
+    loader : radie.loaders.Loader
+
+    Returns
+    -------
+    list
+
+    """
+    module = sys.modules.get(loader._load.__module__)
+    source = getattr(module, "__file__", None)
+    try:
+        stat = os.stat(source)
+        source_id = [stat.st_size, stat.st_mtime_ns]
+    except (TypeError, OSError):
+        source_id = None
+    return [loader.module, source_id]
+
+
+def encode_dataframes(dfs):
+    """split a loader result into a json-able header and a dict of column arrays
+
+    Parameters
+    ----------
+    dfs : StructuredDataFrame or list of StructuredDataFrame
+
+    Returns
+    -------
+    header : str
+        json string
+    arrays : OrderedDict
+
+    Raises
+    ------
+    TypeError
+        if the result cannot be cached, i.e. non-numeric columns, non-json metadata or unsupported column labels
+
+    """
+    single = isinstance(dfs, StructuredDataFrame)
+    if single:
+        dfs = [dfs]
+
+    frames = []
+    arrays = OrderedDict()
+    for i, df in enumerate(dfs):  # type: StructuredDataFrame
+        labels = list(df.columns)
+        if len(set(labels)) != len(labels) or not all(type(label) in (str, int) for label in labels):
+            raise TypeError("column labels must be unique strings or integers to be cached")
+
+        frame = OrderedDict()
+        frame["class"] = df.__class__.__name__
+        frame["metadata"] = df.metadata
+        frame["columns"] = labels
+        frame["has_index"] = not (isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and
+                                  df.index.step == 1)
+        frames.append(frame)
+
+        for j, label in enumerate(labels):
+            values = df[label].values
+            if values.dtype.kind not in "biuf":
+                raise TypeError("only numeric columns are cached")
+            arrays["f{:d}c{:d}".format(i, j)] = values
+        if frame["has_index"]:
+            if df.index.dtype.kind not in "biuf":
+                raise TypeError("only numeric indices are cached")
+            arrays["f{:d}index".format(i)] = df.index.values
+
+    header = OrderedDict((("format", FORMAT_VERSION), ("single", single), ("frames", frames)))
+    return json.dumps(header), arrays
+
+
+def decode_dataframes(header, arrays):
+    """rebuild the loader result from the output of `encode_dataframes`"""
+    header = json.loads(header, object_pairs_hook=OrderedDict)
+    dfs = []
+    for i, frame in enumerate(header["frames"]):
+        cls = structures.structures[frame["class"]]
+        data = OrderedDict()
+        for j, label in enumerate(frame["columns"]):
+            data[label] = arrays["f{:d}c{:d}".format(i, j)]
+        index = arrays["f{:d}index".format(i)] if frame["has_index"] else None
+        dfs.append(cls(pd.DataFrame(data, index=index, columns=frame["columns"]), **frame["metadata"]))
+
+    if header["single"]:
+        return dfs[0]
+    return dfs
+
+
+class ParseCache(object):
+    """a size-capped, least recently used cache of parsed data-files stored in a directory
+
+    Attributes
+    ----------
+    directory : str
+        the directory holding the cache entries
+    max_bytes : int
+        the size cap, least recently used entries are evicted beyond this size
+    hits : int
+    misses : int
+    stores : int
+    evictions : int
+
+    """
+
+    def __init__(self, directory=None, max_bytes=2 ** 30):
+        """
+        Parameters
+        ----------
+        directory : str, optional
+            defaults to ~/.radie/cache
+        max_bytes : int
+            the maximum total size of the cache entries, default is 1 GiB
+        """
+        self.directory = directory if directory else default_directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._size = None  # type: int
+        os.makedirs(self.directory, exist_ok=True)
+
+    def entry_path(self, fname, loader):
+        """the path of the cache entry for a file read by a specific loader, None if the file does not exist"""
+        try:
+            stat = os.stat(fname)
+        except OSError:
+            return None
+        identity = [FORMAT_VERSION, os.path.abspath(fname), stat.st_size, stat.st_mtime_ns,
+                    loader_fingerprint(loader)]
+        key = hashlib.sha1(json.dumps(identity).encode()).hexdigest()
+        return os.path.join(self.directory, key + ENTRY_EXTENSION)
+
+    def get(self, fname, loaders_):
+        """return the cached result of the first candidate loader with a valid entry, or None
+
+        Parameters
+        ----------
+        fname : str
+        loaders_ : list of radie.loaders.Loader
+            the candidate loaders, in order of preference
+
+        Returns
+        -------
+        StructuredDataFrame or list or None
+
+        """
+        for loader in loaders_:
+            path = self.entry_path(fname, loader)
+            if path is None:
+                break
+            try:
+                with np.load(path, allow_pickle=False) as npz:
+                    header = npz["header"].tobytes().decode()
+                    arrays = {key: npz[key] for key in npz.files if key != "header"}
+                dfs = decode_dataframes(header, arrays)
+            except FileNotFoundError:
+                continue
+            except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+                # a corrupt or truncated entry, or a structure class that is no longer registered
+                self._remove_entry(path)
+                continue
+
+            os.utime(path)  # the modification time of an entry is its last use
+            self.hits += 1
+            return dfs
+
+        self.misses += 1
+        return None
+
+    def put(self, fname, loader, dfs):
+        """store the result of a loader, silently skipping results that cannot be cached
+
+        Parameters
+        ----------
+        fname : str
+        loader : radie.loaders.Loader
+        dfs : StructuredDataFrame or list of StructuredDataFrame
+
+        Returns
+        -------
+        bool
+            True if the result was stored
+
+        """
+        path = self.entry_path(fname, loader)
+        if path is None:
+            return False
+        try:
+            header, arrays = encode_dataframes(dfs)
+        except TypeError:
+            return False
+
+        try:
+            replaced_size = os.path.getsize(path)
+        except OSError:
+            replaced_size = 0
+
+        # write to a temporary file and then rename so concurrent readers never see partial entries
+        fid, tmp_path = tempfile.mkstemp(suffix=ENTRY_EXTENSION, dir=self.directory)
+        try:
+            with os.fdopen(fid, "wb") as tmp:
+                np.savez(tmp, header=np.frombuffer(header.encode(), dtype=np.uint8), **arrays)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        self.stores += 1
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += os.path.getsize(path) - replaced_size
+        if self._size > self.max_bytes:
+            self.evict()
+        return True
+
+    def _remove_entry(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        if self._size is not None:
+            self._size -= size
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(ENTRY_EXTENSION) and entry.is_file():
+                entries.append((entry.stat().st_mtime, entry.stat().st_size, entry.path))
+        return entries
+
+    def size(self):
+        """the total size in bytes of all cache entries"""
+        return sum(size for mtime, size, path in self._entries())
+
+    def evict(self):
+        """remove the least recently used entries until the cache is within `max_bytes`"""
+        entries = sorted(self._entries())
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def clear(self):
+        """remove all cache entries"""
+        for mtime, size, path in self._entries():
+            os.remove(path)
+        self._size = 0
+
+    def stats(self):
+        """return the hit/miss counters and the current size of the cache
+
+        Returns
+        -------
+        dict
+
+        """
+        return OrderedDict((
+            ("hits", self.hits),
+            ("misses", self.misses),
+            ("stores", self.stores),
+            ("evictions", self.evictions),
+            ("bytes", self.size()),
+        ))
@@ -0,0 +1,317 @@
+"""batch conversion of data-files to radie formats, `python -m radie convert --help`
+
+Input files are loaded with `radie.loaders.load_file` on a pool of workers and each resulting StructuredDataFrame is
+written with one of the `writers`.  The output of a file keeps the full input file name and adds the writer extension,
+e.g. sample.raw -> sample.raw.df, and files holding several datasets are written as sample.raw.df, sample.raw-1.df,
+and so on.  An input is skipped when its first output is at least as new as the input, so an interrupted conversion
+resumes where it stopped.  The outputs of a file are written to temporary names and renamed with the first output
+last, so a file is never counted as converted unless all its outputs were written.
+"""
+import os
+import sys
+import glob
+import json
+import time
+import traceback
+from collections import OrderedDict
+from concurrent import futures
+
+from . import loaders, util
+from .structures.structureddataframe import StructuredDataFrame
+
+REPORT_NAME = "radie-convert-report.json"
+
+
+def write_df(df, filename):
+    df.savetxt(filename, overwrite=True)
+
+
+def write_rdf(df, filename):
+    df.save_binary(filename, overwrite=True)
+
+
+writers = OrderedDict((
+    ("df", (".df", write_df)),
+    ("df.gz", (".df.gz", write_df)),
+    ("df.bz2", (".df.bz2", write_df)),
+    ("df.xz", (".df.xz", write_df)),
+    ("rdf", (".rdf", write_rdf)),
+))  # name: (extension, function(df, filename))
+
+
+def register_writer(name, extension, function):
+    """
+    register an output format for `convert`
+
+    Parameters
+    ----------
+    name : str
+        the name used to select the format, e.g. on the command line
+    extension : str
+        appended to the input file name, e.g. ".df"
+    function : function
+        function(df, filename) that writes a StructuredDataFrame, overwriting the file.  Must be a module level
+        function so that it can be sent to worker processes
+
+    """
+    writers[name] = (extension, function)
+
+
+def _glob_root(pattern):
+    """the directory part of a glob pattern before the first wildcard"""
+    parts = []
+    for part in os.path.normpath(pattern).split(os.sep):
+        if glob.has_magic(part):
+            break
+        parts.append(part)
+    else:
+        parts = parts[:-1]
+    return os.sep.join(parts) or os.curdir
+
+
+def find_inputs(paths_or_globs):
+    """
+    collect the files to convert.  Directories are searched recursively for files with the extension of a registered
+    loader, and glob patterns and filenames are expanded by `radie.loaders.expand_paths`
+
+    Parameters
+    ----------
+    paths_or_globs : str or list of str
+
+    Returns
+    -------
+    list of (str, str)
+        (filename, path relative to its input root) pairs, the relative path determines the output location
+
+    """
+    if isinstance(paths_or_globs, str):
+        paths_or_globs = [paths_or_globs]
+
+    inputs = []
+    for path in paths_or_globs:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if os.path.splitext(name)[1] in loaders.loaders:
+                        fname = os.path.join(root, name)
+                        inputs.append((fname, os.path.relpath(fname, path)))
+        elif glob.has_magic(path):
+            root = _glob_root(path)
+            for fname in loaders.expand_paths(path):
+                if os.path.isfile(fname):
+                    inputs.append((fname, os.path.relpath(fname, root)))
+        else:
+            inputs.append((path, os.path.basename(path)))
+    return inputs
+
+
+def output_names(base, extension, n):
+    """the output filenames of n datasets, the first one is `base + extension`"""
+    return [base + extension] + ["{:s}-{:d}{:s}".format(base, i, extension) for i in range(1, n)]
+
+
+def up_to_date(fname, output):
+    """check if an output exists and is not older than its input"""
+    try:
+        return os.stat(output).st_mtime_ns >= os.stat(fname).st_mtime_ns
+    except OSError:
+        return False
+
+
+def _convert_one(task):
+    """worker function for `convert`, return a result dict instead of raising"""
+    fname, base, extension, writer = task
+    result = OrderedDict((("file", fname), ("outputs", []), ("rows", 0), ("bytes", 0)))
+    try:
+        result["bytes"] = os.path.getsize(fname)
+        dfs = loaders.load_file(fname)
+        if isinstance(dfs, StructuredDataFrame):
+            dfs = [dfs]
+        dfs = list(dfs)
+        if not dfs:
+            raise ValueError("no datasets were loaded")
+
+        outputs = output_names(base, extension, len(dfs))
+        directory = os.path.dirname(outputs[0])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = [os.path.join(os.path.dirname(output), ".~" + os.path.basename(output)) for output in outputs]
+        try:
+            for df, tmp in zip(dfs, temporary):
+                writer(df, tmp)
+            for tmp, output in reversed(list(zip(temporary, outputs))):  # the first output, which marks the input
+                os.replace(tmp, output)                                    # as converted, is renamed last
+        finally:
+            for tmp in temporary:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+        result["outputs"] = outputs
+        result["rows"] = sum(len(df) for df in dfs)
+    except Exception as e:
+        result["error"] = type(e).__name__
+        result["message"] = str(e)
+        result["traceback"] = traceback.format_exc()
+    return result
+
+
+def convert(paths_or_globs, output_directory=None, writer="df", workers=None, executor="process", force=False,
+            progress=None):
+    """
+    convert data-files in parallel
+
+    Parameters
+    ----------
+    paths_or_globs : str or list of str
+        files, directories and glob patterns, see `find_inputs`
+    output_directory : str, optional
+        where to write the outputs, keeping the sub-directories of the inputs.  By default next to each input file
+    writer : str
+        a key of `writers`
+    workers : int, optional
+        the number of workers, defaults to the number of processors
+    executor : str
+        "process" for a process pool or "thread" for a thread pool
+    force : bool
+        convert inputs whose outputs are up to date
+    progress : function, optional
+        called as progress(done, total, result) after each file is converted, with result the output of the worker
+
+    Returns
+    -------
+    OrderedDict
+        a report with the counts of converted, skipped and failed files, the elapsed time, throughput and the
+        failures, each with the error type, message and traceback
+
+    """
+    extension, write = writers[writer]
+
+    if executor == "process":
+        pool_class = futures.ProcessPoolExecutor
+    elif executor == "thread":
+        pool_class = futures.ThreadPoolExecutor
+    else:
+        raise ValueError('executor must be "process" or "thread", not {:}'.format(executor))
+
+    tasks = []
+    skipped = 0
+    for fname, relative_path in find_inputs(paths_or_globs):
+        if fname.endswith(extension) or os.path.basename(fname).startswith(".~"):
+            continue  # outputs and unfinished outputs of this writer, e.g. of an earlier run next to the inputs
+        if output_directory is None:
+            base = fname
+        else:
+            base = os.path.join(output_directory, relative_path)
+        if not force and up_to_date(fname, base + extension):
+            skipped += 1
+            continue
+        tasks.append((fname, base, extension, write))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+
+    start = time.perf_counter()
+    converted = 0
+    rows = 0
+    n_bytes = 0
+    failures = []
+    if workers == 1:
+        results = map(_convert_one, tasks)
+        pool = None
+    else:
+        # small batches keep the progress reports flowing while amortizing the inter-process overhead
+        chunksize = max(1, min(16, len(tasks) // (workers * 4)))
+        pool = pool_class(max_workers=workers)
+        results = pool.map(_convert_one, tasks, chunksize=chunksize)
+
+    interrupted = True
+    try:
+        for done, result in enumerate(results, 1):
+            n_bytes += result["bytes"]
+            if "error" in result:
+                failures.append(OrderedDict((key, result[key]) for key in ("file", "error", "message", "traceback")))
+            else:
+                converted += 1
+                rows += result["rows"]
+            if progress is not None:
+                progress(done, len(tasks), result)
+        interrupted = False
+    finally:
+        if pool is not None:
+            if interrupted and sys.version_info >= (3, 9):
+                pool.shutdown(wait=True, cancel_futures=True)  # drop the queued files, e.g. on KeyboardInterrupt
+            else:
+                pool.shutdown(wait=True)
+
+    elapsed = time.perf_counter() - start
+    return OrderedDict((
+        ("date", util.iso_date_string()),
+        ("writer", writer),
+        ("output_directory", output_directory),
+        ("converted", converted),
+        ("skipped", skipped),
+        ("failed", len(failures)),
+        ("elapsed", elapsed),
+        ("files_per_second", (converted + len(failures)) / elapsed if elapsed > 0 else None),
+        ("bytes_per_second", n_bytes / elapsed if elapsed > 0 else None),
+        ("rows", rows),
+        ("failures", failures),
+    ))
+
+
+def save_report(report, fname):
+    """write the report of `convert` to a json file"""
+    with open(fname, "w") as fid:
+        json.dump(report, fid, indent=2)
+
+
+def main(argv=None):
+    """command line interface, see `python -m radie convert --help`"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="radie convert", description="convert data-files to radie formats")
+    parser.add_argument("inputs", nargs="+", metavar="INPUT", help="files, directories or glob patterns")
+    parser.add_argument("-o", "--output", help="output directory, by default outputs are written next to the inputs")
+    parser.add_argument("-f", "--format", default="df", choices=list(writers), help="output format, default df")
+    parser.add_argument("-j", "--workers", type=int, help="number of workers, default the number of processors")
+    parser.add_argument("--threads", action="store_true", help="use a thread pool instead of a process pool")
+    parser.add_argument("--force", action="store_true", help="also convert files whose outputs are up to date")
+    parser.add_argument("--report", help="json report of the run and its failures, default {:s} in the output "
+                                         "directory or the working directory".format(REPORT_NAME))
+    parser.add_argument("-q", "--quiet", action="store_true", help="do not show progress")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    failed = [0]
+    megabytes = [0.]
+    shown = [0.]
+
+    def progress(done, total, result):
+        megabytes[0] += result["bytes"] / 2 ** 20
+        if "error" in result:
+            failed[0] += 1
+            print("\nfailed {:s}: {:s}".format(result["file"], result["message"].splitlines()[0]
+                                               if result["message"] else result["error"]), file=sys.stderr)
+        now = time.perf_counter()
+        if now - shown[0] < 0.2 and done < total and "error" not in result:
+            return
+        shown[0] = now
+        elapsed = now - started
+        print("\r[{:d}/{:d}] {:.1f} files/s {:.1f} MB/s, {:d} failed".format(
+            done, total, done / elapsed, megabytes[0] / elapsed, failed[0]), end="", file=sys.stderr)
+
+    report = convert(args.inputs, args.output, args.format, args.workers, "thread" if args.threads else "process",
+                     args.force, None if args.quiet else progress)
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    report_name = args.report or os.path.join(args.output or os.curdir, REPORT_NAME)
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    save_report(report, report_name)
+
+    print("converted {:d}, skipped {:d} up to date, failed {:d} in {:.1f} s, report: {:s}".format(
+        report["converted"], report["skipped"], report["failed"], report["elapsed"], report_name))
+    return 1 if report["failed"] else 0
@@ -1,20 +1,41 @@
 import os
 import sys
+import time
+import logging
+import threading
+import contextlib
 import traceback
 import csv
 import warnings
 import io
 import json
+import glob
+import functools
+import struct
+import locale
+import re
 import typing
+from collections import OrderedDict
+from concurrent import futures
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from radie import structures
-from . import exceptions
-from .structures.structureddataframe import StructuredDataFrame
+from . import exceptions, util, plugins
+from .cache import ParseCache
+from .structures.structureddataframe import StructuredDataFrame, RDF_MAGIC, rdf_align
 
-loaders = dict()
+loaders = plugins.LazyRegistry()  # extension: list of Loader, filled in by the plugins, see radie.plugins
+logger = logging.getLogger(__name__)
+
+PROBE_SIZE = 4096  # number of bytes at the head of a file passed to Loader.probe functions
+parse_cache = None  # type: ParseCache
+
+CSV_SMALL_FILE = 2 ** 16  # files up to this size in bytes are read into memory by load_csv
+CSV_SNIFF_LINES = 10  # number of lines used to sniff the datablock dialect
+CSV_BLOCK_LINES = 10  # number of consecutive matching lines that mark the beginning of the datablock
 
 
 class Loader(object):
@@ -39,9 +60,26 @@ class Loader(object):
     module : str
         the module path of the loader function, helpful for debugging
 
+    Loaders may optionally supply a probe function, which receives the first `PROBE_SIZE` bytes of a file and returns
+    `True` if the file is recognized as the correct type, `False` if it is definitely not the correct type, or `None`
+    if it cannot tell from the head of the file.  `load_file` uses the probe results to skip loaders that would only
+    raise `IncorrectFileType` after parsing the file.
+
+    Loaders may also supply a metadata function, which reads only the header of a file and returns the metadata of
+    the StructuredDataFrame (or a list of metadata dicts, one for each StructuredDataFrame the loader function would
+    return).  It must validate the file like the loader function and return the same metadata.  If the class is
+    determined by the file rather than by the `cls` attribute, the metadata dict holds the registered class name under
+    the "class" key, as in the dftxt header.  It is used by `load_deferred` to create StructuredDataFrames whose data
+    is only read on first access.
+
+    Loaders of files that instruments write over the course of a measurement may supply a completion check, which
+    receives the filename and returns `True` once the instrument has finished writing the file.  It is used by
+    `radie.watcher` to wait before loading new files.
+
     """
 
-    def __init__(self, loader_function, cls, extensions, label):
+    def __init__(self, loader_function, cls, extensions, label, probe=None, metadata_function=None,
+                 completion_check=None):
         """
         Parameters
         ----------
@@ -53,8 +91,18 @@ class Loader(object):
             a string or list of strings specifying the file types
         label : str
             the readable text that will represent this file loader
+        probe : function, optional
+            a function that accepts the head bytes of a file and returns True, False or None
+        metadata_function : function, optional
+            a function that reads the metadata from a file without its data, expects filename argument
+        completion_check : function, optional
+            a function that accepts the filename and returns True if the file has been written completely, and False
+            if it cannot tell yet, for example because the header has not been written
         """
         self._load = loader_function  # type: typing.Callable
+        self._probe = probe  # type: typing.Callable
+        self._load_metadata = metadata_function  # type: typing.Callable
+        self._completion_check = completion_check  # type: typing.Callable
         self.cls = cls
 
         if type(extensions) is list:
@@ -82,12 +130,262 @@ class Loader(object):
         StructuredDataFrame
 
         """
-        return self._load(filename)
+        start = time.perf_counter()
+        try:
+            dfs = self._load(filename)
+        except exceptions.IncorrectFileType:
+            record_load(self, filename, "rejected", time.perf_counter() - start)
+            raise
+        except Exception:
+            record_load(self, filename, "failed", time.perf_counter() - start)
+            raise
+        record_load(self, filename, "success", time.perf_counter() - start, dfs)
+        return dfs
+
+    def probe(self, head_bytes):
+        """check the head of a file to determine if this loader can read it
+
+        Parameters
+        ----------
+        head_bytes : bytes
+            the first bytes of the file, up to `PROBE_SIZE`
+
+        Returns
+        -------
+        bool or None
+            True if the file is recognized, False if it is not, and None if the loader has no probe function or the
+            probe cannot tell
+
+        """
+        if self._probe is None:
+            return None
+        return self._probe(head_bytes)
+
+    @property
+    def can_defer(self):
+        """True if the loader has a metadata function and supports `load_deferred`"""
+        return self._load_metadata is not None
+
+    @property
+    def can_check_completion(self):
+        """True if the loader has a completion check"""
+        return self._completion_check is not None
+
+    def is_complete(self, filename):
+        """
+        check whether an instrument has finished writing a file, True if the loader has no completion check
+
+        Parameters
+        ----------
+        filename : str
+
+        Returns
+        -------
+        bool
+
+        """
+        if self._completion_check is None:
+            return True
+        return self._completion_check(filename)
+
+    def load_deferred(self, filename):
+        """read only the metadata of a file, and return StructuredDataFrames that load their data on first access
+
+        Parameters
+        ----------
+        filename : str
+
+        Returns
+        -------
+        StructuredDataFrame or list of StructuredDataFrame
+            matching the output of `load`, see `StructuredDataFrame.deferred`
+
+        """
+        if self._load_metadata is None:
+            raise NotImplementedError("loader {:s} has no metadata function".format(self.label))
+
+        metadata = self._load_metadata(filename)
+        source = DeferredLoad(self, filename)
+
+        def deferred(i, meta):
+            meta = dict(meta)
+            cls = structures.structures[meta.pop("class")] if "class" in meta else self.cls
+            return cls.deferred(functools.partial(source.dataset, i), **meta)
+
+        if isinstance(metadata, dict):
+            return deferred(0, metadata)
+        return [deferred(i, meta) for i, meta in enumerate(metadata)]
 
     def __str__(self):
         return self.label + ": " + ", ".join(self.extensions)
 
 
+class DeferredLoad(object):
+    """loads a file once on behalf of all of the deferred StructuredDataFrames created from it by `Loader.load_deferred`
+    """
+
+    def __init__(self, loader, filename):
+        """
+        Parameters
+        ----------
+        loader : Loader
+        filename : str
+        """
+        self.loader = loader
+        self.filename = filename
+        self._dfs = None  # type: list
+
+    def dataset(self, i):
+        """return the i-th StructuredDataFrame loaded from the file, loading the file on the first call"""
+        if self._dfs is None:
+            dfs = self.loader.load(self.filename)
+            self._dfs = [dfs] if isinstance(dfs, StructuredDataFrame) else list(dfs)
+        df, self._dfs[i] = self._dfs[i], None  # each dataset is only handed out once, release the reference
+        return df
+
+
+OUTCOMES = ("success", "rejected", "failed")
+
+
+class LoaderStats(object):
+    """thread-safe counters of `Loader.load` calls, per loader and file extension
+
+    For each loader and extension the number of calls and of each outcome are counted: "success", "rejected" when the
+    loader raised `IncorrectFileType`, and "failed" for any other exception.  The wall time of all calls and of the
+    rejected calls, the bytes of the files passed to the loader and the number of datasets and rows loaded are summed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def record(self, loader_name, extension, outcome, seconds, nbytes, datasets=0, rows=0):
+        """
+        add a single `Loader.load` call to the counters
+
+        Parameters
+        ----------
+        loader_name : str
+        extension : str
+        outcome : str
+            one of "success", "rejected" or "failed"
+        seconds : float
+            wall time of the call
+        nbytes : int
+            size of the file
+        datasets : int
+            number of StructuredDataFrames returned
+        rows : int
+            total number of rows of the StructuredDataFrames
+
+        """
+        key = (loader_name, extension)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = OrderedDict((
+                    ("loader", loader_name), ("extension", extension), ("calls", 0),
+                    ("success", 0), ("rejected", 0), ("failed", 0),
+                    ("seconds", 0.), ("rejected_seconds", 0.), ("bytes", 0), ("datasets", 0), ("rows", 0),
+                ))
+            entry["calls"] += 1
+            entry[outcome] += 1
+            entry["seconds"] += seconds
+            if outcome == "rejected":
+                entry["rejected_seconds"] += seconds
+            entry["bytes"] += nbytes
+            entry["datasets"] += datasets
+            entry["rows"] += rows
+
+    def records(self):
+        """
+        return a copy of the counters
+
+        Returns
+        -------
+        list of OrderedDict
+            one record per loader and extension
+
+        """
+        with self._lock:
+            return [OrderedDict(entry) for entry in self._entries.values()]
+
+    def to_dataframe(self):
+        """return the counters as a pandas.DataFrame, one row per loader and extension"""
+        columns = ["loader", "extension", "calls"] + list(OUTCOMES) + [
+            "seconds", "rejected_seconds", "bytes", "datasets", "rows"]
+        return pd.DataFrame(self.records(), columns=columns)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+loader_stats = LoaderStats()
+_stats_collectors = []  # type: typing.List[LoaderStats]
+
+
+def record_load(loader, fname, outcome, seconds, dfs=None):
+    """record a `Loader.load` call in the global `loader_stats` and any active `collect_stats` collectors"""
+    try:
+        nbytes = os.path.getsize(fname)
+    except (OSError, TypeError, ValueError):
+        nbytes = 0  # file objects
+
+    if isinstance(dfs, StructuredDataFrame):
+        dfs = [dfs]
+    elif type(dfs) not in (list, tuple):
+        dfs = []
+    dfs = [df for df in dfs if isinstance(df, StructuredDataFrame)]
+    rows = sum(len(df) for df in dfs)
+
+    extension = os.path.splitext(fname)[1] if isinstance(fname, (str, os.PathLike)) else ""
+    for collector in [loader_stats] + _stats_collectors:
+        collector.record(loader.label, extension, outcome, seconds, nbytes, len(dfs), rows)
+    logger.debug("%s %s %s in %.4f s", loader.label, outcome, fname, seconds)
+
+
+def stats():
+    """
+    the counters of all `Loader.load` calls since the start of the process or the last `reset_stats`, see
+    `LoaderStats`
+
+    Returns
+    -------
+    list of OrderedDict
+
+    """
+    return loader_stats.records()
+
+
+def reset_stats():
+    loader_stats.clear()
+
+
+@contextlib.contextmanager
+def collect_stats():
+    """
+    collect the counters of the `Loader.load` calls, from any thread, made inside of a with block
+
+    Examples
+    --------
+    >>> with collect_stats() as collector:
+    ...     dfs, errors = load_files("measurements/*.raw")
+    >>> collector.to_dataframe()
+
+    Yields
+    ------
+    LoaderStats
+
+    """
+    collector = LoaderStats()
+    _stats_collectors.append(collector)
+    try:
+        yield collector
+    finally:
+        _stats_collectors.remove(collector)
+
+
 def register_loaders(*loader_objects):
     """register Loader objects with the loaders.loaders book-keeping dict so we can keep track
 
@@ -97,15 +395,81 @@ def register_loaders(*loader_objects):
         Loader objects supplies as arguments
 
     """
-    for loader in loader_objects:  # type: Loader
-        for ext in loader.extensions:
-            if ext not in loaders.keys():
-                loaders[ext] = []
-            if loader in loaders[ext]:
-                warnings.warn('overwriting Loader Object {:} for file extension {:}'.format(loader.label, ext))
-            loaders[ext].append(loader)
-        if loader.cls not in loader.cls.loaders():  # setup circular referencing of sorts
-            loader.cls.add_loader(loader)
+    with loaders.lock:
+        for loader in loader_objects:  # type: Loader
+            for ext in loader.extensions:
+                registered = loaders.registered(ext, [])
+                if loader in registered:
+                    warnings.warn('overwriting Loader Object {:} for file extension {:}'.format(loader.label, ext))
+                loaders[ext] = registered + [loader]  # a new list, threads iterating the old one are unaffected
+            if loader.cls not in loader.cls.loaders():  # setup circular referencing of sorts
+                loader.cls.add_loader(loader)
+
+
+def read_head(fname, size=PROBE_SIZE):
+    """read the first bytes of a file for use in Loader.probe functions, None if the file cannot be read"""
+    try:
+        with open(fname, "rb") as fid:
+            return fid.read(size)
+    except OSError:
+        return None
+
+
+def rank_loaders(loaders_, head_bytes):
+    """order candidate loaders by their probe results
+
+    Loaders whose probe recognizes the file come first, followed by loaders that cannot tell, in registration order.
+    Loaders whose probe rejects the file are dropped.
+
+    Parameters
+    ----------
+    loaders_ : list of Loader
+    head_bytes : bytes or None
+        the head of the file, if None no probing is done
+
+    Returns
+    -------
+    list of Loader
+
+    """
+    if head_bytes is None:
+        return list(loaders_)
+
+    recognized = []
+    unknown = []
+    for loader in loaders_:  # type: Loader
+        result = loader.probe(head_bytes)
+        if result is None:
+            unknown.append(loader)
+        elif result:
+            recognized.append(loader)
+    return recognized + unknown
+
+
+def enable_cache(directory=None, max_bytes=2 ** 30):
+    """turn on the persistent parse cache used by `load_file`
+
+    Parameters
+    ----------
+    directory : str, optional
+        the cache directory, defaults to ~/.radie/cache
+    max_bytes : int
+        the size cap of the cache, least recently used entries are evicted beyond this size
+
+    Returns
+    -------
+    ParseCache
+
+    """
+    global parse_cache
+    parse_cache = ParseCache(directory, max_bytes)
+    return parse_cache
+
+
+def disable_cache():
+    """turn off the persistent parse cache, the cached entries are left on disk"""
+    global parse_cache
+    parse_cache = None
 
 
 def from_clipboard(*args, **kwargs):
@@ -113,6 +477,36 @@ def from_clipboard(*args, **kwargs):
     return StructuredDataFrame(df)
 
 
+def csv_encoding(sample, encoding=None):
+    """determine the encoding of a delimited text file from a sample of its bytes
+
+    Parameters
+    ----------
+    sample : bytes
+    encoding : str, optional
+        the requested encoding, tried first
+
+    Returns
+    -------
+    str
+
+    """
+    candidates = [encoding] if encoding else []
+    candidates += ["utf-8", locale.getpreferredencoding(False)]
+    for candidate in candidates:
+        try:
+            sample.decode(candidate)
+            return candidate
+        except UnicodeDecodeError:
+            # the sample may end in the middle of a multi-byte character
+            try:
+                sample[:-3].decode(candidate)
+                return candidate
+            except UnicodeDecodeError:
+                continue
+    raise exceptions.LoaderException("could not determine the file encoding")
+
+
 def load_csv(fname, name=None, encoding=None):
     """
     a function to read a generic csv file and return a dataframe. It is assumed that the file has the following
@@ -127,17 +521,26 @@ def load_csv(fname, name=None, encoding=None):
 
     Next we go to the beginning of the file and look for the first sequence of 10 lines that are delimited by the
     sniffed delimiter, and has the same length and numeric signature of the datablock.  This marks the beginning of the
-    datablock.
+    datablock.  The lines are classified in bulk by a regular expression compiled for the sniffed signature.  If the
+    datablock does not begin near the head of the file, its beginning is found by a binary search over byte offsets
+    backwards from the sniffed chunk.
 
     Lastly we look at the line immediately above the datablock.  If that line has the same delimited length it is
     assumed to be the headerline.
 
-    We use all of this information to pass the filename to pandas.read_csv, to read in the data-block and the headerline
+    We use all of this information to seek the file to the datablock (or headerline) and pass the open file to
+    pandas.read_csv.  Only small files are read into memory entirely, large files are sampled by seeking and only the
+    lines up to the datablock are scanned, so that the peak memory stays close to the size of the resulting
+    dataframe.  The encoding is determined from the sampled bytes, so the file is never re-read to try another
+    encoding.
 
 
     Parameters
     ----------
     fname : str or io.TextIOWrapper or io.StringIO
+    name : str, optional
+    encoding : str, optional
+        the file encoding, by default it is determined from the file
 
     Returns
     -------
@@ -154,36 +557,97 @@ def load_csv(fname, name=None, encoding=None):
     if type(fname) is str:
         if not os.path.isfile(fname):
             raise TypeError('fname must be a valid file, string blocks not yet supported')
-        with open(fname, "r", encoding=encoding) as fid:
-            if not name:
-                name = os.path.basename(fname)
-            data = io.StringIO(fid.read())
+        if not name:
+            name = os.path.basename(fname)
+        with open(fname, "rb") as fid:
+            return _load_csv_binary(fid, name, encoding)
     elif type(fname) is io.TextIOWrapper:
         if not name:
             name = os.path.basename(fname.name)
-        data = io.StringIO(fname.read)
+        return _load_csv_binary(fname.buffer, name, encoding if encoding else fname.encoding)
     elif type(fname) is io.StringIO:
-        data = fname
+        return _load_csv_binary(io.BytesIO(fname.getvalue().encode("utf-8")), name, "utf-8")
     else:
         raise TypeError('must provide a filename, a TextIOWrapper object, or a StringIO object')
 
-    lines = data.readlines()
-    data.seek(0)
 
-    num_lines = len(lines)
-    if num_lines > 100:
-        # big file assume we find data_block at the 80% mark
-        chunk_start = int(num_lines * 0.8)
-        chunk_end = chunk_start + 10
-    else:
-        # small file, start at the end and work our way back to the first non-blank line
-        for chunk_end in range(num_lines - 1, -1, -1):
-            if lines[chunk_end] and not lines[chunk_end].isspace():
-                break
-        chunk_start = chunk_end - 10 if num_lines > 11 else 1
+# a single delimited value that float() accepts, whitespace excluding the line ending and the delimiter is inserted
+NUMBER_PATTERN = r"{ws}[-+]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|nan|inf(?:inity)?){ws}"
+
 
-    chunk_lines = lines[chunk_start:chunk_end]
-    chunk = "".join(chunk_lines)
+def csv_number_pattern(delimiter):
+    """the regular expression for a numeric value in a line delimited by `delimiter`"""
+    return NUMBER_PATTERN.format(ws="[^\\S\r\n{:s}]*".format(re.escape(delimiter)))
+
+
+def csv_run_pattern(delimiter, signature, run_length=CSV_BLOCK_LINES):
+    """compile a regular expression that matches a run of delimited lines with a given numeric signature
+
+    The pattern is equivalent to splitting each line on the delimiter and calling `float` on each value, but is
+    evaluated by the regex engine over a whole block of text at once rather than line by line in python.
+
+    Parameters
+    ----------
+    delimiter : str
+    signature : list of bool
+        for each value in the line, True if it must be numeric and False if it must not be
+    run_length : int
+        the number of consecutive matching lines
+
+    Returns
+    -------
+    re.Pattern
+        compiled in MULTILINE mode
+
+    """
+    delim = re.escape(delimiter)
+    number = csv_number_pattern(delimiter)
+    fields = []
+    for is_numeric in signature:
+        if is_numeric:
+            fields.append(number)
+        else:
+            fields.append("(?!{:s}(?:{:s}|\r?$))[^{:s}\r\n]*".format(number, delim, delim))
+    row = "^" + delim.join(fields) + "\r?$"
+    return re.compile("(?:{:s}\n){{{:d}}}{:s}".format(row, run_length - 1, row), re.MULTILINE | re.IGNORECASE)
+
+
+def _load_csv_binary(fid, name, encoding=None):
+    """the implementation of `load_csv` for a seekable binary file object"""
+    fid.seek(0, io.SEEK_END)
+    size = fid.tell()
+    fid.seek(0)
+
+    chunk_offset = None
+    if size <= CSV_SMALL_FILE:
+        head = fid.read()
+        lines = head.splitlines(True)
+        num_lines = len(lines)
+        if num_lines > 100:
+            # big file assume we find data_block at the 80% mark
+            chunk_start = int(num_lines * 0.8)
+            chunk_end = chunk_start + CSV_SNIFF_LINES
+        else:
+            # small file, start at the end and work our way back to the first non-blank line
+            for chunk_end in range(num_lines - 1, -1, -1):
+                if lines[chunk_end] and not lines[chunk_end].isspace():
+                    break
+            chunk_start = chunk_end - CSV_SNIFF_LINES if num_lines > CSV_SNIFF_LINES + 1 else 1
+        chunk_lines = lines[chunk_start:chunk_end]
+        del lines
+    else:
+        head = fid.read(CSV_SMALL_FILE)
+        head = head[:head.rfind(b"\n") + 1]  # only complete lines
+        # seek to the 80% mark, assuming it is within the data_block, and resync on the next line ending
+        fid.seek(int(size * 0.8))
+        fid.readline()
+        chunk_offset = fid.tell()
+        chunk_lines = [fid.readline() for _ in range(CSV_SNIFF_LINES)]
+
+    encoding = csv_encoding(head + b"".join(chunk_lines), encoding)
+
+    chunk_lines = [line.decode(encoding).rstrip("\r\n") for line in chunk_lines]
+    chunk = "\n".join(chunk_lines)
     sniffer = csv.Sniffer()
     try:
         dialect = sniffer.sniff(chunk)
@@ -191,16 +655,6 @@ def load_csv(fname, name=None, encoding=None):
         err_msg = "\n".join(traceback.format_exception(*sys.exc_info()))
         raise exceptions.LoaderException('Sniffing delimieter failed\n{:s}'.format(err_msg))
 
-    def numeric_signature(values):
-        sig = list()
-        for value in values:
-            try:
-                float(value)
-                sig.append(True)
-            except:
-                sig.append(False)
-        return sig
-
     lengths = [len(line.split(dialect.delimiter)) for line in chunk_lines]
     chunk_length = lengths[0]
 
@@ -208,54 +662,178 @@ def load_csv(fname, name=None, encoding=None):
     if not all([length == chunk_length for length in lengths]):
         raise exceptions.LoaderException('csv sample lines have different lengths')
 
-    chunk_numeric_signature = numeric_signature(chunk_lines[0].split(dialect.delimiter))
-    data_block_beginning = -1
-    match_count = 0
-    header_line_idx = None
+    number = re.compile(csv_number_pattern(dialect.delimiter), re.IGNORECASE)
+    chunk_numeric_signature = [number.fullmatch(value) is not None
+                               for value in chunk_lines[0].split(dialect.delimiter)]
+    run_pattern = csv_run_pattern(dialect.delimiter, chunk_numeric_signature)
+    row_pattern = csv_run_pattern(dialect.delimiter, chunk_numeric_signature, run_length=1)
+
+    data_block_offset, header_offset, header_line = _find_datablock(fid, head, chunk_offset, encoding, run_pattern,
+                                                                    row_pattern)
+    explicit_header = None
+
+    if header_line is not None:
+        header_line_vals = header_line.split(dialect.delimiter)
+        if len(header_line_vals) == chunk_length + 1:  # assume we have a commented header
+            explicit_header = header_line_vals[1:]
+            header_line = None
+        elif len(header_line_vals) == chunk_length:
+            data_block_offset = header_offset
+        else:
+            header_line = None
 
-    for i, line in enumerate(lines):
-        line_vals = line.split(dialect.delimiter)
+    fid.seek(data_block_offset)
+    if header_line is None:
+        df = pd.read_csv(fid, delimiter=dialect.delimiter, names=explicit_header, header=None,
+                         skip_blank_lines=False, encoding=encoding)
+    else:
+        df = pd.read_csv(fid, delimiter=dialect.delimiter, header=0, skip_blank_lines=False, encoding=encoding)
+    df = StructuredDataFrame(df.dropna(axis="index", how="all").dropna(axis='columns', how='all'), name=name)
+    return df
 
-        if not len(line_vals) == chunk_length:
-            match_count = 0
-            continue
 
-        line_numeric_signature = numeric_signature(line_vals)
-        if not line_numeric_signature == chunk_numeric_signature:
-            match_count = 0
-            continue
+def _find_datablock(fid, head, chunk_offset, encoding, run_pattern, row_pattern):
+    """locate the first line of the datablock of a delimited file
 
-        match_count += 1
+    The head of the file is searched for the first run of matching lines.  If the datablock starts after the head, it
+    is located by a galloping and then a binary search over byte offsets, backwards from the sniffed chunk which is
+    known to be inside the datablock, so that the cost does not depend on the length of the datablock.  The lines
+    between the head and the datablock are then checked in bulk for lines that match a data line, e.g. an incomplete
+    row inside the datablock that the binary search took for its start.  If there are any, the first run of matching
+    lines is found by scanning forward from the start of the file instead.
 
-        if match_count > 9:
-            data_block_beginning = i - match_count + 1
+    Parameters
+    ----------
+    fid : io.BufferedIOBase
+    head : bytes
+        complete lines from the head of the file
+    chunk_offset : int or None
+        the byte offset of the sniffed chunk, None if the head is the whole file
+    encoding : str
+    run_pattern : re.Pattern
+        the pattern matching a run of datablock lines, from `csv_run_pattern`
+    row_pattern : re.Pattern
+        the pattern matching a single datablock line
 
-            header_line_idx = data_block_beginning - 1
-            if header_line_idx >= 0:
-                header_line = lines[header_line_idx]
-                header_line_vals = header_line.split(dialect.delimiter)
+    Returns
+    -------
+    data_block_offset : int
+        the byte offset of the first line of the datablock
+    header_offset : int or None
+        the byte offset of the line preceding the datablock
+    header_line : str or None
+        the line preceding the datablock, without the line ending
 
-                if len(header_line_vals) == chunk_length + 1:  # assume we have a commented header
-                    explicit_header = header_line_vals[1:]
-                    header_line_idx = None;
-                elif not len(header_line_vals) == chunk_length:
-                    explicit_header = None
-                    header_line_idx = None
-            else:
-                header_line_idx = None
-            break
+    """
+    match = run_pattern.search(head.decode(encoding, errors="replace"))
+    if match:
+        # convert the character position to a byte offset by counting lines
+        line_starts = [0]
+        for _ in range(match.string.count("\n", 0, match.start())):
+            line_starts.append(head.index(b"\n", line_starts[-1]) + 1)
+        if len(line_starts) < 2:
+            return 0, None, None
+        header_offset, data_block_offset = line_starts[-2:]
+        header_line = head[header_offset:data_block_offset].decode(encoding, errors="replace").rstrip("\r\n")
+        return data_block_offset, header_offset, header_line
+
+    if chunk_offset is None:
+        raise exceptions.LoaderException('datablock not found')
 
-    if data_block_beginning < 0:
+    def run_starts_after(offset):
+        """the byte offset of the first line starting at or after `offset`, and if a run begins at that line"""
+        if offset <= 0:
+            fid.seek(0)
+        else:
+            fid.seek(offset - 1)
+            fid.readline()
+        line_start = fid.tell()
+        lines = b"".join(fid.readline() for _ in range(CSV_BLOCK_LINES))
+        return line_start, run_pattern.match(lines.decode(encoding, errors="replace")) is not None
+
+    good = chunk_offset
+    if not run_starts_after(good)[1]:
         raise exceptions.LoaderException('datablock not found')
 
-    if header_line_idx is None:
-        df = pd.read_csv(data, delimiter=dialect.delimiter, names=explicit_header,
-                         skiprows=data_block_beginning, header=None, skip_blank_lines=False)
-    else:
-        df = pd.read_csv(data, delimiter=dialect.delimiter,
-                         header=header_line_idx, skip_blank_lines=False)
-    df = StructuredDataFrame(df.dropna(axis="index", how="all").dropna(axis='columns', how='all'), name=name)
-    return df
+    # gallop backwards until we leave the datablock, then bisect for its first line
+    bad = 0
+    step = len(head)
+    while good - step > 0:
+        if run_starts_after(good - step)[1]:
+            good -= step
+            step *= 2
+        else:
+            bad = good - step
+            break
+
+    while good - bad > 1:
+        middle = (good + bad) // 2
+        if run_starts_after(middle)[1]:
+            good = middle
+        else:
+            bad = middle
+
+    data_block_offset = run_starts_after(good)[0]
+
+    # the searches assume that no line before the datablock looks like a data line, an incomplete row or a data-like
+    # preamble line breaks that, in which case the first run is found by scanning forward from the head
+    if _any_line_matches(fid, len(head), data_block_offset, encoding, row_pattern):
+        data_block_offset = _scan_for_run(fid, encoding, run_pattern)
+
+    # the header candidate is the line preceding the datablock, if it fits in a head-sized read
+    read_start = max(0, data_block_offset - len(head))
+    fid.seek(read_start)
+    preceding = fid.read(data_block_offset - read_start)
+    header_offset = preceding.rfind(b"\n", 0, len(preceding) - 1) + 1
+    if not preceding or (header_offset == 0 and read_start > 0):
+        return data_block_offset, None, None
+    header_line = preceding[header_offset:].decode(encoding, errors="replace").rstrip("\r\n")
+    return data_block_offset, read_start + header_offset, header_line
+
+
+def _line_blocks(fid, start, end=None, size=CSV_SMALL_FILE):
+    """read complete lines from a byte offset in blocks of about `size` bytes, yielding (offset, bytes) pairs"""
+    fid.seek(start)
+    offset = start
+    while end is None or offset < end:
+        block = fid.read(size if end is None else min(size, end - offset))
+        if not block:
+            return
+        if not block.endswith(b"\n") and (end is None or offset + len(block) < end):
+            block += fid.readline()
+        yield offset, block
+        offset += len(block)
+
+
+def _any_line_matches(fid, start, end, encoding, row_pattern):
+    """True if any line between two byte offsets at line starts matches `row_pattern`"""
+    for offset, block in _line_blocks(fid, start, end):
+        if row_pattern.search(block.decode(encoding, errors="replace")):
+            return True
+    return False
+
+
+def _scan_for_run(fid, encoding, run_pattern):
+    """the byte offset of the first line of the first run of `run_pattern` lines, scanning forward from the start of
+    the file in blocks that overlap by one line less than a run"""
+    carry = b""
+    for offset, block in _line_blocks(fid, 0):
+        block_start = offset - len(carry)
+        block = carry + block
+        text = block.decode(encoding, errors="replace")
+        match = run_pattern.search(text)
+        if match:
+            line_start = 0
+            for _ in range(text.count("\n", 0, match.start())):
+                line_start = block.index(b"\n", line_start) + 1
+            return block_start + line_start
+        carry_start = len(block)
+        for _ in range(CSV_BLOCK_LINES - 1):
+            carry_start = block.rfind(b"\n", 0, max(carry_start - 1, 0)) + 1
+            if carry_start == 0:
+                break
+        carry = block[carry_start:]
+    raise exceptions.LoaderException('datablock not found')
 
 
 def load_dftxt(fname):
@@ -271,44 +849,10 @@ def load_dftxt(fname):
         fully specified datastructure from the dftxt file
 
     """
-    header_block = []
-    data_location = None
-    data_sample = ''
-    with open(fname, 'r') as fid:
-        for line in iter(fid.readline, ''):
-            if line.isspace():
-                data_location = fid.tell()
-            elif line.startswith('#'):
-                header_block.append(line[1:])
-                data_location = fid.tell()
-            else:
-                break
-
-        if not data_location:
-            raise exceptions.IncorrectFileType()
-        try:
-            meta_data = json.loads(''.join(header_block))  # type: dict
-        except json.JSONDecodeError:
-            raise exceptions.IncorrectFileType("header is not a valid json")
-        except:
-            raise exceptions.LoaderException("error when loading JSON")
-
-        try:
-            cls_key = meta_data.pop("class")
-            file_type = meta_data.pop("file-type")
-        except KeyError:
-            raise exceptions.IncorrectFileType("df file missing required class for file-type information")
-        else:
-            try:
-                cls = structures.structures[cls_key]  # type: typing.Type[StructuredDataFrame]
-            except KeyError:
-                raise exceptions.LoaderException("df class {:s} is not supported by any known DF Structure "
-                                                 "classes".format(cls_key))
-
-        if not cls.required_metadata().issubset(meta_data):
-            raise exceptions.LoaderException("file meta-data does not match the required meta-data for the specified "
-                                             "StructuredDataFrame Structure")
+    with util.open_compressed(fname, 'r') as fid:
+        cls, meta_data, data_location = read_dftxt_header(fid)
 
+        data_sample = ''
         for i, line in enumerate(iter(fid.readline, '')):
             data_sample += line
             if i == 10:
@@ -332,25 +876,266 @@ def load_dftxt(fname):
         return df
 
 
-df_loader = Loader(load_dftxt, StructuredDataFrame, (".df"), "StructuredDataFrame text file")
-register_loaders(df_loader)
+def load_dftxt_metadata(fname):
+    """read only the metadata of a file from the `StructuredDataFrame.savetxt` method
+
+    Parameters
+    ----------
+    fname : str
+
+    Returns
+    -------
+    dict
+
+    """
+    with util.open_compressed(fname, 'r') as fid:
+        cls, meta_data, data_location = read_dftxt_header(fid)
+    meta_data["class"] = cls.__name__
+    return meta_data
+
+
+def read_dftxt_header(fid):
+    """read and validate the commented json header of a dftxt file, leaving the file at the start of the datablock
+
+    Parameters
+    ----------
+    fid : io.TextIOBase
+
+    Returns
+    -------
+    cls : typing.Type[StructuredDataFrame]
+    meta_data : dict
+    data_location : int
+
+    """
+    header_block = []
+    data_location = None
+    for line in iter(fid.readline, ''):
+        if line.isspace():
+            data_location = fid.tell()
+        elif line.startswith('#'):
+            header_block.append(line[1:])
+            data_location = fid.tell()
+        else:
+            break
+
+    if not data_location:
+        raise exceptions.IncorrectFileType()
+    try:
+        meta_data = json.loads(''.join(header_block))  # type: dict
+    except json.JSONDecodeError:
+        raise exceptions.IncorrectFileType("header is not a valid json")
+    except:
+        raise exceptions.LoaderException("error when loading JSON")
+
+    try:
+        cls_key = meta_data.pop("class")
+        file_type = meta_data.pop("file-type")
+    except KeyError:
+        raise exceptions.IncorrectFileType("df file missing required class for file-type information")
+    else:
+        try:
+            cls = structures.structures[cls_key]  # type: typing.Type[StructuredDataFrame]
+        except KeyError:
+            raise exceptions.LoaderException("df class {:s} is not supported by any known DF Structure "
+                                             "classes".format(cls_key))
+
+    if not cls.required_metadata().issubset(meta_data):
+        raise exceptions.LoaderException("file meta-data does not match the required meta-data for the specified "
+                                         "StructuredDataFrame Structure")
+
+    fid.seek(data_location)
+    return cls, meta_data, data_location
+
+
+def read_rdf_header(fid):
+    """read and validate the json header of an rdf file
+
+    Parameters
+    ----------
+    fid : io.BufferedIOBase
+
+    Returns
+    -------
+    cls : typing.Type[StructuredDataFrame]
+    header : OrderedDict
+    data_start : int
+        the byte offset of the data section
+
+    """
+    if fid.read(len(RDF_MAGIC)) != RDF_MAGIC:
+        raise exceptions.IncorrectFileType("file does not start with the rdf signature")
+    try:
+        header_length = struct.unpack("<Q", fid.read(8))[0]
+        header = json.loads(fid.read(header_length).decode("utf-8"), object_pairs_hook=OrderedDict)
+    except (struct.error, ValueError):
+        raise exceptions.LoaderException("rdf header is corrupt")
+    data_start = rdf_align(len(RDF_MAGIC) + 8 + header_length)
+
+    try:
+        cls = structures.structures[header["class"]]  # type: typing.Type[StructuredDataFrame]
+    except KeyError:
+        raise exceptions.LoaderException("df class {:s} is not supported by any known DF Structure "
+                                         "classes".format(header["class"]))
+
+    if not cls.required_metadata().issubset(header["metadata"]):
+        raise exceptions.LoaderException("file meta-data does not match the required meta-data for the specified "
+                                         "StructuredDataFrame Structure")
+    return cls, header, data_start
+
 
+def load_rdf_metadata(fname):
+    """read only the metadata of a file from the `StructuredDataFrame.save_binary` method
 
-def load_file(fname):
+    Parameters
+    ----------
+    fname : str
+
+    Returns
+    -------
+    dict
+
+    """
+    with open(fname, "rb") as fid:
+        cls, header, data_start = read_rdf_header(fid)
+    meta_data = header["metadata"]
+    meta_data["class"] = cls.__name__
+    return meta_data
+
+
+def load_rdf(fname, mmap=True):
+    """load binary files from the `StructuredDataFrame.save_binary` method
+
+    Parameters
+    ----------
+    fname : str
+    mmap : bool
+        memory-map the column arrays, so that data is only read from disk as it is accessed.  The maps are
+        copy-on-write, modifying the dataframe never modifies the file
+
+    Returns
+    -------
+    StructuredDataFrame
+        fully specified datastructure from the rdf file
+
+    """
+    with open(fname, "rb") as fid:
+        return read_rdf_record(fid, fname, mmap)
+
+
+def read_rdf_record(fid, fname, mmap=True):
+    """read the rdf record starting at the current position of an open file, see `load_rdf`
+
+    Parameters
+    ----------
+    fid : io.BufferedIOBase
+        file opened in binary mode, positioned at the start of the record
+    fname : str
+        the path of the open file, for memory-mapping
+    mmap : bool
+
+    Returns
+    -------
+    StructuredDataFrame
+
+    """
+    record_start = fid.tell()
+    cls, header, data_start = read_rdf_header(fid)
+    data_start += record_start
+    meta_data = header["metadata"]
+    length = header["length"]
+
+    def read_array(dtype, offset, shape):
+        dtype = np.dtype(dtype)
+        if length == 0:
+            return np.empty(shape, dtype=dtype)
+        elif mmap:
+            return np.memmap(fname, dtype=dtype, mode="c", offset=data_start + offset, shape=shape)
+        fid.seek(data_start + offset)
+        return np.fromfile(fid, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+    columns = header["columns"]
+    labels = [column["name"] for column in columns]
+    dtypes = set(column["dtype"] for column in columns)
+    itemsize = np.dtype(columns[0]["dtype"]).itemsize if columns else 0
+    contiguous = all(column["offset"] == columns[0]["offset"] + i * length * itemsize
+                     for i, column in enumerate(columns))
+
+    if len(dtypes) == 1 and contiguous:
+        # a single 2D block, which pandas stores without copying
+        data = read_array(columns[0]["dtype"], columns[0]["offset"], (len(columns), length)).T
+    else:
+        data = OrderedDict()
+        for label, column in zip(labels, columns):
+            data[label] = read_array(column["dtype"], column["offset"], (length,))
+
+    index = header["index"]
+    if index is not None:
+        index = read_array(index["dtype"], index["offset"], (length,))
+
+    if not cls.required_columns().issubset(labels):
+        raise exceptions.LoaderException(
+            "StructuredDataFrame Columns do not match the required columns"
+            "for the specified StructuredDataFrame Structure"
+        )
+    return cls(data, index=index, columns=labels, **meta_data)
+
+
+def probe_rdf(head_bytes):
+    return head_bytes.startswith(RDF_MAGIC)
+
+
+# not registered for any extension, load_file falls back on load_csv directly.  Used as the parse cache key
+csv_loader = Loader(load_csv, StructuredDataFrame, [], "generic csv")
+
+
+def probe_dftxt(head_bytes):
+    """recognize the json header written by `StructuredDataFrame.serialize`, in plain or compressed files"""
+    decompressed = util.decompress_head(head_bytes)
+    if decompressed is not None:
+        if len(decompressed) < 64:
+            return None  # e.g. bz2, which only decompresses whole blocks
+        head_bytes = decompressed
+    return head_bytes.startswith(b"# {") and b'"file-type": "Radie txt' in head_bytes
+
+
+df_loader = Loader(load_dftxt, StructuredDataFrame, [".df"] + list(util.COMPRESSION_EXTENSIONS.values()),
+                   "StructuredDataFrame text file", probe=probe_dftxt,
+                   metadata_function=load_dftxt_metadata)
+rdf_loader = Loader(load_rdf, StructuredDataFrame, (".rdf"), "StructuredDataFrame binary file", probe=probe_rdf,
+                    metadata_function=load_rdf_metadata)
+register_loaders(df_loader, rdf_loader)
+
+
+def load_file(fname, lazy=False):
     """the catch-all convenience function to automatically load data-files
 
-    This function is at the heart of one of the goals of Radie.  The idea is that any datafile that is supported
-    by the radie structures and loaders can be passed to this function without needing to specify anything, and the
-    proper Loader function will be determined automatically.  First a list of possible loader functions are found from
-    the file extension.  They are then tried one by one, with each inappropriate function returning None, and continuing
-    on to the next loader function.  The first time a valid StructuredDataFrame is returned, the function breaks the look and
-    returns that object.  If no valid loader function is found, we attempt to read in the file using the load_csv
-    automatic csv reader function.
+    This function is at the heart of one of the goals of Radie.  The idea is that any
+    datafile that is supported by the radie structures and loaders can be passed to this
+    function without needing to specify anything, and the proper Loader function will be
+    determined automatically.  First a list of possible loader functions are found from
+    the file extension.  The head of the file is read once and passed to the
+    `Loader.probe` functions, loaders that reject the file are skipped and loaders that
+    recognize it are tried first.  They are then tried one by one, with each inappropriate
+    function returning None, and continuing on to the next loader function.  The first
+    time a valid StructuredDataFrame is returned, the function breaks the loop and returns
+    that object.  If no valid loader function is found, we attempt to read in the file
+    using the load_csv automatic csv reader function.
+
+    If the parse cache is enabled with `enable_cache`, results are stored after parsing
+    and a repeat load of an unchanged file is read back from the cache.
+
+    With `lazy`, loaders that have a metadata function only read the header of the file
+    and return deferred StructuredDataFrames, whose metadata is populated immediately and
+    whose data is read on first access, see `Loader.load_deferred`.  Loaders without a
+    metadata function load the file as usual.
 
     Parameters
     ----------
     fname : str
         the name of the datafile
+    lazy : bool
+        defer reading the data until it is accessed
 
     Returns
     -------
@@ -366,23 +1151,42 @@ def load_file(fname):
     except KeyError:
         loaders_ = []
 
+    if loaders_:
+        loaders_ = rank_loaders(loaders_, read_head(fname))
+
+    cache = parse_cache
+    if cache is not None:
+        dfs = cache.get(fname, loaders_ + [csv_loader])
+        if dfs is not None:
+            logger.info("loaded %s from the parse cache", fname)
+            return dfs
+
     for loader in loaders_:  # type: Loader
         try:
-            dfs = loader.load(fname)
+            deferred = lazy and loader.can_defer
+            if deferred:
+                dfs = loader.load_deferred(fname)
+            else:
+                dfs = loader.load(fname)
             if isinstance(dfs, StructuredDataFrame):
-                print("successfully loaded file as {:}".format(type(dfs).__name__))
+                logger.info("loaded %s as %s", fname, type(dfs).__name__)
+                if cache is not None and not deferred:
+                    cache.put(fname, loader, dfs)
                 return dfs
             elif type(dfs) in (list, tuple):
                 df_list = [df for df in dfs if isinstance(df, StructuredDataFrame)]
                 if not df_list:
                     raise exceptions.LoaderException("function {:s} did not return any StructuredDataFrame "
                                                      "objects from file {:s}".format(loader.module, fname))
-                print("loaded {:d} dataframes from {:}".format(len(df_list), os.path.basename(fname)))
+                logger.info("loaded %d dataframes from %s", len(df_list), fname)
+                if cache is not None and not deferred:
+                    cache.put(fname, loader, df_list)
                 return df_list
             else:
                 raise exceptions.LoaderException("function {:s} did not return any StructuredDataFrame "
                                                  "objects from file {:s}".format(loader.module, fname))
         except exceptions.IncorrectFileType:
+            logger.debug("%s rejected %s", loader.label, fname)
             continue
         except exceptions.LoaderException as loader_exception:
             raise loader_exception
@@ -391,20 +1195,109 @@ def load_file(fname):
             err_msg += "\n" + "\n".join(traceback.format_exception(*sys.exc_info()))
             raise Exception(err_msg)
 
-    # no suitable loader was found, try the universal "load_csv" function
+    # no suitable loader was found, try the universal "load_csv" function, which determines the encoding itself
     try:
-        df = load_csv(fname)
+        df = csv_loader.load(fname)
+        logger.info("loaded %s as %s with the generic csv loader", fname, type(df).__name__)
+        if cache is not None:
+            cache.put(fname, csv_loader, df)
         return df
-    except ValueError:  # in case of a unicode file not loaded properly
-        try:
-            df = load_csv(fname, encoding="utf-8")
-            return df
-        except exceptions.LoaderException:
-            raise exceptions.LoaderNotFound("No loader found for the specified file")
-        except Exception as e:
-            raise e
     except exceptions.LoaderException:
         raise exceptions.LoaderNotFound("No loader found for the specified file")
     except Exception:
         raise exceptions.LoaderNotFound("load_csv failed for unexpected reason\n{:s}".format("\n".join(
             traceback.format_exception(*sys.exc_info()))))
+
+
+def expand_paths(paths_or_globs):
+    """expand a filename, a glob pattern or a list of them into a list of filenames
+
+    glob patterns are expanded in sorted order (recursively if they contain `**`), plain filenames are passed
+    through unchanged so that missing files are reported by the loader rather than silently dropped
+
+    Parameters
+    ----------
+    paths_or_globs : str or Path or list
+
+    Returns
+    -------
+    list of str
+
+    """
+    if isinstance(paths_or_globs, (str, Path)):
+        paths_or_globs = [paths_or_globs]
+
+    fnames = []
+    for path in paths_or_globs:
+        path = str(path)
+        if glob.has_magic(path):
+            fnames.extend(sorted(glob.glob(path, recursive=True)))
+        else:
+            fnames.append(path)
+    return fnames
+
+
+def _load_file_or_error(fname):
+    """worker function for `load_files`, return a (result, exception) pair instead of raising"""
+    try:
+        return load_file(fname), None
+    except Exception as e:
+        return None, e
+
+
+def load_files(paths_or_globs, workers=None, executor="process"):
+    """load many data-files in parallel using `load_file`
+
+    The files are fanned out over a pool of workers.  Results are returned in the order of the input files and
+    multi-dataset results (e.g. multi-range Bruker RAW files) are flattened into a single list.  A file that fails to
+    load does not abort the batch, its exception is collected and returned along with the filename.
+
+    Parameters
+    ----------
+    paths_or_globs : str or Path or list
+        filenames and/or glob patterns, see `expand_paths`
+    workers : int, optional
+        the number of workers, defaults to the number of processors
+    executor : str
+        "process" for a process pool, best for the cpu-bound parsers, or "thread" for a thread pool
+
+    Returns
+    -------
+    dfs : list of StructuredDataFrame
+        the loaded StructuredDataFrames, in order of the input files
+    errors : OrderedDict
+        filename: exception pairs for each file that could not be loaded
+
+    """
+    fnames = expand_paths(paths_or_globs)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(fnames)))
+
+    if executor == "process":
+        pool_class = futures.ProcessPoolExecutor
+    elif executor == "thread":
+        pool_class = futures.ThreadPoolExecutor
+    else:
+        raise ValueError('executor must be "process" or "thread", not {:}'.format(executor))
+
+    if workers == 1:
+        results = map(_load_file_or_error, fnames)
+    else:
+        # hand out files in batches to amortize the inter-process overhead on large batches
+        chunksize = max(1, len(fnames) // (workers * 4))
+        with pool_class(max_workers=workers) as pool:
+            results = list(pool.map(_load_file_or_error, fnames, chunksize=chunksize))
+
+    dfs = []
+    errors = OrderedDict()
+    for fname, (result, error) in zip(fnames, results):
+        if error is not None:
+            errors[fname] = error
+        elif isinstance(result, StructuredDataFrame):
+            dfs.append(result)
+        else:
+            dfs.extend(result)
+
+    return dfs, errors
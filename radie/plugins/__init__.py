@@ -1,8 +1,29 @@
-"""plugins package, meant for custom data-structures and file-loaders and visualizations"""
+"""plugins package, meant for custom data-structures and file-loaders and visualizations
+
+The structure and loader plugins are not imported when radie is imported.  Instead a manifest recording which plugin
+module registers each structure class and each file extension is built once, by importing every plugin, and cached
+in ~/.radie.  On later imports `radie.structures.structures` and `radie.loaders.loaders` only import a plugin the
+first time one of its structure names or extensions is looked up.  The cached manifest is rebuilt whenever a plugin
+file changes or packages are installed or removed.
+
+Third-party packages add plugins through the "radie.plugins" entry point group, each entry point naming a module that
+registers its structures and loaders when imported, e.g. in setup.py:
+
+    entry_points={"radie.plugins": ["myinstrument = mypackage.radie_plugin"]}
+
+Set the environment variable RADIE_EAGER_PLUGINS=1 to import all plugins up front as before.
+"""
 
 import os
+import sys
+import json
+import hashlib
 import pkgutil
 import importlib
+import tempfile
+import threading
+import warnings
+from collections import OrderedDict
 
 STRUCTURES_PKG_NAME = "structures"
 STRUCTURES_PKG = __package__ + "." + STRUCTURES_PKG_NAME
@@ -16,12 +37,137 @@ structures_dir = os.path.join(this_dir, STRUCTURES_PKG_NAME)
 loaders_dir = os.path.join(this_dir, LOADERS_PKG_NAME)
 visualizations_dir = os.path.join(this_dir, VISUALIZATIONS_PKG_NAME)
 
+ENTRY_POINT_GROUP = "radie.plugins"
+MANIFEST_VERSION = 1
+DISTRIBUTION_SUFFIXES = (".dist-info", ".egg-info", ".egg-link", ".pth")
+manifest_directory = os.path.join(os.path.expanduser("~"), ".radie")
+lazy_imports = os.environ.get("RADIE_EAGER_PLUGINS", "0").lower() in ("", "0", "false", "no")
+
 
 disabled_plugins = (
     "powderdiffraction_siemensD500",
 )
 
 
+class LazyRegistry(OrderedDict):
+    """an OrderedDict of registered plugin objects, where the plugin modules listed for a key by `defer` are imported
+    the first time that the key is looked up.  Importing the modules fills in the entry through the usual
+    registration functions.  Iterating over the registry, or taking its length, imports every listed module
+
+    A module is imported only after the modules listed before it for any of its keys, so that entries registered by
+    several modules, e.g. the loaders of a shared extension, are in the order of the listing whichever key is looked
+    up first.  A module stays listed until it has been imported successfully.
+
+    Lookups are safe from many threads.  The plugin modules are imported without holding `lock`, a thread looking up a
+    key whose plugin is being imported by another thread waits on the import of that module.  Registration functions
+    hold `lock` and replace entries rather than mutating them, see `registered`
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = OrderedDict()  # key: list of module names
+        self._deferred = False
+        self.lock = threading.RLock()
+
+    def defer(self, modules):
+        """
+        list the plugin modules to import on the first lookup of each key
+
+        Parameters
+        ----------
+        modules : dict
+            key: list of module names, in the order that they should register their entries
+
+        """
+        with self.lock:
+            self._deferred = True
+            for key, module_names in modules.items():
+                pending = self._pending.setdefault(key, [])
+                pending.extend(name for name in module_names if name not in pending)
+
+    def registered(self, key, default=None):
+        """the current entry of a key, without importing the plugins listed for it.  Used while registering"""
+        return OrderedDict.get(self, key, default)
+
+    def pending(self):
+        """the keys whose plugin modules have not been imported yet"""
+        with self.lock:
+            return list(self._pending.keys())
+
+    def _import_module(self, module_name, visited):
+        """import a listed module after the modules listed before it for any key"""
+        if module_name in visited:
+            return
+        visited.add(module_name)
+        with self.lock:
+            preceding = [name for names in self._pending.values() if module_name in names
+                         for name in names[:names.index(module_name)]]
+        for name in preceding:
+            self._import_module(name, visited)
+
+        importlib.import_module(module_name)
+        with self.lock:
+            for key in list(self._pending.keys()):
+                names = self._pending[key]
+                if module_name in names:
+                    names = [name for name in names if name != module_name]
+                    if names:
+                        self._pending[key] = names
+                    else:
+                        del self._pending[key]
+
+    def import_key(self, key):
+        """import the plugin modules listed for a key, if they have not been imported yet"""
+        if not self._deferred:
+            return
+        with self.lock:
+            module_names = list(self._pending.get(key, ()))
+        visited = set()
+        for module_name in module_names:
+            self._import_module(module_name, visited)
+
+    def import_all(self):
+        """import the plugin modules of every key"""
+        while True:
+            with self.lock:
+                key = next(iter(self._pending), None)
+            if key is None:
+                return
+            self.import_key(key)
+
+    def __getitem__(self, key):
+        self.import_key(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self.import_key(key)
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        self.import_key(key)
+        return super().get(key, default)
+
+    def __iter__(self):
+        self.import_all()
+        return super().__iter__()
+
+    def __len__(self):
+        self.import_all()
+        return super().__len__()
+
+    def keys(self):
+        self.import_all()
+        return super().keys()
+
+    def values(self):
+        self.import_all()
+        return super().values()
+
+    def items(self):
+        self.import_all()
+        return super().items()
+
+
 def import_structures():
     importlib.import_module(STRUCTURES_PKG)
     for finder, module_name, is_pkg in pkgutil.iter_modules([structures_dir]):
@@ -41,3 +187,188 @@ def import_visualizations():
     for finder, module_name, is_pkg in pkgutil.iter_modules([visualizations_dir]):
         if not is_pkg:
             importlib.import_module("." + module_name, VISUALZIATIONS_PKG)
+
+
+def plugin_modules():
+    """the full names of the structure and loader plugin modules shipped with radie, structures first"""
+    module_names = []
+    for package, directory in ((STRUCTURES_PKG, structures_dir), (LOADERS_PKG, loaders_dir)):
+        for finder, module_name, is_pkg in pkgutil.iter_modules([directory]):
+            if not is_pkg and module_name not in disabled_plugins:
+                module_names.append(package + "." + module_name)
+    return module_names
+
+
+def entry_point_modules():
+    """the module names of the third-party plugins declared in the "radie.plugins" entry point group"""
+    try:
+        from importlib import metadata
+    except ImportError:  # python < 3.8
+        return []
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        entry_points = entry_points.select(group=ENTRY_POINT_GROUP)
+    else:
+        entry_points = entry_points.get(ENTRY_POINT_GROUP, [])
+    return [entry_point.value.split(":")[0].strip() for entry_point in entry_points]
+
+
+def import_entry_points():
+    """import the third-party plugins, warning about those that fail to import
+
+    Returns
+    -------
+    list of str
+        the modules that were imported
+
+    """
+    imported = []
+    for module_name in entry_point_modules():
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            warnings.warn("could not import radie plugin {:s}: {:s}".format(module_name, str(e)))
+            continue
+        imported.append(module_name)
+    return imported
+
+
+def manifest_fingerprint():
+    """identify the installed plugins by the size and modification time of the plugin files and by the installed
+    distributions, which is where entry points are declared
+
+    Returns
+    -------
+    str
+
+    """
+    stamps = [MANIFEST_VERSION, this_dir, list(disabled_plugins)]
+    for directory in (structures_dir, loaders_dir):
+        for entry in sorted(os.scandir(directory), key=lambda entry: entry.name):
+            if entry.name.endswith(".py"):
+                stat = entry.stat()
+                stamps.append([entry.name, stat.st_size, stat.st_mtime_ns])
+    for path in sys.path:
+        if os.path.basename(path) not in ("site-packages", "dist-packages"):
+            continue  # skip the working directory and the script directory, which change all the time
+        try:
+            stamps.append([path, sorted(name for name in os.listdir(path) if name.endswith(DISTRIBUTION_SUFFIXES))])
+        except OSError:
+            continue
+    return hashlib.sha1(json.dumps(stamps).encode()).hexdigest()
+
+
+def manifest_path():
+    """the cache file of the manifest, one per radie installation"""
+    install_id = hashlib.sha1(this_dir.encode()).hexdigest()[:12]
+    return os.path.join(manifest_directory, "plugins-{:s}.json".format(install_id))
+
+
+def build_manifest():
+    """
+    import every plugin and record the structure classes and file extensions that each one registers.  Plugins that
+    are already imported register nothing new, so this is meant to run once, before any plugin is imported
+
+    Returns
+    -------
+    OrderedDict
+        "structures": {structure name: [module name]}, "loaders": {extension: [module names]}
+
+    """
+    from .. import structures, loaders
+
+    manifest = OrderedDict((("structures", OrderedDict()), ("loaders", OrderedDict())))
+    importlib.import_module(STRUCTURES_PKG)
+    importlib.import_module(LOADERS_PKG)
+
+    def register(module_name):
+        registered_structures = set(structures.structures.keys())
+        registered_loaders = {ext: len(loaders_) for ext, loaders_ in loaders.loaders.items()}
+        importlib.import_module(module_name)
+        for name in structures.structures.keys():
+            if name not in registered_structures:
+                manifest["structures"].setdefault(name, []).append(module_name)
+        for ext, loaders_ in loaders.loaders.items():
+            if len(loaders_) > registered_loaders.get(ext, 0):
+                manifest["loaders"].setdefault(ext, []).append(module_name)
+
+    for module_name in plugin_modules():
+        register(module_name)
+    for module_name in entry_point_modules():
+        try:
+            register(module_name)
+        except Exception as e:
+            warnings.warn("could not import radie plugin {:s}: {:s}".format(module_name, str(e)))
+    return manifest
+
+
+def read_manifest(fingerprint):
+    """the cached manifest, or None if there is none or it was built for different plugins"""
+    try:
+        with open(manifest_path(), "r") as fid:
+            cached = json.load(fid, object_pairs_hook=OrderedDict)
+    except (OSError, ValueError):
+        return None
+    if cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("manifest")
+
+
+def write_manifest(manifest, fingerprint):
+    """cache a manifest, silently giving up if the directory is not writable"""
+    path = manifest_path()
+    contents = OrderedDict((("fingerprint", fingerprint), ("manifest", manifest)))
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fid, tmp_path = tempfile.mkstemp(suffix=".json", dir=os.path.dirname(path))
+    except OSError:
+        return False
+    try:
+        with os.fdopen(fid, "w") as tmp:
+            json.dump(contents, tmp, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    return True
+
+
+def clear_manifest():
+    """remove the cached manifest, so that it is rebuilt the next time radie is imported"""
+    try:
+        os.remove(manifest_path())
+    except FileNotFoundError:
+        pass
+
+
+def import_plugins(lazy=None):
+    """
+    make the structure and loader plugins, and the third-party plugins of the "radie.plugins" entry point group,
+    available.  Called when radie is imported
+
+    Parameters
+    ----------
+    lazy : bool, optional
+        defer importing each plugin until one of its structures or extensions is looked up, using the cached manifest.
+        By default lazy unless the environment variable RADIE_EAGER_PLUGINS is set
+
+    """
+    from .. import structures, loaders
+
+    if lazy is None:
+        lazy = lazy_imports
+    if not lazy:
+        import_structures()
+        import_loaders()
+        import_entry_points()
+        return
+
+    fingerprint = manifest_fingerprint()
+    manifest = read_manifest(fingerprint)
+    if manifest is None:
+        write_manifest(build_manifest(), fingerprint)  # every plugin is imported while building
+        return
+    structures.structures.defer(manifest["structures"])
+    loaders.loaders.defer(manifest["loaders"])
@@ -7,6 +7,9 @@ from radie.loaders import Loader, register_loaders
 from radie.plugins.structures.powderdiffraction import PowderDiffraction
 
 
+RAW_FILE_STATUS_ACTIVE = 2
+
+
 def raw_check_version(f):
     """
 
@@ -32,6 +35,34 @@ def raw_check_version(f):
     return version
 
 
+def probe_raw(head_bytes):
+    """only version 1.01 RAW files are supported, identified by the file signature"""
+    return head_bytes.startswith(b"RAW1.01")
+
+
+def raw_file_done(fname):
+    """
+    check the file status in the header of a RAW file, which is "active" while the measurement is running.  Used by
+    `radie.watcher` to wait for the diffractometer to finish writing the file
+
+    Parameters
+    ----------
+    fname : str
+
+    Returns
+    -------
+    bool
+
+    """
+    with open(fname, 'rb') as f:
+        head = f.read(12)
+    if len(head) < 12:
+        return False  # the header has not been written yet
+    if not head.startswith(b"RAW1.01"):
+        return True  # no file status in other versions
+    return struct.unpack('<i', head[8:12])[0] != RAW_FILE_STATUS_ACTIVE
+
+
 def load_raw(fname, name=None):
     """
     .raw file output from Bruker XRD.  Tested with files from Bruker D8
@@ -61,6 +92,38 @@ def load_raw(fname, name=None):
         else:
             raise exceptions.IncorrectFileType
 
+    return _single_or_list(dfs)
+
+
+def load_raw_metadata(fname, name=None):
+    """
+    read only the metadata of a .raw file from Bruker XRD, skipping over the data of each range
+
+    Parameters
+    ----------
+    fname : str
+        filename
+    name : str
+        measurement identifier
+
+    Returns
+    -------
+    dict or list of dict
+        the metadata for each PowderDiffraction that `load_raw` returns
+
+    """
+    with open(fname, 'rb') as f:
+        version = raw_check_version(f)
+        if version == 'ver. 3':
+            metadata = load_raw_version1_01(f, name=name, read_data=False)
+        else:
+            raise exceptions.IncorrectFileType
+
+    return _single_or_list(metadata)
+
+
+def _single_or_list(dfs):
+    """return the only range of a file by itself, or the list of ranges if there is more than one"""
     if isinstance(dfs, PowderDiffraction) or type(dfs) in (list, tuple):
         if len(dfs) == 0:
             raise IOError('Unable to read scan from file')
@@ -88,7 +151,7 @@ def read_str(f, len):
     return f.read(len).decode('utf-8').rstrip('\x00')
 
 
-def load_raw_version1_01(f, name=None):
+def load_raw_version1_01(f, name=None, read_data=True):
     """
     Read a file object pointing to a Bruker RAW file of version 1.01
     Since RAW files can contain more than one scan (or range) a
@@ -97,10 +160,14 @@ def load_raw_version1_01(f, name=None):
     Parameters
     ----------
     f : file object
+    name : str
+        measurement identifier
+    read_data : bool
+        if False, skip over the data and return the PowderDiffraction metadata of each range instead
 
     Returns
     -------
-    dfs : list of PowderDiffraction objects
+    dfs : list of PowderDiffraction objects, or list of dict if read_data is False
     """
     meta = {}
     meta["format version"] = "3"
@@ -110,7 +177,7 @@ def load_raw_version1_01(f, name=None):
 
     if file_status == 1:
         meta["file status"] = "done"
-    elif file_status == 2:
+    elif file_status == RAW_FILE_STATUS_ACTIVE:
         meta["file status"] = "active"
     elif file_status == 3:
         meta["file status"] = "aborted"
@@ -244,6 +311,24 @@ def load_raw_version1_01(f, name=None):
         # blk->add_column(xcol);
         # VecColumn * ycol = new VecColumn;
 
+        df_meta = meta.copy()
+        if meta["ANODE_MATERIAL"].startswith('Cu'):
+            source = 'CuKa'
+        else:
+            raise ValueError("Unimplemented Anode Material {}".format(meta["ANODE_MATERIAL"]))
+        pd_meta = dict(wavelength=df_meta['ALPHA_AVERAGE'],
+                       source=source,
+                       xunit="deg",
+                       yunit="counts",
+                       name=df_meta["name"],
+                       date=df_meta["date"],
+                       metadata=df_meta)
+
+        if not read_data:
+            f.seek(steps * 4, 1)
+            dfs.append(pd_meta)
+            continue
+
         xcol = np.array(range(steps)) * step_size + start_2theta
         ycol = []
         for i in range(steps):
@@ -251,27 +336,17 @@ def load_raw_version1_01(f, name=None):
         ycol = np.array(ycol)
 
         data = np.c_[xcol, ycol]
-        df_meta = meta.copy()
-        if meta["ANODE_MATERIAL"].startswith('Cu'):
-            source = 'CuKa'
-        else:
-            raise ValueError("Unimplemented Anode Material {}".format(meta["ANODE_MATERIAL"]))
         df_xrd = PowderDiffraction(data=data,
                                    columns=['twotheta', 'intensity'],
-                                   wavelength=df_meta['ALPHA_AVERAGE'],
-                                   source=source,
-                                   xunit="deg",
-                                   yunit="counts",
-                                   name=df_meta["name"],
-                                   date=df_meta["date"],
-                                   metadata=df_meta)
+                                   **pd_meta)
 
         dfs.append(df_xrd)
 
     return dfs
 
 
-bruker_raw_loader = Loader(load_raw, PowderDiffraction, [".raw"], "Bruker RAW XRD")
+bruker_raw_loader = Loader(load_raw, PowderDiffraction, [".raw"], "Bruker RAW XRD", probe=probe_raw,
+                           metadata_function=load_raw_metadata, completion_check=raw_file_done)
 
 register_loaders(
     bruker_raw_loader,
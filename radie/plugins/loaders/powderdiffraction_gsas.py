@@ -59,6 +59,66 @@ def parse_gsas_header(fid):
     return headers, wavelength, first_data_line, bank_line
 
 
+def probe_gsas(head_bytes):
+    """check for the GSAS header structure: a title line, comment lines starting with "#" and then the BANK line
+
+    Returns
+    -------
+    bool or None
+        None if the header runs past the end of `head_bytes`
+
+    """
+    try:
+        text = head_bytes.decode()
+    except UnicodeDecodeError:
+        # the head may end in the middle of a multi-byte character
+        try:
+            text = head_bytes[:-3].decode()
+        except UnicodeDecodeError:
+            return False
+
+    lines = text.splitlines()[1:-1]  # skip the title line and the possibly incomplete last line
+    for line in lines:
+        if line.startswith("BANK"):
+            return True
+        elif not line.startswith("#"):
+            return False
+    return None
+
+
+def gsas_metadata(fname, **metadata):
+    """read the PowderDiffraction metadata from the header of a GSAS-type file
+
+    Parameters
+    ----------
+    fname : str
+    metadata
+        additional metadata for the specific format
+
+    Returns
+    -------
+    dict
+
+    """
+    with open(fname, "r") as fid:
+        headers, wavelength, first_data_line, bank_line = parse_gsas_header(fid)
+
+    name = headers.get("User sample name", None)
+    if not name:
+        name = os.path.basename(fname)
+
+    metadata.update(name=name, wavelength=wavelength)
+    return metadata
+
+
+def load_fxye_metadata(fname):
+    return gsas_metadata(fname, source="undefined")
+
+
+def load_raw_metadata(fname):
+    return gsas_metadata(fname)
+
+
 def load_fxye(fname):
     """.fxye is an Argonne National Labs made file format for powder diffraction that is GSAS compatible
 
@@ -102,9 +162,9 @@ def load_fxye(fname):
 
     try:
         df = pd.read_csv(fname, header=None, delimiter=" ", skiprows=first_data_line)
-        df.dropna(axis=("index", "columns"), how="all", inplace=True)
+        df = df.dropna(axis="index", how="all").dropna(axis="columns", how="all")
     except Exception:
-        raise exceptions.IncorrectFileType("\n".join(traceback.format_exception(sys.exc_info())))
+        raise exceptions.IncorrectFileType("\n".join(traceback.format_exception(*sys.exc_info())))
 
     if not len(df.columns) == 3:
         raise exceptions.IncorrectFileType
@@ -134,7 +194,7 @@ def load_raw(fname):
         except Exception:
             raise exceptions.IncorrectFileType
 
-        arr = pd.read_csv(fid, header=None, delim_whitespace=True).values.flatten()[:num_points * 2]
+        arr = pd.read_csv(fid, header=None, sep=r"\s+").values.flatten()[:num_points * 2]
 
     angle_stop = angle_start + angle_step * (num_points - 1)
 
@@ -154,8 +214,10 @@ def load_raw(fname):
     )
 
 
-fxye_loader = loaders.Loader(load_fxye, powderdiffraction.PowderDiffraction, (".fxye"), "GSAS .fxye")
+fxye_loader = loaders.Loader(load_fxye, powderdiffraction.PowderDiffraction, (".fxye"), "GSAS .fxye",
+                             probe=probe_gsas, metadata_function=load_fxye_metadata)
 gsas_loader = loaders.Loader(load_raw, powderdiffraction.PowderDiffraction,
-                             (".raw", ".gsas", ".gsa", ".gs"), "GSAS raw")
+                             (".raw", ".gsas", ".gsa", ".gs"), "GSAS raw", probe=probe_gsas,
+                             metadata_function=load_raw_metadata)
 
 loaders.register_loaders(fxye_loader, gsas_loader)
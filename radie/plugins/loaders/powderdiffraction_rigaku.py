@@ -1,5 +1,6 @@
 """define loader objects that return PowderDiffraction Data Structures"""
 import io
+import itertools
 import math
 
 import numpy as np
@@ -26,6 +27,14 @@ def asc_meta_value(line: str, return_type: type=str):
         return return_type(val)
 
 
+def probe_asc(head_bytes):
+    return head_bytes.startswith(b"*TYPE")
+
+
+def probe_ras(head_bytes):
+    return b"*RAS_" in head_bytes
+
+
 def load_asc(fname, name=None):
     """
     .ras file output from Rigaku XRD.  Tested with files from MiniFlex system, which seem to be bytes-like
@@ -84,27 +93,21 @@ def load_asc(fname, name=None):
     )
 
 
-def load_ras(fname, name=None):
+def read_ras_header(fid):
     """
-    .ras file output from Rigaku XRD.  Tested with files from MiniFlex system, which seem to be bytes-like
+    read the header lines of a .ras file up to the start of the intensity data, leaving the file at the data
 
     Parameters
     ----------
-    fname : str
-        filename
-    name : str
-        measurement identifier
+    fid : io.BufferedIOBase
+        .ras file opened in binary mode
 
     Returns
     -------
-    df_xrd : PowderDiffraction
-        PowderDiffraction StructuredDataFrame based on XRD data
+    header : dict
+        wavelength, sample_name, start, stop and step of the scan
 
     """
-
-    with open(fname, "rb") as fid:
-        lines = fid.readlines()
-
     wavelength = None  # type: float
     wavelength1 = None  # type: float
     wavelength2 = None  # type: float
@@ -112,9 +115,9 @@ def load_ras(fname, name=None):
     start = None  # type: float
     stop = None  # type: float
     step = None  # type: int
-    data_start = 0
+    data_start = False
 
-    for i, line in enumerate(lines):
+    for line in fid:
         if line.startswith(b"*HW_XG_WAVE_LENGTH_ALPHA1 "):
             wavelength1 = ras_meta_value(line, float)
         elif line.startswith(b"*HW_XG_WAVE_LENGTH_ALPHA2 "):
@@ -128,7 +131,7 @@ def load_ras(fname, name=None):
         elif line.startswith(b"*MEAS_SCAN_STOP "):
             stop = ras_meta_value(line, float)
         elif line.startswith(b"*RAS_INT_START"):
-            data_start = i + 1
+            data_start = True
             break
 
     if (
@@ -136,7 +139,7 @@ def load_ras(fname, name=None):
         start is None or
         stop is None or
         step is None or
-        data_start == 0
+        not data_start
     ):
         raise exceptions.IncorrectFileType
 
@@ -145,28 +148,66 @@ def load_ras(fname, name=None):
     else:
         wavelength = wavelength1
 
-    n_points = int((stop - start) / step + 1)
-    data_stop = data_start + n_points
-    data_lines = [line.strip().decode("ascii") for line in lines[data_start:data_stop]]
+    return dict(wavelength=wavelength, sample_name=sample_name, start=start, stop=stop, step=step)
+
+
+def ras_metadata(header, name=None):
+    """the PowderDiffraction metadata from the output of `read_ras_header`"""
+    return dict(name=name if name else header["sample_name"],
+                wavelength=header["wavelength"],
+                source="CuKa",
+                xunit="deg",
+                yunit="counts")
 
-    data = "\n".join(data_lines)
 
-    if not name:
-        name = sample_name
+def load_ras(fname, name=None):
+    """
+    .ras file output from Rigaku XRD.  Tested with files from MiniFlex system, which seem to be bytes-like
+
+    Parameters
+    ----------
+    fname : str
+        filename
+    name : str
+        measurement identifier
+
+    Returns
+    -------
+    df_xrd : PowderDiffraction
+        PowderDiffraction StructuredDataFrame based on XRD data
+
+    """
+
+    with open(fname, "rb") as fid:
+        header = read_ras_header(fid)
+        n_points = int(round((header["stop"] - header["start"]) / header["step"])) + 1
+        data_lines = [line.strip().decode("ascii") for line in itertools.islice(fid, n_points)]
+
+    data = "\n".join(data_lines)
 
     data_buff = io.StringIO("twotheta intensity uncertainty\n" + data)
-    df_xrd = PowderDiffraction(pd.read_csv(data_buff, sep=" "),
-                               name=name,
-                               wavelength=wavelength,
-                               source="CuKa",
-                               xunit="deg",
-                               yunit="counts")
+    df_xrd = PowderDiffraction(pd.read_csv(data_buff, sep=" "), **ras_metadata(header, name))
 
     return df_xrd
 
 
-rigaku_ras_loader = Loader(load_ras, PowderDiffraction, [".ras"], "Rigaku XRD")
-rigaku_asc_loader = Loader(load_asc, PowderDiffraction, [".asc"], "Rigaku XRD")
+def load_ras_metadata(fname, name=None):
+    """
+    read only the metadata of a .ras file, see `load_ras`
+
+    Returns
+    -------
+    dict
+
+    """
+    with open(fname, "rb") as fid:
+        header = read_ras_header(fid)
+    return ras_metadata(header, name)
+
+
+rigaku_ras_loader = Loader(load_ras, PowderDiffraction, [".ras"], "Rigaku XRD", probe=probe_ras,
+                           metadata_function=load_ras_metadata)
+rigaku_asc_loader = Loader(load_asc, PowderDiffraction, [".asc"], "Rigaku XRD", probe=probe_asc)
 
 register_loaders(
     rigaku_ras_loader,
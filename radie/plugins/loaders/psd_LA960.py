@@ -128,20 +128,11 @@ class RegexParameter(Parameter):
         return self['value']
 
 
-def load_csv(fname):
-    """
-
-    Parameters
-    ----------
-    fname : file path
+def probe_csv(head_bytes):
+    return head_bytes.startswith(b"Median size")
 
-    Returns
-    -------
-    df_psd : PSD
-        PSD StructuredDataFrame
-    """
 
-    starting_lines = [
+STARTING_LINES = [
     "Median size",
     "Mean size",
     "Variance",
@@ -155,17 +146,36 @@ def load_csv(fname):
     "D90",
     "D(v,0.1)",
     "D(v,0.5)",
-    "D(v,0.9)",]
+    "D(v,0.9)",
+]
 
+
+def read_header(reader):
+    """
+    read the header of an LA-960 csv file up to and including the diameter line that starts the datablock
+
+    Parameters
+    ----------
+    reader : io.TextIOBase
+
+    Returns
+    -------
+    metadata : dict
+        the PSD metadata
+    delimiter : str
+    """
     # Open while checking for expected format,
     # Want to fail as fast as possible
     lines = []
-    with open(fname, "r") as reader:
-        for i, line in enumerate(reader):
-            if i < len(starting_lines):
-                if not line.startswith(starting_lines[i]):
-                    raise exceptions.IncorrectFileType()
-            lines.append(line)
+    for i, line in enumerate(reader):
+        if i < len(STARTING_LINES):
+            if not line.startswith(STARTING_LINES[i]):
+                raise exceptions.IncorrectFileType()
+        if line.strip().startswith('Diameter (\xb5m)'):
+            break
+        lines.append(line)
+    else:
+        raise exceptions.IncorrectFileType("could not find the diameter line")
 
     # The Horiba can output with a user defined delimiter character
     # commas and tabs are currently supported
@@ -183,8 +193,7 @@ def load_csv(fname):
 
     lines = [line.strip() for line in lines]
 
-    while not lines[0].startswith('Diameter (\xb5m)'):
-        line = lines.pop(0)
+    for line in lines:
         for k, p in parameters.items():
             if line.startswith(p['key']):
                 try:
@@ -201,7 +210,25 @@ def load_csv(fname):
         metadata[k] = p['value']
     metadata['name'] = parameters['sample']['value']
 
-    lines.pop(0)
+    return metadata, delimiter
+
+
+def load_csv(fname):
+    """
+
+    Parameters
+    ----------
+    fname : file path
+
+    Returns
+    -------
+    df_psd : PSD
+        PSD StructuredDataFrame
+    """
+    with open(fname, "r") as reader:
+        metadata, delimiter = read_header(reader)
+        lines = [line.strip() for line in reader]
+
     # The last two lines are blank/null values
     data = np.array([[float(x) for x in line.split(delimiter)] for line in lines[:-2]])
 
@@ -210,7 +237,15 @@ def load_csv(fname):
                  **metadata)
     return df_psd
 
-LA960_csv_loader = Loader(load_csv, PSD, [".csv"], "Horiba LA-960")
+
+def load_csv_metadata(fname):
+    """read only the metadata of an LA-960 csv file, see `load_csv`"""
+    with open(fname, "r") as reader:
+        metadata, delimiter = read_header(reader)
+    return metadata
+
+LA960_csv_loader = Loader(load_csv, PSD, [".csv"], "Horiba LA-960", probe=probe_csv,
+                          metadata_function=load_csv_metadata)
 
 register_loaders(
     LA960_csv_loader,
@@ -41,6 +41,50 @@ def convert_units(unit, x):
         return unit, x
 
 
+def probe_ta_instrument(head_bytes, instrument):
+    """check the "Instrument" line of the utf-16 header of a TA Instruments file
+
+    Parameters
+    ----------
+    head_bytes : bytes
+        the head of the file
+    instrument : str
+        the start of the expected instrument value, e.g. "TGA Q500"
+
+    Returns
+    -------
+    bool or None
+        None if the instrument line is not found and the header continues past the end of `head_bytes`
+
+    """
+    header_end = 0
+    while True:
+        header_end = head_bytes.find(b'\x0c\x00', header_end)
+        if header_end < 0 or header_end % 2 == 0:
+            break
+        header_end += 1  # match is not aligned to a utf-16 character
+
+    header_complete = header_end >= 0
+    if not header_complete:
+        header_end = len(head_bytes) - len(head_bytes) % 2
+
+    header_text = head_bytes[:header_end].decode('utf-16', errors='ignore')
+    for line in header_text.split('\r\n'):
+        items = line.split()
+        if len(items) > 1 and items[0].startswith("Instrument"):
+            return ' '.join(items[1:]).startswith(instrument)
+
+    return False if header_complete else None
+
+
+def probe_q2000(head_bytes):
+    return probe_ta_instrument(head_bytes, "DSC Q2000")
+
+
+def probe_q500(head_bytes):
+    return probe_ta_instrument(head_bytes, "TGA Q500")
+
+
 def load_ta_instruments(fname, required_keys=None, required_kvs=None):
     """
     It appears most TA instruments raw files share a fairly common data structures
@@ -71,48 +115,7 @@ def load_ta_instruments(fname, required_keys=None, required_kvs=None):
 
     results = []
     with open(fname, "rb") as f:
-        # Need to read by two or else utf-16 might return an error
-        header_byte_string = b''
-        while True:
-            s = f.read(2)
-            if s == b'\x0c\x00' or s == b'':
-                break
-            header_byte_string += s
-
-        header_text = header_byte_string.decode('utf-16')
-        lines = header_text.split('\r\n')
-
-        if required_keys is not None:
-            founds = [False] * len(required_keys)
-            for i,required_key in enumerate(required_keys):
-                for line in lines:
-                    if line.startswith(required_key):
-                        founds[i] = True
-                        break
-
-            if not all(founds):
-                raise exceptions.IncorrectFileType
-
-        if required_kvs is not None:
-            founds = [False] * len(required_kvs)
-            for i,(req_key, req_val) in enumerate(required_kvs.items()):
-                for line in lines:
-                    items = [x.strip() for x in line.split()]
-                    if len(items) > 1:
-                        key = items[0]
-                        val = ' '.join(items[1:])
-                        if key.startswith(req_key) and val.startswith(req_val):
-                            founds[i] = True
-                            break
-
-            if not all(founds):
-                raise exceptions.IncorrectFileType
-
-        raw_column_headers = [s for s in lines if s.startswith('Sig')]
-
-        # If no signals were found returns None
-        if not raw_column_headers:
-            raise exceptions.IncorrectFileType
+        lines, raw_column_headers = read_ta_header(f, required_keys, required_kvs)
 
         # After the b'\x0c\x00' there is a \x05 pad
         f.read(1)
@@ -142,7 +145,109 @@ def load_ta_instruments(fname, required_keys=None, required_kvs=None):
 
     results = np.array(results)
 
-    # Convert the header into metadata
+    metadata, column_units = ta_header_metadata(lines, raw_column_headers)
+
+    # The TA Instruments default units seem to already be fine but convert just in case
+    # Note that convert_units will return input if unable to convert
+    for i, unit in enumerate(column_units):
+        column_units[i], results[:,i] = convert_units(unit, results[:,i])
+    metadata['units'] = column_units
+
+    return metadata, results
+
+
+def load_ta_instruments_metadata(fname, required_keys=None, required_kvs=None):
+    """
+    read only the header of a TA instruments raw file, see `load_ta_instruments`
+
+    Returns
+    -------
+    metadata : dict
+        the same metadata returned by `load_ta_instruments`
+    """
+    with open(fname, "rb") as f:
+        lines, raw_column_headers = read_ta_header(f, required_keys, required_kvs)
+
+    metadata, column_units = ta_header_metadata(lines, raw_column_headers)
+    metadata['units'] = [convert_units(unit, 0.)[0] for unit in column_units]
+    return metadata
+
+
+def read_ta_header(f, required_keys=None, required_kvs=None):
+    """
+    read and validate the utf-16 header of a TA instruments raw file, leaving the file at the end of the header
+
+    Parameters
+    ----------
+    f : file object
+    required_keys : list
+    required_kvs : dict
+        see `load_ta_instruments`
+
+    Returns
+    -------
+    lines : list of str
+        the header lines
+    raw_column_headers : list of str
+        the lines describing the signals, i.e. the data columns
+    """
+    # Need to read by two or else utf-16 might return an error
+    header_byte_string = b''
+    while True:
+        s = f.read(2)
+        if s == b'\x0c\x00' or s == b'':
+            break
+        header_byte_string += s
+
+    header_text = header_byte_string.decode('utf-16')
+    lines = header_text.split('\r\n')
+
+    if required_keys is not None:
+        founds = [False] * len(required_keys)
+        for i,required_key in enumerate(required_keys):
+            for line in lines:
+                if line.startswith(required_key):
+                    founds[i] = True
+                    break
+
+        if not all(founds):
+            raise exceptions.IncorrectFileType
+
+    if required_kvs is not None:
+        founds = [False] * len(required_kvs)
+        for i,(req_key, req_val) in enumerate(required_kvs.items()):
+            for line in lines:
+                items = [x.strip() for x in line.split()]
+                if len(items) > 1:
+                    key = items[0]
+                    val = ' '.join(items[1:])
+                    if key.startswith(req_key) and val.startswith(req_val):
+                        founds[i] = True
+                        break
+
+        if not all(founds):
+            raise exceptions.IncorrectFileType
+
+    raw_column_headers = [s for s in lines if s.startswith('Sig')]
+
+    # If no signals were found returns None
+    if not raw_column_headers:
+        raise exceptions.IncorrectFileType
+
+    return lines, raw_column_headers
+
+
+def ta_header_metadata(lines, raw_column_headers):
+    """
+    convert the header lines of a TA instruments raw file into metadata
+
+    Returns
+    -------
+    metadata : dict
+        the header key-value pairs, the sample name and the column names
+    column_units : list of str
+        the units of each column as given in the header
+    """
     metadata = {}
     for line in lines:
         items = [x.strip() for x in line.split()]
@@ -163,15 +268,9 @@ def load_ta_instruments(fname, required_keys=None, required_kvs=None):
             head = metadata[key]
             columns.append(' '.join(head.split()[:-1]).lower())
             column_units.append(head.split()[-1][1:-1])
-
-    # The TA Instruments default units seem to already be fine but convert just in case
-    # Note that convert_units will return input if unable to convert
-    for i, unit in enumerate(column_units):
-        column_units[i], results[:,i] = convert_units(unit, results[:,i])
     metadata['columns'] = columns
-    metadata['units'] = column_units
 
-    return metadata, results
+    return metadata, column_units
 
 
 def load_dsc(fname):
@@ -191,23 +290,35 @@ def load_dsc(fname):
         raise exceptions.IncorrectFileType
 
     metadata, results = ta_out
+    dsc_metadata(metadata)
+
+    columns = metadata.pop('columns')
+    underscored_columns = [s.lower().replace(' ', '_') for s in columns]
+    df_dsc = DSC(data=results, columns=underscored_columns,
+                 **metadata)
+    return df_dsc
 
-    # Header typically reports the sample mass under the keyword "Size"
+
+def dsc_metadata(metadata):
+    """add the sample mass to the metadata, the header typically reports it under the keyword "Size" """
     size = metadata.get('Size')
     try:
         elements = size.split()
         metadata['mass'] = convert_units(elements[1], float(elements[0]))[1]
     except (AttributeError, ValueError, IndexError):
         metadata['mass'] = 1
+    return metadata
 
-    columns = metadata.pop('columns')
-    underscored_columns = [s.lower().replace(' ', '_') for s in columns]
-    df_dsc = DSC(data=results, columns=underscored_columns,
-                 **metadata)
-    return df_dsc
 
+def load_dsc_metadata(fname):
+    """read only the metadata of a DSC Q2000 file, see `load_dsc`"""
+    metadata = dsc_metadata(load_ta_instruments_metadata(fname, required_kvs={"Instrument": "DSC Q2000"}))
+    metadata.pop('columns')
+    return metadata
 
-TA_Q2000_loader = Loader(load_dsc, DSC, [".001", ".002", ".003"], "TA Instruments Q2000")
+
+TA_Q2000_loader = Loader(load_dsc, DSC, [".001", ".002", ".003"], "TA Instruments Q2000", probe=probe_q2000,
+                         metadata_function=load_dsc_metadata)
 
 
 def load_tga(fname):
@@ -235,7 +346,15 @@ def load_tga(fname):
     return df_tga
 
 
-TA_Q500_loader = Loader(load_tga, TGA, [".001", ".002", ".003"], "TA Instruments Q500")
+def load_tga_metadata(fname):
+    """read only the metadata of a TGA Q500 file, see `load_tga`"""
+    metadata = load_ta_instruments_metadata(fname, required_kvs={"Instrument": "TGA Q500"})
+    metadata.pop('columns')
+    return metadata
+
+
+TA_Q500_loader = Loader(load_tga, TGA, [".001", ".002", ".003"], "TA Instruments Q500", probe=probe_q500,
+                        metadata_function=load_tga_metadata)
 
 register_loaders(
     TA_Q500_loader, TA_Q2000_loader,
@@ -48,6 +48,17 @@ def load_ideavsm_dat(fname):
     return VSM(df, name=name, date=None)
 
 
+def probe_ideavsm_dat(head_bytes):
+    """the data section may be far from the head of the file, so only reject binary files"""
+    if b"\x00" in head_bytes:
+        return False
+    return None
+
+
+def probe_ideavsm_txt(head_bytes):
+    return head_bytes.startswith(b"Start Time: ") and b"Sample ID: " in head_bytes
+
+
 def load_ideavsm_txt(fname):
     """"simple moment v. Field Output from Lakeshore Idea"""
 
@@ -76,8 +87,10 @@ def load_ideavsm_txt(fname):
     return df_vsm
 
 
-lakeshore_ideas_vsm_dat = Loader(load_ideavsm_dat, VSM, [".dat"], "Lakeshore IDEAs VSM (.dat)")
-lakeshore_ideas_vsm_txt = Loader(load_ideavsm_txt, VSM, [".txt"], "Lakeshore IDEAs VSM (.txt)")
+lakeshore_ideas_vsm_dat = Loader(load_ideavsm_dat, VSM, [".dat"], "Lakeshore IDEAs VSM (.dat)",
+                                 probe=probe_ideavsm_dat)
+lakeshore_ideas_vsm_txt = Loader(load_ideavsm_txt, VSM, [".txt"], "Lakeshore IDEAs VSM (.txt)",
+                                 probe=probe_ideavsm_txt)
 
 register_loaders(
     lakeshore_ideas_vsm_dat,
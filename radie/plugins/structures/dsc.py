@@ -1,5 +1,6 @@
 from collections import OrderedDict
 from radie.structures import StructuredDataFrame, register_data_structures
+from radie.structures.structureddataframe import column_property
 
 
 class DSC(StructuredDataFrame):
@@ -25,7 +26,7 @@ class DSC(StructuredDataFrame):
     ))
     _column_properties = ["norm_heat_flow"]
 
-    @property
+    @column_property(columns=["heat_flow"], metadata=["mass"])
     def norm_heat_flow(self):
         """Normalize the heat flow using the mass found in metadata"""
         return self.heat_flow/self.metadata['mass']
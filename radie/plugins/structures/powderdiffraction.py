@@ -2,6 +2,7 @@ import numpy as np
 from collections import OrderedDict
 
 from radie.structures import StructuredDataFrame, register_data_structures
+from radie.structures.structureddataframe import column_property
 
 CuKa1 = 1.5405980  # angstroms
 CuKa2 = 1.5444260  # angstroms
@@ -122,7 +123,7 @@ class PowderDiffraction(StructuredDataFrame):
     ))
     _column_properties = ["Q", "d_spacing"]
 
-    @property
+    @column_property(columns=["twotheta"], metadata=["wavelength"])
     def Q(self):
         """return Q, the length of the reciprocal lattice vector"""
         if self.metadata["wavelength"] is None:
@@ -134,7 +135,7 @@ class PowderDiffraction(StructuredDataFrame):
     def twotheta_at_wavelength(self, wavelength):
         return convert_wavelength(self.metadata["wavelength"], wavelength, self.twotheta)
 
-    @property
+    @column_property(columns=["twotheta"], metadata=["wavelength"])
     def d_spacing(self):
         """return d-spacing calculated from n=1 in the Bragg equation n * lambda = 2 * d sin(theta)"""
         if self.metadata["wavelength"] is None:
@@ -0,0 +1,376 @@
+"""peak search on powder diffraction patterns, vectorized over a stack of patterns
+
+The patterns are processed as one 2D array with a row per pattern: a background from a rolling minimum and maximum
+(a morphological opening) and a rolling mean, Savitzky-Golay smoothing, local maxima of the smoothed net intensity,
+and prominence and width filtering.  Prominences and widths are computed for all peaks of all patterns at once with
+`np.ufunc.reduceat` over the segments between neighbouring peaks.
+
+A prominence is the height of a peak above the higher of the lowest points between it and its neighbouring peaks.
+Peaks below the prominence threshold are merged into their higher neighbour, which lowers the bases of the remaining
+peaks, until all remaining peaks pass.  The width is the full width at half prominence, interpolated in twotheta.
+
+Usage::
+
+    peaks = find_peaks(pattern)          # a PowderDiffraction, or a list of them
+    peaks[["twotheta", "intensity"]]     # the columns of a .peaks file
+    stick_pattern(peaks, 0)              # a PowderDiffraction like the .peaks loader returns
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from radie.plugins.structures.powderdiffraction import PowderDiffraction, CuKa, calc_d_spacing
+
+BACKGROUND_WINDOW = 101  # points
+SMOOTHING_WINDOW = 7  # points
+SMOOTHING_ORDER = 2
+MIN_SNR = 5.
+PEAK_COLUMNS = ("pattern", "twotheta", "d_spacing", "intensity", "prominence", "fwhm", "background")
+
+
+def stack_patterns(dfs):
+    """
+    the twotheta and intensity values of many patterns as 2D arrays, one row per pattern.  Shorter patterns are
+    padded at the end with NaN, which is never part of a peak
+
+    Parameters
+    ----------
+    dfs : list of PowderDiffraction
+
+    Returns
+    -------
+    twotheta : np.ndarray
+    intensity : np.ndarray
+
+    """
+    n = max(len(df) for df in dfs)
+    twotheta = np.full((len(dfs), n), np.nan)
+    intensity = np.full((len(dfs), n), np.nan)
+    for i, df in enumerate(dfs):
+        twotheta[i, :len(df)] = df.array("twotheta")
+        intensity[i, :len(df)] = df.array("intensity")
+    return twotheta, intensity
+
+
+def _pad_edges(values, before, after):
+    return np.pad(values, ((0, 0), (before, after)), mode="edge")
+
+
+def rolling_extreme(values, window, ufunc=np.fmin):
+    """
+    the minimum or maximum over a centered window along the rows, in time independent of the window length (van Herk
+    / Gil-Werman), with the edges padded by their values and NaN ignored
+
+    Parameters
+    ----------
+    values : np.ndarray
+        2D
+    window : int
+        odd number of points
+    ufunc : np.ufunc
+        np.fmin or np.fmax
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    m, n = values.shape
+    half = window // 2
+    window = 2 * half + 1
+    padded = _pad_edges(values, half, half)
+    n_blocks = -(-padded.shape[1] // window)
+    padded = _pad_edges(padded, 0, n_blocks * window - padded.shape[1]).reshape(m, n_blocks, window)
+    forward = ufunc.accumulate(padded, axis=2).reshape(m, -1)
+    backward = ufunc.accumulate(padded[:, :, ::-1], axis=2)[:, :, ::-1].reshape(m, -1)
+    return ufunc(backward[:, :n], forward[:, window - 1:window - 1 + n])
+
+
+def rolling_mean(values, window):
+    """the mean over a centered window along the rows, with the edges padded by their values and NaN ignored"""
+    half = window // 2
+    padded = _pad_edges(values, half + 1, half)
+    valid = ~np.isnan(padded)
+    sums = np.cumsum(np.where(valid, padded, 0.), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    window = 2 * half + 1
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sums[:, window:] - sums[:, :-window]) / (counts[:, window:] - counts[:, :-window])
+
+
+def estimate_background(intensity, window=BACKGROUND_WINDOW):
+    """
+    a smooth background under the peaks: the rolling minimum followed by the rolling maximum, which removes features
+    narrower than the window, followed by a rolling mean
+
+    Parameters
+    ----------
+    intensity : np.ndarray
+        1D, or 2D with one pattern per row
+    window : int
+        in points, wider than the peaks
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    values = np.atleast_2d(np.asarray(intensity, dtype=float))
+    opened = rolling_extreme(rolling_extreme(values, window, np.fmin), window, np.fmax)
+    background = np.fmin(rolling_mean(opened, window), values)
+    return background.reshape(np.shape(intensity))
+
+
+def savitzky_golay(intensity, window=SMOOTHING_WINDOW, order=SMOOTHING_ORDER):
+    """
+    Savitzky-Golay smoothing along the rows, the fit of a polynomial of `order` over a centered window at each point
+
+    Parameters
+    ----------
+    intensity : np.ndarray
+        1D, or 2D with one pattern per row
+    window : int
+        odd number of points
+    order : int
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    half = window // 2
+    offsets = np.arange(-half, half + 1)
+    coefficients = np.linalg.pinv(np.vander(offsets, order + 1, increasing=True))[0]
+    values = _pad_edges(np.atleast_2d(np.asarray(intensity, dtype=float)), half, half)
+    smoothed = np.lib.stride_tricks.sliding_window_view(values, 2 * half + 1, axis=1) @ coefficients
+    return smoothed.reshape(np.shape(intensity))
+
+
+def estimate_noise(intensity):
+    """the standard deviation of the point to point noise of each pattern, from the median absolute difference"""
+    values = np.atleast_2d(np.asarray(intensity, dtype=float))
+    return 1.4826 * np.nanmedian(np.abs(np.diff(values, axis=1)), axis=1) / np.sqrt(2.)
+
+
+def _segments(candidates, rows, n_rows, n):
+    """the segments between neighbouring peaks, split at the pattern starts, and the segment of each peak.  Peaks are
+    never at the start of a pattern, so both sorted sequences are merged without sorting"""
+    k = np.arange(len(candidates)) + rows + 1  # a peak comes after the starts of its own and all previous patterns
+    pattern_starts = np.arange(n_rows)
+    starts = np.empty(len(candidates) + n_rows, dtype=np.int64)
+    starts[k] = candidates
+    starts[pattern_starts + np.searchsorted(rows, pattern_starts)] = pattern_starts * n
+    return starts, k
+
+
+def _prominences(net, candidates, rows, threshold):
+    """merge the peaks below the threshold into their higher neighbours, see the module docstring"""
+    flat = net.ravel()
+    while True:
+        starts, k = _segments(candidates, rows, *net.shape)
+        minimums = np.fmin.reduceat(flat, starts)
+        left, right = minimums[k - 1], minimums[k]
+        heights = flat[candidates]
+        prominence = heights - np.fmax(left, right)
+        low = ~(prominence > threshold[rows])
+        if not low.any():
+            return candidates, rows, prominence
+
+        # a peak is removed when the neighbour across its higher base is higher, or when that base reaches the edge
+        # of the pattern, those bases are final.  Peaks whose higher base leads to a lower peak wait for that peak
+        i = np.arange(len(candidates))
+        towards_right = right >= left
+        neighbour = np.where(towards_right, i + 1, i - 1)
+        exists = (neighbour >= 0) & (neighbour < len(candidates))
+        neighbour = np.clip(neighbour, 0, max(len(candidates) - 1, 0))
+        exists &= rows[neighbour] == rows
+        neighbour_heights = heights[neighbour]
+        higher = (neighbour_heights > heights) | ((neighbour_heights == heights) & (neighbour < i))
+        removable = low & (~exists | higher)
+        if not removable.any():
+            removable = low
+        candidates, rows = candidates[~removable], rows[~removable]
+
+
+def _half_widths(net, x, candidates, rows, prominence):
+    """the twotheta of the left and right crossings of half prominence of each peak"""
+    flat = net.ravel()
+    starts, k = _segments(candidates, rows, *net.shape)
+    half = flat[candidates] - prominence / 2.
+    lengths = np.diff(np.append(starts, len(flat)))
+    positions = np.arange(len(flat))
+
+    # each segment is the right side of the peak at its start and the left side of the peak at its end
+    right_level = np.full(len(starts), np.nan)
+    right_level[k] = half
+    left_level = np.full(len(starts), np.nan)
+    left_level[k - 1] = half
+    with np.errstate(invalid="ignore"):
+        below_right = flat <= np.repeat(right_level, lengths)
+        below_left = flat <= np.repeat(left_level, lengths)
+    first_below = np.minimum.reduceat(np.where(below_right, positions, len(flat)), starts)[k]
+    last_below = np.maximum.reduceat(np.where(below_left, positions, -1), starts)[k - 1]
+
+    # no crossing can only happen at NaN padding, the segment end is used instead
+    segment_end = np.append(starts, len(flat))[k + 1] - 1
+    first_below = np.minimum(first_below, segment_end)
+    last_below = np.maximum(last_below, starts[k - 1])
+
+    def crossing(below, above):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = (flat[above] - half) / (flat[above] - flat[below])
+        fraction = np.where(np.isfinite(fraction), np.clip(fraction, 0., 1.), 0.)
+        return x[above] + fraction * (x[below] - x[above])
+
+    left = crossing(last_below, np.minimum(last_below + 1, candidates))
+    right = crossing(first_below, np.maximum(first_below - 1, candidates))
+    return left, right
+
+
+def search(twotheta, intensity, wavelength=CuKa, background_window=BACKGROUND_WINDOW,
+           smoothing_window=SMOOTHING_WINDOW, min_prominence=None, min_snr=MIN_SNR, min_width=None, max_width=None):
+    """
+    find the peaks of one or many patterns in one vectorized pass
+
+    Parameters
+    ----------
+    twotheta : np.ndarray
+        1D for one pattern or for patterns on a shared grid, or 2D with one pattern per row, increasing along the rows
+    intensity : np.ndarray
+        1D or 2D, one pattern per row
+    wavelength : float or np.ndarray
+        in angstroms, one per pattern or shared, for the d-spacings
+    background_window : int
+        in points, wider than the peaks.  None or 0 to use no background
+    smoothing_window : int
+        in points, odd.  None or 0 to use no smoothing
+    min_prominence : float, optional
+        in counts
+    min_snr : float, optional
+        the minimum prominence as a multiple of the noise of each pattern, see `estimate_noise`
+    min_width : float, optional
+        the minimum full width at half prominence in degrees twotheta
+    max_width : float, optional
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per peak, ordered by pattern and twotheta, with the PEAK_COLUMNS.  The intensity is the smoothed
+        height above the background
+
+    """
+    intensity = np.atleast_2d(np.asarray(intensity, dtype=float))
+    m, n = intensity.shape
+    x = np.broadcast_to(np.asarray(twotheta, dtype=float), (m, n)).ravel()
+
+    smoothed = savitzky_golay(intensity, smoothing_window) if smoothing_window else intensity
+    if background_window:
+        background = estimate_background(smoothed, background_window)
+    else:
+        background = np.zeros_like(smoothed)
+    net = smoothed - background
+
+    with np.errstate(invalid="ignore"):  # rounding in the smoothing and background is never a peak
+        threshold = 1e-9 * np.nanmax(np.abs(np.where(np.isnan(intensity), 0., intensity)), axis=1)
+    if min_prominence is not None:
+        threshold = np.fmax(threshold, min_prominence)
+    if min_snr is not None:
+        threshold = np.fmax(threshold, min_snr * estimate_noise(intensity))
+
+    # local maxima, the first point of a plateau counts
+    with np.errstate(invalid="ignore"):
+        maxima = np.zeros((m, n), dtype=bool)
+        maxima[:, 1:-1] = (net[:, 1:-1] > net[:, :-2]) & (net[:, 1:-1] >= net[:, 2:])
+    candidates = np.flatnonzero(maxima)
+    rows = candidates // n
+    candidates, rows, prominence = _prominences(net, candidates, rows, threshold)
+
+    left, right = _half_widths(net, x, candidates, rows, prominence)
+    fwhm = right - left
+    keep = np.ones(len(candidates), dtype=bool)
+    if min_width is not None:
+        keep &= fwhm >= min_width
+    if max_width is not None:
+        keep &= fwhm <= max_width
+    candidates, rows, prominence, fwhm = candidates[keep], rows[keep], prominence[keep], fwhm[keep]
+
+    # the vertex of the parabola through the maximum and its neighbours
+    flat = net.ravel()
+    before, peak, after = flat[candidates - 1], flat[candidates], flat[candidates + 1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        shift = 0.5 * (before - after) / (before - 2 * peak + after)
+    shift = np.where(np.isfinite(shift), np.clip(shift, -0.5, 0.5), 0.)
+    position = x[candidates] + shift * np.where(shift > 0, x[candidates + 1] - x[candidates],
+                                                x[candidates] - x[candidates - 1])
+
+    wavelength = np.broadcast_to(np.asarray(wavelength, dtype=float), (m,))[rows]
+    return pd.DataFrame(OrderedDict((
+        ("pattern", rows),
+        ("twotheta", position),
+        ("d_spacing", calc_d_spacing(position, wavelength)),
+        ("intensity", peak),
+        ("prominence", prominence),
+        ("fwhm", fwhm),
+        ("background", background.ravel()[candidates]),
+    )), columns=PEAK_COLUMNS)
+
+
+def find_peaks(dfs, **kwargs):
+    """
+    find the peaks of one PowderDiffraction pattern or of a list of them, see `search` for the keyword arguments
+
+    Returns
+    -------
+    pd.DataFrame
+        the pattern column holds the position of the pattern in the list
+
+    """
+    if isinstance(dfs, PowderDiffraction):
+        dfs = [dfs]
+    twotheta, intensity = stack_patterns(dfs)
+    wavelength = [df.metadata["wavelength"] if df.metadata["wavelength"] is not None else np.nan for df in dfs]
+    return search(twotheta, intensity, wavelength, **kwargs)
+
+
+def peak_list(peaks, pattern=0):
+    """
+    the twotheta and intensity of the peaks of one pattern as the two columns of a .peaks file
+
+    Parameters
+    ----------
+    peaks : pd.DataFrame
+        from `search` or `find_peaks`
+    pattern : int
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    selected = peaks[peaks["pattern"] == pattern]
+    return np.column_stack((selected["twotheta"].values, selected["intensity"].values))
+
+
+def stick_pattern(peaks, pattern=0, wavelength=CuKa, name=None):
+    """
+    the peaks of one pattern as a PowderDiffraction of lines with intensities up to 100, the shape the .peaks loader
+    returns
+
+    Returns
+    -------
+    PowderDiffraction
+
+    """
+    from radie.plugins.loaders.powderdiffraction_peaks import convert_to_line_peaks
+
+    xy = peak_list(peaks, pattern)
+    line_peaks = convert_to_line_peaks(xy) if len(xy) else np.empty((0, 2))
+    return PowderDiffraction(data=line_peaks, columns=["twotheta", "intensity"], wavelength=wavelength,
+                             name=name if name is not None else "peaks-{:d}".format(pattern))
+
+
+def write_peaks(fname, peaks, pattern=0):
+    """write the peaks of one pattern as a .peaks file, readable by the .peaks loader"""
+    np.savetxt(fname, peak_list(peaks, pattern), delimiter=",", fmt="%.6g",
+               header="twotheta, intensity, {:d} peaks".format(int(np.sum(peaks["pattern"] == pattern))))
@@ -0,0 +1,322 @@
+"""search-match of measured peak lists against a library of reference cards, the .peaks and .dpeaks files
+
+A `PhaseIndex` holds the peaks of all cards in shared arrays: the d-spacings of each card sorted in increasing order
+and concatenated, with the start of each card in `offsets`, the intensities normalized to 100 per card, and the order
+of all card peaks by d-spacing.  A measured peak list is matched against every card at once:
+
+- each card peak is matched to its nearest measured peak, one `np.searchsorted` of all card peaks in the measured
+  d-spacings, and the per-card sums are `np.add.reduceat` calls over the card offsets
+- each measured peak finds the card peaks within its tolerance window by a `np.searchsorted` of the window bounds in
+  the d-sorted card peaks, and the measured intensity explained by each card is one bincount
+
+The figure of merit combines three scores between 0 and 1: the fraction of the card intensity within the measured
+d range that is matched, the fraction of the measured intensity that the card explains, and the position agreement of
+the matched peaks.
+"""
+import os
+import glob
+from collections import OrderedDict
+from concurrent import futures
+
+import numpy as np
+import pandas as pd
+
+from radie.plugins.structures.powderdiffraction import PowderDiffraction, CuKa, calc_d_spacing
+
+CARD_EXTENSIONS = (".peaks", ".dpeaks")
+TOLERANCE = 0.003  # relative d-spacing tolerance, about 0.1 degrees twotheta at 30 degrees for CuKa
+FOM_WEIGHTS = (0.5, 0.3, 0.2)  # card, measured and position scores
+MIN_MATCHES = 2
+
+
+def read_card(fname):
+    """
+    the peaks of a reference card file, a .peaks file of twotheta (for CuKa) and intensity or a .dpeaks file of
+    d-spacing and intensity, as read by the .peaks and .dpeaks loaders
+
+    Returns
+    -------
+    d_spacing : np.ndarray
+    intensity : np.ndarray
+
+    """
+    with open(fname, "rb") as f:
+        peaks = np.loadtxt(f, delimiter=",", ndmin=2)
+    if not len(peaks):
+        return np.empty(0), np.empty(0)
+    if fname.lower().endswith(".dpeaks"):
+        return peaks[:, 0], peaks[:, 1]
+    return calc_d_spacing(peaks[:, 0], CuKa), peaks[:, 1]
+
+
+def _read_card_or_error(fname):
+    """worker function for `PhaseIndex.from_directory`"""
+    try:
+        return read_card(fname), None
+    except Exception as e:
+        return None, e
+
+
+class PhaseIndex(object):
+    """reference cards stored as d-sorted peak arrays with per-card offsets, see the module docstring
+
+    Attributes
+    ----------
+    names : list of str
+    d_spacing : np.ndarray
+        the peaks of all cards, each card in increasing d-spacing
+    intensity : np.ndarray
+        normalized to a maximum of 100 per card
+    offsets : np.ndarray
+        int64 of length number of cards + 1, card i holds the peaks offsets[i]:offsets[i + 1]
+    order : np.ndarray
+        the positions of all card peaks in order of increasing d-spacing
+    errors : OrderedDict
+        filename: exception for the card files that could not be read
+
+    """
+
+    def __init__(self, names, d_spacing, intensity, offsets):
+        """
+        Parameters
+        ----------
+        names : list of str
+        d_spacing, intensity : np.ndarray
+            the concatenated peaks of all cards, each card sorted by d-spacing
+        offsets : np.ndarray
+        """
+        self.names = list(names)
+        self.d_spacing = np.asarray(d_spacing, dtype=float)
+        self.intensity = np.asarray(intensity, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if len(self.offsets) != len(self.names) + 1 or np.any(np.diff(self.offsets) < 1):
+            raise ValueError("offsets must mark one non-empty card per name")
+        self.card_ids = np.repeat(np.arange(len(self.names)), np.diff(self.offsets))
+        self.order = np.argsort(self.d_spacing, kind="stable")
+        self.sorted_d_spacing = self.d_spacing[self.order]
+        self.errors = OrderedDict()
+
+    @classmethod
+    def from_cards(cls, cards):
+        """
+        build an index from (name, d_spacing, intensity) tuples.  Peaks with non-positive or non-finite d-spacings
+        and cards without peaks are left out
+
+        Returns
+        -------
+        PhaseIndex
+
+        """
+        names, ds, intensities = [], [], []
+        for name, d, intensity in cards:
+            d = np.asarray(d, dtype=float)
+            intensity = np.asarray(intensity, dtype=float)
+            valid = np.isfinite(d) & (d > 0) & np.isfinite(intensity)
+            d, intensity = d[valid], intensity[valid]
+            if not len(d):
+                continue
+            order = np.argsort(d, kind="stable")
+            top = intensity.max()
+            names.append(name)
+            ds.append(d[order])
+            intensities.append(intensity[order] / top * 100. if top > 0 else np.full(len(d), 100.))
+
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        np.cumsum([len(d) for d in ds], out=offsets[1:])
+        if not names:
+            return cls([], np.empty(0), np.empty(0), offsets)
+        return cls(names, np.concatenate(ds), np.concatenate(intensities), offsets)
+
+    @classmethod
+    def from_directory(cls, directory, extensions=CARD_EXTENSIONS, workers=1):
+        """
+        build an index from the .peaks and .dpeaks files in a directory and its sub-directories
+
+        Parameters
+        ----------
+        directory : str
+        extensions : tuple of str
+        workers : int
+            read the files in a process pool of this many workers
+
+        Returns
+        -------
+        PhaseIndex
+            the card names are the file paths relative to the directory without extension, the files that could not
+            be read are in `errors`
+
+        """
+        fnames = sorted(fname for fname in glob.glob(os.path.join(directory, "**", "*"), recursive=True)
+                        if fname.lower().endswith(tuple(extensions)) and os.path.isfile(fname))
+        if workers > 1 and len(fnames) > 1:
+            with futures.ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_read_card_or_error, fnames, chunksize=max(1, len(fnames) // (workers * 16))))
+        else:
+            results = [_read_card_or_error(fname) for fname in fnames]
+
+        cards = []
+        errors = OrderedDict()
+        for fname, (peaks, error) in zip(fnames, results):
+            if error is not None:
+                errors[fname] = error
+                continue
+            cards.append((os.path.splitext(os.path.relpath(fname, directory))[0], peaks[0], peaks[1]))
+        index = cls.from_cards(cards)
+        index.errors = errors
+        return index
+
+    def save(self, fname):
+        """write the index to a .npz file, to skip reading the card files next time"""
+        np.savez(fname, names=np.array(self.names, dtype=str), d_spacing=self.d_spacing, intensity=self.intensity,
+                 offsets=self.offsets)
+
+    @classmethod
+    def load(cls, fname):
+        """read an index written by `save`"""
+        with np.load(fname) as arrays:
+            return cls(arrays["names"].tolist(), arrays["d_spacing"], arrays["intensity"], arrays["offsets"])
+
+    def __len__(self):
+        return len(self.names)
+
+    def card(self, i):
+        """the d-spacings and normalized intensities of card i"""
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        return self.d_spacing[start:stop], self.intensity[start:stop]
+
+    def stick_pattern(self, i, wavelength=CuKa):
+        """
+        card i as a PowderDiffraction of lines, the shape the .peaks and .dpeaks loaders return
+
+        Returns
+        -------
+        PowderDiffraction
+
+        """
+        from radie.plugins.loaders.powderdiffraction_peaks import convert_to_line_peaks, calc_twotheta_from_d
+
+        d, intensity = self.card(i)
+        inside = wavelength / (2 * d) <= 1.  # peaks beyond twotheta 180 at this wavelength
+        line_peaks = convert_to_line_peaks(np.column_stack((calc_twotheta_from_d(d[inside], wavelength),
+                                                            intensity[inside])))
+        return PowderDiffraction(data=line_peaks, columns=["twotheta", "intensity"], wavelength=wavelength,
+                                 name=self.names[i])
+
+    def scores(self, d_spacing, intensity=None, tolerance=TOLERANCE):
+        """
+        the scores of every card against a measured peak list, see the module docstring
+
+        Parameters
+        ----------
+        d_spacing : np.ndarray
+            the measured peaks
+        intensity : np.ndarray, optional
+            the measured peak intensities, by default all peaks weigh the same
+        tolerance : float
+            the relative d-spacing tolerance of a match
+
+        Returns
+        -------
+        OrderedDict
+            arrays with one value per card: card_score, measured_score, position_score, matches (card peaks with a
+            measured peak within the tolerance) and in_range (card peaks within the measured d range)
+
+        """
+        d_spacing = np.asarray(d_spacing, dtype=float)
+        intensity = np.ones(len(d_spacing)) if intensity is None else np.asarray(intensity, dtype=float)
+        valid = np.isfinite(d_spacing) & (d_spacing > 0) & np.isfinite(intensity)
+        order = np.argsort(d_spacing[valid])
+        measured, measured_intensity = d_spacing[valid][order], intensity[valid][order]
+        n_cards = len(self)
+        if not len(measured) or not n_cards:
+            empty = np.zeros(n_cards)
+            return OrderedDict((("card_score", empty), ("measured_score", empty), ("position_score", empty),
+                                ("matches", empty.astype(np.int64)), ("in_range", empty.astype(np.int64))))
+
+        # card side: the relative distance of every card peak to its nearest measured peak
+        d = self.d_spacing
+        above = np.minimum(np.searchsorted(measured, d), len(measured) - 1)
+        below = np.maximum(above - 1, 0)
+        distance = np.minimum(np.abs(measured[above] - d), np.abs(d - measured[below])) / d
+        matched = distance <= tolerance
+        in_range = (d >= measured[0] * (1. - tolerance)) & (d <= measured[-1] * (1. + tolerance))
+
+        starts = self.offsets[:-1]
+        weight_in_range = np.add.reduceat(self.intensity * in_range, starts)
+        weight_matched = np.add.reduceat(self.intensity * matched, starts)
+        weighted_error = np.add.reduceat(self.intensity * matched * (distance / tolerance), starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            card_score = np.where(weight_in_range > 0, weight_matched / weight_in_range, 0.)
+            position_score = np.where(weight_matched > 0, 1. - weighted_error / weight_matched, 0.)
+
+        # measured side: the card peaks within the window of each measured peak, in the d-sorted card peaks
+        low = np.searchsorted(self.sorted_d_spacing, measured * (1. - tolerance), side="left")
+        high = np.searchsorted(self.sorted_d_spacing, measured * (1. + tolerance), side="right")
+        counts = high - low
+        peak_of_pair = np.repeat(np.arange(len(measured)), counts)
+        pair_offsets = np.repeat(low - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        card_of_pair = self.card_ids[self.order[pair_offsets]]
+        pairs = np.unique(card_of_pair * len(measured) + peak_of_pair)  # each measured peak counts once per card
+        explained = np.bincount(pairs // len(measured), weights=measured_intensity[pairs % len(measured)],
+                                minlength=n_cards)
+        total = measured_intensity.sum()
+        measured_score = explained / total if total > 0 else np.zeros(n_cards)
+
+        return OrderedDict((
+            ("card_score", card_score),
+            ("measured_score", measured_score),
+            ("position_score", position_score),
+            ("matches", np.add.reduceat(matched.astype(np.int64), starts)),
+            ("in_range", np.add.reduceat(in_range.astype(np.int64), starts)),
+        ))
+
+    def match(self, d_spacing, intensity=None, tolerance=TOLERANCE, top=20, weights=FOM_WEIGHTS,
+              min_matches=MIN_MATCHES):
+        """
+        rank the cards against a measured peak list
+
+        Parameters
+        ----------
+        d_spacing : np.ndarray
+            the measured peaks, e.g. the d_spacing column of `powderdiffraction_peaksearch.search`
+        intensity : np.ndarray, optional
+        tolerance : float
+            the relative d-spacing tolerance of a match
+        top : int
+            the number of candidates to return
+        weights : tuple of float
+            the weights of the card, measured and position scores in the figure of merit
+        min_matches : int
+            cards with fewer matched peaks are not candidates
+
+        Returns
+        -------
+        pd.DataFrame
+            the candidates in order of decreasing figure of merit, with the card name, its position in the index,
+            the fom and the scores of `scores`
+
+        """
+        scores = self.scores(d_spacing, intensity, tolerance)
+        fom = (weights[0] * scores["card_score"] + weights[1] * scores["measured_score"] +
+               weights[2] * scores["position_score"]) / float(sum(weights))
+        candidates = np.flatnonzero(scores["matches"] >= min_matches)
+        if len(candidates) > top:
+            candidates = candidates[np.argpartition(-fom[candidates], top - 1)[:top]]
+        candidates = candidates[np.lexsort((candidates, -fom[candidates]))]
+
+        table = OrderedDict((
+            ("name", [self.names[i] for i in candidates]),
+            ("card", candidates),
+            ("fom", fom[candidates]),
+        ))
+        for key, values in scores.items():
+            table[key] = values[candidates]
+        return pd.DataFrame(table)
+
+    def match_peaks(self, peaks, pattern=0, **kwargs):
+        """rank the cards against the peaks of one pattern from `powderdiffraction_peaksearch.search`, see `match`"""
+        selected = peaks[peaks["pattern"] == pattern]
+        return self.match(selected["d_spacing"].values, selected["intensity"].values, **kwargs)
+
+    def __repr__(self):
+        return "<PhaseIndex of {:d} cards, {:d} peaks>".format(len(self), len(self.d_spacing))
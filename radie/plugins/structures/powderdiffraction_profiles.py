@@ -0,0 +1,422 @@
+"""pseudo-Voigt profile fits of powder diffraction peaks, many independent peaks at once
+
+Each peak is fitted on a window of its pattern with a pseudo-Voigt, a mixture of a Lorentzian and a Gaussian of the
+same full width at half maximum, over a linear background.  All peaks are fitted together by a batched
+Levenberg-Marquardt: the windows are padded to a common length with zero weights, the Jacobians of all peaks are one
+(peaks, points, parameters) array, and the damped normal equations of all peaks are solved by one batched
+`np.linalg.solve`.  Every peak keeps its own damping, and peaks leave the active set as they converge.
+
+Weights are the inverse variances from the `uncertainty` column of patterns that have one, e.g. from GSAS files, in
+which case the parameter errors are absolute.  Otherwise the points are weighted equally and the errors are scaled by
+the reduced chi-square.
+
+Usage::
+
+    peaks = powderdiffraction_peaksearch.find_peaks(patterns)
+    fits = fit_peaks(patterns, peaks)
+    fits[["center", "fwhm", "converged", "crystallite_size"]]
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from radie.plugins.structures.powderdiffraction import PowderDiffraction
+from radie.plugins.structures import powderdiffraction_peaksearch as peaksearch
+
+PARAMETERS = ("center", "fwhm", "height", "eta", "background", "slope")
+WINDOW_FWHMS = 3.  # half width of the fitted window around each peak, in initial FWHMs
+MAX_WINDOW_POINTS = 400
+SCHERRER_CONSTANT = 0.9
+LN2 = np.log(2.)
+
+
+def pseudo_voigt(x, center, fwhm, height, eta):
+    """
+    a pseudo-Voigt peak, eta * Lorentzian + (1 - eta) * Gaussian, both of peak value `height` and full width at half
+    maximum `fwhm`
+
+    Parameters
+    ----------
+    x : np.ndarray
+    center, fwhm, height, eta : float or np.ndarray
+        broadcast against x
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    u2 = ((x - center) / fwhm) ** 2
+    return height * (eta / (1. + 4. * u2) + (1. - eta) * np.exp(-4. * LN2 * u2))
+
+
+def pseudo_voigt_area(fwhm, height, eta):
+    """the integrated area of a pseudo-Voigt peak"""
+    return height * fwhm * (eta * np.pi / 2. + (1. - eta) * np.sqrt(np.pi / (4. * LN2)))
+
+
+def model(params, x):
+    """
+    the pseudo-Voigt and linear background of each peak over its window
+
+    Parameters
+    ----------
+    params : np.ndarray
+        (peaks, 6), the PARAMETERS of each peak
+    x : np.ndarray
+        (peaks, points)
+
+    Returns
+    -------
+    np.ndarray
+        (peaks, points)
+
+    """
+    center, fwhm, height, eta, background, slope = (params[:, i:i + 1] for i in range(len(PARAMETERS)))
+    return pseudo_voigt(x, center, fwhm, height, eta) + background + slope * (x - center)
+
+
+def jacobian(params, x):
+    """
+    the derivatives of `model` with respect to the parameters
+
+    Returns
+    -------
+    np.ndarray
+        (peaks, points, 6)
+
+    """
+    center, fwhm, height, eta, background, slope = (params[:, i:i + 1] for i in range(len(PARAMETERS)))
+    dx = x - center
+    u2 = (dx / fwhm) ** 2
+    gaussian = np.exp(-4. * LN2 * u2)
+    lorentzian = 1. / (1. + 4. * u2)
+    # d/d(center) and d/d(fwhm) of u2, times the derivative of each shape with respect to u2
+    d_gaussian_d_u2 = -4. * LN2 * gaussian
+    d_lorentzian_d_u2 = -4. * lorentzian ** 2
+    d_shape_d_u2 = height * (eta * d_lorentzian_d_u2 + (1. - eta) * d_gaussian_d_u2)
+    d_u2_d_center = -2. * dx / fwhm ** 2
+    d_u2_d_fwhm = -2. * u2 / fwhm
+
+    J = np.empty(x.shape + (len(PARAMETERS),))
+    J[..., 0] = d_shape_d_u2 * d_u2_d_center - slope
+    J[..., 1] = d_shape_d_u2 * d_u2_d_fwhm
+    J[..., 2] = eta * lorentzian + (1. - eta) * gaussian
+    J[..., 3] = height * (lorentzian - gaussian)
+    J[..., 4] = 1.
+    J[..., 5] = dx
+    return J
+
+
+def _constrain(params, min_fwhm):
+    params[:, 1] = np.maximum(params[:, 1], min_fwhm)
+    params[:, 3] = np.clip(params[:, 3], 0., 1.)
+    return params
+
+
+def _pinned(params, step, min_fwhm):
+    """the parameters on a bound that the step pushes further out, (peaks, 6) bool"""
+    pinned = np.zeros(params.shape, dtype=bool)
+    pinned[:, 1] = (params[:, 1] <= min_fwhm) & (step[:, 1] < 0)
+    pinned[:, 3] = ((params[:, 3] <= 0.) & (step[:, 3] < 0)) | ((params[:, 3] >= 1.) & (step[:, 3] > 0))
+    return pinned
+
+
+def _solve(matrices, vectors):
+    try:
+        return np.linalg.solve(matrices, vectors[..., np.newaxis])[..., 0]
+    except np.linalg.LinAlgError:  # a singular system in the batch, e.g. a window without weight
+        return np.einsum("pij,pj->pi", np.linalg.pinv(matrices), vectors)
+
+
+def levenberg_marquardt(x, y, weights, initial, max_iterations=100, tolerance=1e-8, damping=1e-3, min_fwhm=None):
+    """
+    fit many independent peaks at once, see the module docstring
+
+    Parameters
+    ----------
+    x, y, weights : np.ndarray
+        (peaks, points), padding points have zero weight
+    initial : np.ndarray
+        (peaks, 6) starting PARAMETERS
+    max_iterations : int
+    tolerance : float
+        a peak converges when an accepted step lowers its chi-square by less than this fraction, or changes no
+        parameter by more than this fraction of its value, parameters held on a bound (eta at 0 or 1, fwhm at
+        min_fwhm) are fixed for the step
+    damping : float
+        the initial Levenberg-Marquardt damping
+    min_fwhm : float, optional
+        the lower bound of the fwhm, by default a tenth of the smallest point spacing
+
+    Returns
+    -------
+    params : np.ndarray
+        (peaks, 6)
+    diagnostics : OrderedDict
+        arrays of chi2, iterations, converged (bool) and status ("converged", "max_iterations" or "failed", e.g. for
+        windows with fewer points than parameters) per peak
+
+    """
+    n_peaks = len(initial)
+    weights = np.where(np.isfinite(weights) & np.isfinite(x) & np.isfinite(y), weights, 0.)
+    x = np.where(weights > 0, x, 0.)
+    y = np.where(weights > 0, y, 0.)
+    if min_fwhm is None:
+        spacing = np.abs(np.diff(x, axis=1))
+        spacing = spacing[(spacing > 0) & (weights[:, 1:] > 0) & (weights[:, :-1] > 0)]
+        min_fwhm = 0.1 * spacing.min() if len(spacing) else 1e-6
+
+    params = _constrain(np.array(initial, dtype=float), min_fwhm)
+    chi2 = np.sum(weights * (y - model(params, x)) ** 2, axis=1)
+    lam = np.full(n_peaks, float(damping))
+    iterations = np.zeros(n_peaks, dtype=np.int64)
+    converged = np.zeros(n_peaks, dtype=bool)
+    failed = ~np.isfinite(chi2) | (np.sum(weights > 0, axis=1) < len(PARAMETERS))  # too few points to fit
+    active = np.flatnonzero(~failed)
+
+    for iteration in range(max_iterations):
+        if not len(active):
+            break
+        p, xa, ya, wa = params[active], x[active], y[active], weights[active]
+        J = jacobian(p, xa)
+        residual = ya - model(p, xa)
+        JtW = J.transpose(0, 2, 1) * wa[:, np.newaxis, :]
+        A = JtW @ J
+        g = np.einsum("pij,pj->pi", JtW, residual)
+        diagonal = np.diagonal(A, axis1=1, axis2=2)
+        floor = 1e-12 * np.maximum(diagonal.max(axis=1, keepdims=True), 1e-300)
+        damping_terms = lam[active, np.newaxis] * np.maximum(diagonal, floor)
+        damped = A + damping_terms[..., np.newaxis] * np.eye(len(PARAMETERS))
+        step = _solve(damped, g)
+
+        # parameters held on their bounds are fixed and the step of the others is solved again, a step computed with
+        # the clipped parameters free would be too short in the others and the fit would creep to convergence
+        pinned = _pinned(p, step, min_fwhm)
+        rows = np.flatnonzero(pinned.any(axis=1))
+        if len(rows):
+            free = ~pinned[rows]
+            reduced = np.where(free[:, :, np.newaxis] & free[:, np.newaxis, :], damped[rows], 0.)
+            reduced += pinned[rows][:, :, np.newaxis] * np.eye(len(PARAMETERS))
+            step[rows] = _solve(reduced, np.where(free, g[rows], 0.))
+
+        trial = _constrain(p + step, min_fwhm)
+        trial_chi2 = np.sum(wa * (ya - model(trial, xa)) ** 2, axis=1)
+        iterations[active] += 1
+        accepted = np.isfinite(trial_chi2) & (trial_chi2 <= chi2[active])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            decrease = (chi2[active] - trial_chi2) / np.maximum(chi2[active], 1e-300)
+            relative_step = np.max(np.abs(trial - p) / np.maximum(np.abs(p), 1e-12), axis=1)
+        done = accepted & ((decrease <= tolerance) | (relative_step <= tolerance))
+
+        accepted_peaks = active[accepted]
+        params[accepted_peaks] = trial[accepted]
+        chi2[accepted_peaks] = trial_chi2[accepted]
+        lam[active] = np.where(accepted, np.maximum(lam[active] / 10., 1e-12), lam[active] * 10.)
+
+        stalled = lam[active] > 1e12  # no step lowers chi-square, a minimum to within rounding
+        failed[active[~np.isfinite(step).all(axis=1)]] = True
+        converged[active[done | (stalled & np.isfinite(chi2[active]))]] = True
+        active = active[~(converged[active] | failed[active])]
+
+    status = np.where(converged, "converged", np.where(failed, "failed", "max_iterations"))
+    return params, OrderedDict((
+        ("chi2", chi2),
+        ("iterations", iterations),
+        ("converged", converged),
+        ("status", status),
+    ))
+
+
+def parameter_errors(params, x, weights, chi2, absolute_sigma):
+    """
+    the standard errors of the parameters from the inverse of the normal matrix at the solution
+
+    Parameters
+    ----------
+    params, x, weights : np.ndarray
+    chi2 : np.ndarray
+    absolute_sigma : np.ndarray
+        bool per peak, False scales the errors by the reduced chi-square
+
+    Returns
+    -------
+    errors : np.ndarray
+        (peaks, 6), NaN where the normal matrix is singular
+    reduced_chi2 : np.ndarray
+
+    """
+    weights = np.where(np.isfinite(weights), weights, 0.)
+    x = np.where(weights > 0, x, 0.)
+    J = jacobian(params, x)
+    A = (J.transpose(0, 2, 1) * weights[:, np.newaxis, :]) @ J
+    n_points = np.sum(weights > 0, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        reduced_chi2 = chi2 / (n_points - len(PARAMETERS))
+        reduced_chi2 = np.where(n_points > len(PARAMETERS), reduced_chi2, np.nan)
+    covariance = np.linalg.pinv(A)
+    with np.errstate(invalid="ignore"):
+        variances = np.diagonal(covariance, axis1=1, axis2=2) * np.where(absolute_sigma, 1., reduced_chi2)[:, None]
+        errors = np.sqrt(variances)
+    return errors, reduced_chi2
+
+
+def scherrer_size(fwhm, twotheta, wavelength, shape_factor=SCHERRER_CONSTANT, instrumental_fwhm=0.):
+    """
+    the crystallite size from the Scherrer equation, K * wavelength / (beta * cos(theta))
+
+    Parameters
+    ----------
+    fwhm : float or np.ndarray
+        in degrees twotheta
+    twotheta : float or np.ndarray
+        in degrees
+    wavelength : float or np.ndarray
+        in angstroms
+    shape_factor : float
+    instrumental_fwhm : float or np.ndarray
+        in degrees, removed in quadrature from the fwhm
+
+    Returns
+    -------
+    float or np.ndarray
+        in angstroms, NaN where the fwhm is not larger than the instrumental width
+
+    """
+    with np.errstate(invalid="ignore"):
+        beta = np.deg2rad(np.sqrt(np.asarray(fwhm) ** 2 - np.asarray(instrumental_fwhm) ** 2))
+        return shape_factor * np.asarray(wavelength) / (beta * np.cos(np.deg2rad(np.asarray(twotheta) / 2.)))
+
+
+def extract_windows(twotheta, intensity, uncertainty, patterns, centers, fwhms, window=WINDOW_FWHMS,
+                    max_points=MAX_WINDOW_POINTS):
+    """
+    the points of each peak's fit window, padded to a common length with zero weight
+
+    Parameters
+    ----------
+    twotheta, intensity : np.ndarray
+        (patterns, points), NaN padded, see `powderdiffraction_peaksearch.stack_patterns`
+    uncertainty : np.ndarray or None
+        (patterns, points), the standard uncertainty of the intensities, NaN where unknown
+    patterns : np.ndarray
+        the row of each peak
+    centers, fwhms : np.ndarray
+        initial estimates
+    window : float
+        the half width of the window in fwhms
+    max_points : int
+        windows are trimmed to this many points around the center
+
+    Returns
+    -------
+    x, y, weights : np.ndarray
+        (peaks, points)
+    absolute_sigma : np.ndarray
+        bool per peak, True when the weights come from uncertainties
+
+    """
+    n = twotheta.shape[1]
+    filled = np.where(np.isnan(twotheta), np.inf, twotheta)
+    low = np.empty(len(centers), dtype=np.int64)
+    high = np.empty(len(centers), dtype=np.int64)
+    for row in np.unique(patterns):  # one search per pattern for all of its peaks
+        selected = patterns == row
+        low[selected] = np.searchsorted(filled[row], centers[selected] - window * fwhms[selected], side="left")
+        high[selected] = np.searchsorted(filled[row], centers[selected] + window * fwhms[selected], side="right")
+    lengths = high - low
+    excess = np.maximum(lengths - max_points, 0)
+    low += excess // 2
+    high -= excess - excess // 2
+    n_points = int(max(np.max(high - low) if len(low) else 0, 1))
+
+    columns = low[:, np.newaxis] + np.arange(n_points)
+    inside = columns < high[:, np.newaxis]
+    columns = np.minimum(columns, n - 1)
+    rows = patterns[:, np.newaxis]
+    x = twotheta[rows, columns]
+    y = intensity[rows, columns]
+
+    absolute_sigma = np.zeros(len(centers), dtype=bool)
+    weights = np.ones_like(y)
+    if uncertainty is not None:
+        sigma = uncertainty[rows, columns]
+        has_sigma = np.isfinite(sigma) & (sigma > 0)
+        absolute_sigma = np.any(has_sigma & inside, axis=1)
+        with np.errstate(divide="ignore"):
+            weights = np.where(has_sigma, 1. / sigma ** 2, np.where(absolute_sigma[:, np.newaxis], 0., 1.))
+    weights = np.where(inside & np.isfinite(x) & np.isfinite(y), weights, 0.)
+    return x, y, weights, absolute_sigma
+
+
+def fit_peaks(dfs, peaks=None, window=WINDOW_FWHMS, max_iterations=100, tolerance=1e-8,
+              instrumental_fwhm=0., **search_kwargs):
+    """
+    fit a pseudo-Voigt to each peak of one or many patterns
+
+    Parameters
+    ----------
+    dfs : PowderDiffraction or list of PowderDiffraction
+        the `uncertainty` column is used for the weights where present
+    peaks : pd.DataFrame, optional
+        the peaks to fit with the pattern, twotheta, intensity, fwhm and background columns of
+        `powderdiffraction_peaksearch.search`.  By default the peaks are searched with `search_kwargs`
+    window : float
+        the half width of the fit window in initial fwhms
+    max_iterations : int
+    tolerance : float
+    instrumental_fwhm : float
+        in degrees, for the crystallite sizes
+
+    Returns
+    -------
+    pd.DataFrame
+        one row per peak: the pattern, the fitted PARAMETERS and their errors, the area, the Scherrer crystallite
+        size in angstroms, and the diagnostics chi2, reduced_chi2, iterations, converged, status and n_points
+
+    """
+    if isinstance(dfs, PowderDiffraction):
+        dfs = [dfs]
+    if peaks is None:
+        peaks = peaksearch.find_peaks(dfs, **search_kwargs)
+
+    twotheta, intensity = peaksearch.stack_patterns(dfs)
+    uncertainty = None
+    if any("uncertainty" in df.columns for df in dfs):
+        uncertainty = np.full(twotheta.shape, np.nan)
+        for i, df in enumerate(dfs):
+            if "uncertainty" in df.columns:
+                uncertainty[i, :len(df)] = df.array("uncertainty")
+
+    patterns = peaks["pattern"].values.astype(np.int64)
+    centers = peaks["twotheta"].values.astype(float)
+    fwhms = peaks["fwhm"].values.astype(float)
+    x, y, weights, absolute_sigma = extract_windows(twotheta, intensity, uncertainty, patterns, centers, fwhms,
+                                                    window)
+
+    initial = np.column_stack((
+        centers, fwhms, peaks["intensity"].values, np.full(len(peaks), 0.5), peaks["background"].values,
+        np.zeros(len(peaks)),
+    ))
+    params, diagnostics = levenberg_marquardt(x, y, weights, initial, max_iterations, tolerance)
+    errors, reduced_chi2 = parameter_errors(params, x, weights, diagnostics["chi2"], absolute_sigma)
+
+    wavelength = np.array([df.metadata["wavelength"] if df.metadata["wavelength"] is not None else np.nan
+                           for df in dfs], dtype=float)[patterns]
+    table = OrderedDict((("pattern", patterns),))
+    for i, name in enumerate(PARAMETERS):
+        table[name] = params[:, i]
+    for i, name in enumerate(PARAMETERS[:4]):
+        table[name + "_error"] = errors[:, i]
+    table["area"] = pseudo_voigt_area(params[:, 1], params[:, 2], params[:, 3])
+    table["crystallite_size"] = scherrer_size(params[:, 1], params[:, 0], wavelength,
+                                              instrumental_fwhm=instrumental_fwhm)
+    table["chi2"] = diagnostics["chi2"]
+    table["reduced_chi2"] = reduced_chi2
+    table["iterations"] = diagnostics["iterations"]
+    table["converged"] = diagnostics["converged"]
+    table["status"] = diagnostics["status"]
+    table["n_points"] = np.sum(weights > 0, axis=1)
+    return pd.DataFrame(table, index=peaks.index)
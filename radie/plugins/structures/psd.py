@@ -1,7 +1,228 @@
 from collections import OrderedDict
 
 import numpy as np
+import pandas as pd
 from radie.structures import StructuredDataFrame, register_data_structures
+from radie.structures.structureddataframe import column_property
+
+DISTRIBUTION_POWERS = OrderedDict((
+    ("number", 0),
+    ("area", 2),
+    ("volume", 3),
+))  # distribution_mode: power of the diameter that weights each particle, for spheres
+STATISTICS_PERCENTILES = (10, 50, 90)
+
+
+def distribution_power(mode):
+    try:
+        return DISTRIBUTION_POWERS[mode.lower()]
+    except (KeyError, AttributeError):
+        raise ValueError("unknown distribution mode {:}, must be one of {:s}".format(
+            mode, ", ".join(DISTRIBUTION_POWERS)))
+
+
+def stack_distributions(psds):
+    """
+    the diameters and frequencies of many PSDs as 2D arrays, one row per PSD.  Shorter distributions are padded at
+    the end with their last diameter and zero frequency, which changes none of the statistics
+
+    Parameters
+    ----------
+    psds : list of PSD
+
+    Returns
+    -------
+    diameter : np.ndarray
+    frequency : np.ndarray
+
+    """
+    n = max(len(psd) for psd in psds)
+    diameter = np.empty((len(psds), n))
+    frequency = np.zeros((len(psds), n))
+    for i, psd in enumerate(psds):
+        d = psd.diameter.values
+        diameter[i, :len(d)] = d
+        diameter[i, len(d):] = d[-1] if len(d) else np.nan
+        frequency[i, :len(d)] = psd.frequency.values
+    return diameter, frequency
+
+
+def convert_frequency(diameter, frequency, source, target):
+    """
+    convert frequencies between number, area and volume distributions, assuming spherical particles.  The total of
+    each distribution is kept, i.e. a distribution in percent stays in percent
+
+    Parameters
+    ----------
+    diameter : np.ndarray
+    frequency : np.ndarray
+        1D, or 2D with one distribution per row
+    source : str or list of str
+        the distribution mode of the frequencies, one per row for 2D arrays
+    target : str
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    if isinstance(source, str):
+        source_power = distribution_power(source)
+    else:
+        source_power = np.array([distribution_power(mode) for mode in source])[:, np.newaxis]
+    converted = frequency * diameter ** (distribution_power(target) - source_power)
+    total = frequency.sum(axis=-1, keepdims=True)
+    converted_total = converted.sum(axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return converted * np.where(converted_total != 0, total / converted_total, 0.)
+
+
+def percentiles_kernel(diameter, frequency, targets):
+    """
+    the diameters below which the given percentages of the distributions lie, interpolating log(diameter) linearly
+    in the cumulative distribution.  All rows and targets are found with a single binary search.  The 0 and 100
+    percentiles are the smallest and largest diameters with a non-zero frequency, as in `PSD.d`
+
+    Parameters
+    ----------
+    diameter : np.ndarray
+        2D, one distribution per row, increasing along each row
+    frequency : np.ndarray
+        2D, in percent
+    targets : np.ndarray
+        1D, percentages in [0, 100]
+
+    Returns
+    -------
+    np.ndarray
+        2D, rows x targets
+
+    """
+    rows, n = frequency.shape
+    targets = np.asarray(targets, dtype=float)
+    if np.any((targets < 0) | (targets > 100)):
+        raise ValueError("percentiles must be in the [0,100] range")
+
+    undersize = np.cumsum(frequency, axis=1)
+    # offset each row so that the rows are consecutive sorted segments of one flat array
+    spacing = max(float(np.nanmax(undersize, initial=0.)), 100.) + 1.
+    offsets = np.arange(rows)[:, np.newaxis] * spacing
+    flat = (undersize + offsets).ravel()
+    row_start = np.arange(rows)[:, np.newaxis] * n
+
+    upper = np.searchsorted(flat, (targets + offsets).ravel(), side="left").reshape(rows, -1) - row_start
+    upper = np.clip(upper, 0, n - 1)
+    lower = np.clip(upper - 1, 0, n - 1)
+
+    row = np.arange(rows)[:, np.newaxis]
+    log_d = np.log(diameter)
+    u_lower, u_upper = undersize[row, lower], undersize[row, upper]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        fraction = np.where(u_upper > u_lower, (targets - u_lower) / (u_upper - u_lower), 1.)
+    fraction = np.clip(fraction, 0., 1.)
+    result = np.exp(log_d[row, lower] + fraction * (log_d[row, upper] - log_d[row, lower]))
+
+    oversize = 100. - undersize  # compared as in `PSD.dmin` and `PSD.dmax`, negligible fractions round away
+    if np.any(targets == 0):  # the first diameter with particles
+        first = np.argmax(oversize < 100, axis=1)
+        result[:, targets == 0] = diameter[np.arange(rows), first][:, np.newaxis]
+    if np.any(targets == 100):  # the last diameter with particles above it
+        last = np.clip(np.sum(oversize > 0, axis=1) - 1, 0, n - 1)
+        result[:, targets == 100] = diameter[np.arange(rows), last][:, np.newaxis]
+    return result
+
+
+def moments_kernel(diameter, frequency):
+    """
+    frequency weighted statistics of the diameter of distributions
+
+    Parameters
+    ----------
+    diameter : np.ndarray
+        2D, one distribution per row
+    frequency : np.ndarray
+        2D
+
+    Returns
+    -------
+    OrderedDict
+        1D arrays of the mean, variance, standard deviation, mode, geometric mean and geometric standard deviation
+
+    """
+    total = frequency.sum(axis=1)
+    log_d = np.log(diameter)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (frequency * diameter).sum(axis=1) / total
+        variance = (frequency * (diameter - mean[:, np.newaxis]) ** 2).sum(axis=1) / total
+        log_mean = (frequency * log_d).sum(axis=1) / total
+        log_variance = (frequency * (log_d - log_mean[:, np.newaxis]) ** 2).sum(axis=1) / total
+    return OrderedDict((
+        ("mean", mean),
+        ("variance", variance),
+        ("std", np.sqrt(variance)),
+        ("mode", diameter[np.arange(len(diameter)), np.argmax(frequency, axis=1)]),
+        ("geometric_mean", np.exp(log_mean)),
+        ("geometric_std", np.exp(np.sqrt(log_variance))),
+    ))
+
+
+def percentiles(psds, targets, mode=None):
+    """
+    the percentiles of many PSDs at once, see `PSD.percentiles`
+
+    Parameters
+    ----------
+    psds : list of PSD
+    targets : array-like
+        percentages in [0, 100]
+    mode : str, optional
+        "number", "area" or "volume", convert the distributions first.  By default the distributions are used as is
+
+    Returns
+    -------
+    np.ndarray
+        2D, psds x targets
+
+    """
+    diameter, frequency = stack_distributions(psds)
+    if mode is not None:
+        frequency = convert_frequency(diameter, frequency, [psd.metadata["distribution_mode"] for psd in psds], mode)
+    return percentiles_kernel(diameter, frequency, np.atleast_1d(targets))
+
+
+def statistics(psds, mode=None, targets=STATISTICS_PERCENTILES):
+    """
+    the statistics of many PSDs as one stacked computation, e.g. for QC reports over many LA-960 runs
+
+    Parameters
+    ----------
+    psds : list of PSD
+    mode : str, optional
+        "number", "area" or "volume", convert the distributions first.  By default the distributions are used as is
+    targets : array-like
+        the percentiles to report, as columns d10, d50, ... The span needs 10, 50 and 90
+
+    Returns
+    -------
+    pandas.DataFrame
+        one row per PSD, indexed by name, with the percentile diameters, span, mean, variance, std, mode,
+        geometric_mean and geometric_std
+
+    """
+    psds = list(psds)
+    targets = np.atleast_1d(np.asarray(targets, dtype=float))
+    diameter, frequency = stack_distributions(psds)
+    if mode is not None:
+        frequency = convert_frequency(diameter, frequency, [psd.metadata["distribution_mode"] for psd in psds], mode)
+
+    table = OrderedDict()
+    d = percentiles_kernel(diameter, frequency, targets)
+    for i, target in enumerate(targets):
+        table["d{:g}".format(target)] = d[:, i]
+    if all(t in targets for t in (10, 50, 90)):
+        table["span"] = (table["d90"] - table["d10"]) / table["d50"]
+    table.update(moments_kernel(diameter, frequency))
+    return pd.DataFrame(table, index=pd.Index([psd.metadata["name"] for psd in psds], name="name"))
 
 
 class PSD(StructuredDataFrame):
@@ -80,20 +301,63 @@ class PSD(StructuredDataFrame):
         """
         if number > 100 or number < 0:
             raise ValueError("Supplied number (%s) must be in [0,100] range" % number)
-        if number == 0:
-            return self.dmin
-        elif number == 100:
-            return self.dmax
-
-        oversize_target = 100 - number
-        oversize_less = self.oversize <= oversize_target
-        oversize_more = self.oversize > oversize_target
-        d_min, oversize_min = self.diameter[oversize_more].iloc[-1], self.oversize[oversize_more].iloc[-1]
-        d_max, oversize_max = self.diameter[oversize_less].iloc[0], self.oversize[oversize_less].iloc[0]
-        return np.exp(
-            np.interp(oversize_target, np.array([oversize_max, oversize_min]), np.log(np.array([d_max, d_min]))))
+        return self.percentiles([number])[0]
 
-    @property
+    def percentiles(self, targets):
+        """
+        the diameters for many distribution fractions, interpolated from one cumulative distribution
+
+        Parameters
+        ----------
+        targets : array-like
+            distribution fractions in the [0,100] range, e.g. [10, 50, 90]
+
+        Returns
+        -------
+        np.ndarray
+            Particles with diameters of the returned values or less account for the targets of the distribution
+
+        """
+        diameter, frequency = self.diameter.values[np.newaxis], self.frequency.values[np.newaxis]
+        return percentiles_kernel(diameter, frequency, np.atleast_1d(targets))[0]
+
+    def moments(self):
+        """
+        Returns
+        -------
+        OrderedDict
+            the frequency weighted mean, variance, std, mode, geometric_mean and geometric_std of the diameter, and
+            the span (D90 - D10) / D50
+        """
+        d10, d50, d90 = self.percentiles([10, 50, 90])
+        moments = moments_kernel(self.diameter.values[np.newaxis], self.frequency.values[np.newaxis])
+        statistics_ = OrderedDict((key, float(value[0])) for key, value in moments.items())
+        statistics_["span"] = (d90 - d10) / d50
+        return statistics_
+
+    def convert_distribution(self, mode):
+        """
+        convert between number, area and volume distributions, assuming spherical particles
+
+        Parameters
+        ----------
+        mode : str
+            "number", "area" or "volume"
+
+        Returns
+        -------
+        PSD
+            a new PSD with the converted frequencies, in the same total as this one
+        """
+        distribution_power(mode)
+        frequency = convert_frequency(self.diameter.values, self.frequency.values,
+                                      self.metadata["distribution_mode"], mode)
+        metadata = self.metadata.copy()
+        metadata["distribution_mode"] = mode.lower()
+        return self.__class__(pd.DataFrame(OrderedDict((("diameter", self.diameter.values),
+                                                        ("frequency", frequency)))), **metadata)
+
+    @column_property(columns=["frequency"])
     def oversize(self):
         """
         Returns
@@ -2,6 +2,7 @@ from collections import OrderedDict
 import numpy as np
 import pandas as pd
 from radie.structures import StructuredDataFrame, register_data_structures
+from radie.structures.structureddataframe import column_property
 
 
 class TGA(StructuredDataFrame):
@@ -26,12 +27,12 @@ class TGA(StructuredDataFrame):
     ))
     _column_properties = ["norm_weight", "deriv_norm_weight", "deriv_weight"]
 
-    @property
+    @column_property(columns=["weight"])
     def norm_weight(self):
         """Normalize the weight using the first datapoint (samples can gain or lose mass)"""
         return self.weight/self.weight[0]
 
-    @property
+    @column_property(columns=["weight", "temperature"])
     def deriv_norm_weight(self):
         """
         Normalized weight derivative wrt temperature
@@ -43,7 +44,7 @@ class TGA(StructuredDataFrame):
         x = self.temperature.values
         return pd.Series(np.gradient(y, x), name='Deriv. Weight (%/°C)')
 
-    @property
+    @column_property(columns=["weight", "temperature"])
     def deriv_weight(self):
         """
         Normalized weight derivative wrt temperature
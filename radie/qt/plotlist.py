@@ -42,14 +42,13 @@ class DFItem(object):
         return self.ref.df
 
     def x_data(self) -> np.ndarray:
-        data = self.accessors[self.x_accessor]().values
-        return data
+        return self.df.array(self.x_accessor)
 
     def y_data(self) -> np.ndarray:
-        return self.accessors[self.y_accessor]().values
+        return self.df.array(self.y_accessor)
 
     def z_data(self) -> np.ndarray:
-        return self.accessors[self.z_accessor]().values
+        return self.df.array(self.z_accessor)
 
     def setText(self, value):
         self.text = value
@@ -5,7 +5,7 @@ import sip
 import pyqtgraph as pg
 
 from ..structures import StructuredDataFrame
-from ..import loaders
+from ..import loaders, watcher
 from . import cfg, visualizations, dpi, masterdftree
 from . import functions as fn
 
@@ -168,6 +168,9 @@ class MainWindow(QtWidgets.QMainWindow):
         self.action_importFromClipboard = QtWidgets.QAction("Import from &Clipboard", self)
         self.action_importFromClipboard.triggered.connect(self.importDataFrameFromClipboard)
         self.menuFile.addAction(self.action_importFromClipboard)
+        self.action_watchFolder = QtWidgets.QAction("&Watch Folder...", self)
+        self.action_watchFolder.triggered.connect(self.requestWatchFolder)
+        self.menuFile.addAction(self.action_watchFolder)
         self.menubar.addAction(self.menuFile.menuAction())
 
         self.menuEdit = QtWidgets.QMenu("&Edit", self.menubar)
@@ -218,6 +221,12 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.actionSave.setEnabled(False)
 
+        # folder watchers load files in worker threads, the results are added to the tree from the gui thread
+        self.watchers = []  # type: list
+        self.watcherTimer = QtCore.QTimer(self)
+        self.watcherTimer.setInterval(250)
+        self.watcherTimer.timeout.connect(self.collectWatchedFiles)
+
     def showNewVisualizationsMenu(self, pos: QtCore.QPoint):
         menu = QtWidgets.QMenu()
         for action in self.vis_actions:
@@ -232,6 +241,8 @@ class MainWindow(QtWidgets.QMainWindow):
                                                quit_msg, QtWidgets.QMessageBox.Yes, QtWidgets.QMessageBox.No)
 
         if reply == QtWidgets.QMessageBox.Yes:
+            for folder_watcher in self.watchers:  # type: watcher.FolderWatcher
+                folder_watcher.stop(wait=False)
             event.accept()
         else:
             event.ignore()
@@ -267,6 +278,35 @@ class MainWindow(QtWidgets.QMainWindow):
             fn.error_popup(err_msg)
         return
 
+    def requestWatchFolder(self):
+        directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Watch Folder")
+        if directory:
+            self.watchFolder(directory)
+
+    def watchFolder(self, directory: str, **kwargs):
+        """load new files from an instrument output folder as they appear, see `radie.watcher.FolderWatcher`"""
+        folder_watcher = watcher.FolderWatcher(directory, **kwargs)
+        folder_watcher.start()
+        self.watchers.append(folder_watcher)
+        self.watcherTimer.start()
+        self.statusbar.showMessage("watching {:}".format(directory))
+        return folder_watcher
+
+    def collectWatchedFiles(self):
+        err_msg = ""
+        for folder_watcher in self.watchers:  # type: watcher.FolderWatcher
+            while not folder_watcher.results.empty():
+                fname, dfs, error = folder_watcher.results.get()
+                if error is not None:
+                    err_msg += "\nError: {:}.\ncould not load file: {:}".format(str(error), fname)
+                    continue
+                for df in dfs:  # type: StructuredDataFrame
+                    self.treeView_dataFrames.addDataFrame(df)
+                self.statusbar.showMessage("loaded {:}".format(fname))
+
+        if err_msg.strip():
+            self.statusbar.showMessage(err_msg.strip().splitlines()[-1])
+
     def addNewVisualization(self, visualization: visualizations.base.Visualization):
         subwindow = VisualizationWindow(visualization())
         item = SubWindowListItem(subwindow, name=visualization.name)
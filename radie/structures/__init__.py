@@ -1,14 +1,17 @@
 import warnings
-from collections import OrderedDict
 
+from .. import plugins
 from . import structureddataframe
 from .structureddataframe import StructuredDataFrame
+from .collection import StructuredCollection
+from . import resampling
 
 __all__ = [
-    StructuredDataFrame.__name__
+    StructuredDataFrame.__name__,
+    StructuredCollection.__name__,
 ]
 
-structures = OrderedDict()
+structures = plugins.LazyRegistry()  # name: StructuredDataFrame class, filled in by the plugins
 structures[StructuredDataFrame.__name__] = StructuredDataFrame
 
 
@@ -22,14 +25,22 @@ def register_data_structures(*sub_classes):
         StructuredDataFrame sub-classes as arguments
 
     """
-    for cls in sub_classes:  # type: StructuredDataFrame
-        if cls.__name__ in structures.keys():
-            warnings.warn("overwriting {:s} df_class".format(cls.__name__))
-        structures[cls.__name__] = cls
-        globals()[cls.__name__] = cls  # put the class into this scope
-
-        if cls.__name__ not in __all__:
-            __all__.append(cls.__name__)
+    with structures.lock:
+        for cls in sub_classes:  # type: StructuredDataFrame
+            if structures.registered(cls.__name__) is not None:
+                warnings.warn("overwriting {:s} df_class".format(cls.__name__))
+            structures[cls.__name__] = cls
+            globals()[cls.__name__] = cls  # put the class into this scope
+
+            if cls.__name__ not in __all__:
+                __all__.append(cls.__name__)
+
+
+def __getattr__(name):
+    """import the plugin of a structure class the first time it is accessed, e.g. radie.structures.PowderDiffraction"""
+    if name in structures:
+        return structures[name]
+    raise AttributeError("module {:s} has no attribute {:s}".format(__name__, name))
 
 
 def print_available_structures():
@@ -0,0 +1,311 @@
+"""many measurements of one StructuredDataFrame class in shared, contiguous storage
+
+A `StructuredCollection` stores each column of all its members as one concatenated numpy array, with an `offsets`
+array marking where each member starts, and the metadata of all members as a single pandas DataFrame with one row per
+member.  The per-member overhead is one offset and one metadata row, instead of a block manager and an OrderedDict per
+member, and per-member reductions are single `np.ufunc.reduceat` calls over the concatenated arrays.  Members are
+returned as StructuredDataFrames whose columns are views of the shared arrays.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas
+
+REDUCTIONS = ("sum", "mean", "min", "max", "var", "std", "argmin", "argmax", "count")
+
+
+class StructuredCollection(object):
+    """many StructuredDataFrames of one class, stored as ragged column arrays with offsets and a metadata table
+
+    Attributes
+    ----------
+    cls : type
+        the StructuredDataFrame class of the members
+    columns : OrderedDict
+        column label: the values of all members concatenated, as a 1D numpy array
+    offsets : np.ndarray
+        int64 array of length n + 1, member i holds the rows offsets[i]:offsets[i + 1]
+    metadata : pandas.DataFrame
+        one row per member, one column per metadata key
+
+    """
+
+    def __init__(self, cls, columns, offsets, metadata=None):
+        """
+        Parameters
+        ----------
+        cls : type
+            a StructuredDataFrame class
+        columns : OrderedDict
+            column label: 1D array of the concatenated values of all members
+        offsets : array-like
+            the start of each member in the column arrays followed by the total length
+        metadata : pandas.DataFrame or list of dict, optional
+            one row or dict per member, by default the class defaults of the metadata
+        """
+        self.cls = cls
+        self.columns = OrderedDict((label, np.asarray(values)) for label, values in columns.items())
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if self.offsets.ndim != 1 or len(self.offsets) < 1 or self.offsets[0] != 0 or \
+                np.any(np.diff(self.offsets) < 0):
+            raise ValueError("offsets must start at 0 and be non-decreasing")
+        for label, values in self.columns.items():
+            if values.ndim != 1 or len(values) != self.offsets[-1]:
+                raise ValueError("column {:} must be 1D with {:d} values".format(label, int(self.offsets[-1])))
+
+        if metadata is None:
+            metadata = [cls._metadata_defaults() for i in range(len(self))]
+        if not isinstance(metadata, pandas.DataFrame):
+            metadata = pandas.DataFrame.from_records(list(metadata), index=pandas.RangeIndex(len(self)))
+        if len(metadata) != len(self):
+            raise ValueError("the metadata table must have one row per member")
+        self.metadata = metadata.reset_index(drop=True)
+
+    @classmethod
+    def from_dataframes(cls, dfs):
+        """
+        collect StructuredDataFrames of one class, copying their columns into the shared arrays
+
+        Parameters
+        ----------
+        dfs : iterable of StructuredDataFrame
+            all of the same class and with the same column labels.  The index of the members is not kept
+
+        Returns
+        -------
+        StructuredCollection
+
+        """
+        dfs = list(dfs)
+        if not dfs:
+            raise ValueError("a StructuredCollection needs at least one member to determine its class")
+        df_class = type(dfs[0])
+        labels = list(dfs[0].columns)
+        for df in dfs:
+            if type(df) is not df_class:
+                raise TypeError("all members must be of class {:s}, not {:s}".format(
+                    df_class.__name__, type(df).__name__))
+            if list(df.columns) != labels:
+                raise ValueError("all members must have the columns {:}".format(labels))
+
+        offsets = np.zeros(len(dfs) + 1, dtype=np.int64)
+        np.cumsum([len(df) for df in dfs], out=offsets[1:])
+        columns = OrderedDict()
+        for j, label in enumerate(labels):
+            columns[label] = np.concatenate([df.iloc[:, j].values for df in dfs])
+        return cls(df_class, columns, offsets, [df.metadata for df in dfs])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self):
+        """the number of rows of each member"""
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self):
+        """the memory held by the column arrays and the offsets, the metadata table not included"""
+        return self.offsets.nbytes + sum(values.nbytes for values in self.columns.values())
+
+    def member_metadata(self, i):
+        """the metadata of member i as an OrderedDict, leaving out keys that other members have and i does not"""
+        metadata = OrderedDict()
+        for key, value in self.metadata.iloc[i].items():
+            if key not in self.cls._required_metadata and np.ndim(value) == 0 and pandas.isna(value):
+                continue
+            metadata[key] = value.item() if isinstance(value, np.generic) else value
+        return metadata
+
+    def member(self, i):
+        """
+        member i as a StructuredDataFrame whose columns are views of the shared arrays, so no column data is copied.
+        Under pandas copy-on-write, changes to the member do not write through to the collection
+
+        Returns
+        -------
+        StructuredDataFrame
+
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("member index out of range")
+        start, stop = self.offsets[i], self.offsets[i + 1]
+        data = OrderedDict((label, values[start:stop]) for label, values in self.columns.items())
+        return self.cls(data, columns=list(self.columns), copy=False, **self.member_metadata(i))
+
+    def __getitem__(self, item):
+        """an integer gives a member, see `member`.  A slice, integer array or boolean mask gives a new collection"""
+        if isinstance(item, (int, np.integer)):
+            return self.member(int(item))
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step == 1:  # contiguous members share the column arrays
+                stop = max(start, stop)
+                base = self.offsets[start]
+                columns = OrderedDict((label, values[base:self.offsets[stop]])
+                                      for label, values in self.columns.items())
+                return StructuredCollection(self.cls, columns, self.offsets[start:stop + 1] - base,
+                                            self.metadata.iloc[start:stop])
+            item = np.arange(start, stop, step)
+        return self.take(item)
+
+    def take(self, indices):
+        """
+        a new collection of the selected members, with copied column arrays
+
+        Parameters
+        ----------
+        indices : array-like
+            integer positions or a boolean mask
+
+        Returns
+        -------
+        StructuredCollection
+
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        lengths = self.lengths[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # the rows of all selected members at once: each member's start repeated over its length plus a running count
+        rows = np.repeat(self.offsets[:-1][indices] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        columns = OrderedDict((label, values[rows]) for label, values in self.columns.items())
+        return StructuredCollection(self.cls, columns, offsets, self.metadata.iloc[indices])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.member(i)
+
+    def to_list(self):
+        """the members as a list of StructuredDataFrames"""
+        return list(self)
+
+    def member_ids(self):
+        """the member index of every row of the column arrays"""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def reduce(self, label, reduction):
+        """
+        a reduction of one column over each member, vectorized over all members
+
+        Parameters
+        ----------
+        label : typing.Hashable
+            a column label
+        reduction : str
+            one of "sum", "mean", "min", "max", "var", "std", "argmin", "argmax" (the row within the member) or
+            "count"
+
+        Returns
+        -------
+        np.ndarray
+            one value per member, NaN for the members without rows (-1 for argmin and argmax, 0 for sum and count)
+
+        """
+        if reduction not in REDUCTIONS:
+            raise ValueError("reduction must be one of {:s}".format(", ".join(REDUCTIONS)))
+        lengths = self.lengths
+        if reduction == "count":
+            return lengths.copy()
+
+        values = self.columns[label]
+        filled = lengths > 0
+        starts = self.offsets[:-1][filled]  # reduceat misbehaves on empty segments, so they are left out
+        result_dtype = np.int64 if reduction.startswith("arg") else np.result_type(values.dtype, np.float64)
+        result = np.full(len(self), -1 if reduction.startswith("arg") else np.nan, dtype=result_dtype)
+        if reduction == "sum":
+            result[:] = 0
+        if not len(starts):
+            return result
+
+        if reduction in ("sum", "mean", "var", "std"):
+            sums = np.add.reduceat(values, starts)
+            if reduction == "sum":
+                result[filled] = sums
+                return result
+            means = sums / lengths[filled]
+            if reduction == "mean":
+                result[filled] = means
+                return result
+            deviations = values - np.repeat(means, lengths[filled])
+            variance = np.add.reduceat(deviations * deviations, starts) / lengths[filled]
+            result[filled] = variance if reduction == "var" else np.sqrt(variance)
+        elif reduction in ("min", "max"):
+            result[filled] = (np.minimum if reduction == "min" else np.maximum).reduceat(values, starts)
+        else:
+            extreme = (np.minimum if reduction == "argmin" else np.maximum).reduceat(values, starts)
+            # the first row of each member that equals its extreme, rows that don't are pushed past the end
+            positions = np.where(values == np.repeat(extreme, lengths[filled]), np.arange(len(values)), len(values))
+            result[filled] = np.minimum.reduceat(positions, starts) - starts
+        return result
+
+    def sum(self, label):
+        return self.reduce(label, "sum")
+
+    def mean(self, label):
+        return self.reduce(label, "mean")
+
+    def min(self, label):
+        return self.reduce(label, "min")
+
+    def max(self, label):
+        return self.reduce(label, "max")
+
+    def std(self, label):
+        return self.reduce(label, "std")
+
+    def at_extreme(self, label, of, reduction="argmax"):
+        """
+        the value of column `label` at the row where column `of` is largest (or smallest) in each member, e.g. the
+        twotheta of the strongest peak of each pattern
+
+        Returns
+        -------
+        np.ndarray
+            NaN for members without rows
+
+        """
+        rows = self.reduce(of, reduction)
+        result = np.full(len(self), np.nan)
+        filled = rows >= 0
+        result[filled] = self.columns[label][self.offsets[:-1][filled] + rows[filled]]
+        return result
+
+    def summary(self, reductions=("min", "max", "mean")):
+        """
+        a table of reductions of every column, one row per member, with the member names as index
+
+        Returns
+        -------
+        pandas.DataFrame
+
+        """
+        table = OrderedDict()
+        for label in self.columns:
+            for reduction in reductions:
+                table["{:}_{:s}".format(label, reduction)] = self.reduce(label, reduction)
+        index = self.metadata["name"] if "name" in self.metadata else None
+        return pandas.DataFrame(table, index=index)
+
+    def resample(self, x=None, y=None, grid=None, **kwargs):
+        """all members on one x grid as a dense 2D array, see `radie.structures.resampling.resample`
+
+        Returns
+        -------
+        grid : np.ndarray
+        values : np.ndarray
+            one row per member
+        mask : np.ndarray
+            True for the points outside of the x range of each member
+
+        """
+        from .resampling import resample
+        return resample(self, x, y, grid, **kwargs)
+
+    def __repr__(self):
+        return "<StructuredCollection of {:d} {:s}, {:d} rows>".format(
+            len(self), self.cls.__name__, int(self.offsets[-1]))
@@ -0,0 +1,218 @@
+"""reduce long x, y series to a few points for display while keeping their peaks and extremes
+
+Both methods split the x range into buckets of equal width in x, not of equal point counts, so that non-uniformly
+sampled data, e.g. merged scans with different steps, is reduced evenly along x.  Buckets are contiguous segments of
+the x-sorted data, and the per-bucket selections are `np.ufunc.reduceat` calls over all buckets at once.
+
+minmax
+    keeps the first and last point and the smallest and largest y of each bucket, so that every peak and dip of the
+    full data is drawn
+lttb
+    largest triangle three buckets, keeps the first and last point and the point of each bucket that forms the largest
+    triangle with its neighbouring buckets.  The neighbours are represented by their averages on both sides, instead
+    of the previously selected point as in the sequential algorithm, so that all buckets are independent
+
+A `DecimationPyramid` precomputes the decimations at halving resolutions, so that further requests only reduce the
+nearest level, in time proportional to the number of points requested.
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _bucket_starts(x, n_buckets):
+    """the first position of each non-empty bucket of equal x width over sorted x"""
+    if n_buckets <= 1 or x[-1] <= x[0]:
+        return np.zeros(1, dtype=np.int64)
+    edges = x[0] + (x[-1] - x[0]) * (np.arange(1, n_buckets) / n_buckets)
+    starts = np.concatenate(([0], np.searchsorted(x, edges, side="left")))
+    return np.unique(starts[starts < len(x)])
+
+
+def _segment_arg(values, starts, ufunc):
+    """the position of the first extreme of each segment, ufunc being np.minimum or np.maximum"""
+    lengths = np.diff(np.append(starts, len(values)))
+    extreme = ufunc.reduceat(values, starts)
+    positions = np.where(values == np.repeat(extreme, lengths), np.arange(len(values)), len(values))
+    return np.minimum.reduceat(positions, starts)
+
+
+def minmax(x, y, n_points):
+    """
+    the positions of the first and last point and of the smallest and largest y of each of (n_points - 2) / 2 buckets
+
+    Parameters
+    ----------
+    x : np.ndarray
+        sorted and finite
+    y : np.ndarray
+    n_points : int
+        the maximum number of points to keep
+
+    Returns
+    -------
+    np.ndarray
+        sorted positions
+
+    """
+    n = len(x)
+    if n <= n_points:
+        return np.arange(n)
+    n_buckets = (n_points - 2) // 2
+    if n_buckets < 1:
+        return np.array([0, n - 1][:max(n_points, 0)], dtype=np.int64)
+    starts = _bucket_starts(x, n_buckets)
+    nan = np.isnan(y)
+    low = _segment_arg(np.where(nan, np.inf, y), starts, np.minimum)
+    high = _segment_arg(np.where(nan, -np.inf, y), starts, np.maximum)
+    return np.unique(np.concatenate(([0], low, high, [n - 1])))
+
+
+def lttb(x, y, n_points):
+    """
+    the positions of the first and last point and of the point of each of n_points - 2 buckets that forms the largest
+    triangle with the averages of the neighbouring buckets
+
+    Parameters
+    ----------
+    x : np.ndarray
+        sorted and finite
+    y : np.ndarray
+    n_points : int
+        the maximum number of points to keep
+
+    Returns
+    -------
+    np.ndarray
+        sorted positions
+
+    """
+    n = len(x)
+    if n <= n_points:
+        return np.arange(n)
+    if n_points < 3:
+        return np.array([0, n - 1][:max(n_points, 0)], dtype=np.int64)
+
+    px, py = x[1:-1], y[1:-1]
+    starts = _bucket_starts(px, n_points - 2)
+    valid = ~np.isnan(py)
+    counts = np.add.reduceat(valid.astype(np.int64), starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = np.add.reduceat(np.where(valid, px, 0.), starts) / counts
+        mean_y = np.add.reduceat(np.where(valid, py, 0.), starts) / counts
+
+    # the neighbours of each bucket: the first and last point at the ends, the bucket averages in between
+    ax, ay = np.append(x[0], mean_x[:-1]), np.append(y[0], mean_y[:-1])
+    cx, cy = np.append(mean_x[1:], x[-1]), np.append(mean_y[1:], y[-1])
+    lengths = np.diff(np.append(starts, len(px)))
+    ax, ay, cx, cy = (np.repeat(values, lengths) for values in (ax, ay, cx, cy))
+    area = np.abs((ax - cx) * (py - ay) - (ax - px) * (cy - ay))
+    area[np.isnan(area)] = -1.
+    return np.concatenate(([0], _segment_arg(area, starts, np.maximum) + 1, [n - 1]))
+
+
+methods = OrderedDict((
+    ("minmax", minmax),
+    ("lttb", lttb),
+))  # name: function(x, y, n_points) -> positions
+
+
+def sorted_positions(x):
+    """the positions of the finite x values in order of increasing x"""
+    positions = np.flatnonzero(np.isfinite(x))
+    values = x[positions]
+    if np.any(values[1:] < values[:-1]):
+        positions = positions[np.argsort(values, kind="stable")]
+    return positions
+
+
+def decimate_indices(x, y, n_points, method="minmax"):
+    """
+    the positions of the points to keep, in order of increasing x, see `methods`.  Points with non-finite x are dropped
+
+    Parameters
+    ----------
+    x : np.ndarray
+    y : np.ndarray
+    n_points : int
+    method : str
+        a key of `methods`
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    positions = sorted_positions(x)
+    return positions[methods[method](x[positions], y[positions], n_points)]
+
+
+class DecimationPyramid(object):
+    """decimations of one x, y series precomputed at halving resolutions
+
+    Each level is computed from the next finer one, so the pyramid is built in time proportional to the length of the
+    series.  A request for n points reduces the coarsest level holding at least 2n points, which holds fewer than about
+    4n points.  For minmax the bucket counts are powers of two over the same x range, so the buckets of a level are
+    unions of the buckets of the finer levels and the extremes are exact at those resolutions
+
+    Attributes
+    ----------
+    method : str
+    positions : np.ndarray
+        the positions of the finite x values in order of increasing x
+    levels : list of (int, np.ndarray)
+        the nominal number of points and the kept positions into `positions`, finest first
+
+    """
+
+    def __init__(self, x, y, method="minmax", min_points=256):
+        """
+        Parameters
+        ----------
+        x : np.ndarray
+        y : np.ndarray
+        method : str
+            a key of `methods`
+        min_points : int
+            the size of the coarsest level
+        """
+        self.method = method
+        self.function = methods[method]
+        self.positions = sorted_positions(x)
+        self.x = np.asarray(x)[self.positions]
+        self.y = np.asarray(y)[self.positions]
+        self.levels = []
+
+        n = len(self.positions)
+        extra = 2  # the first and last point
+        per_bucket = 2 if method == "minmax" else 1
+        n_buckets = 1
+        while (2 * n_buckets) * per_bucket + extra < n // 2:
+            n_buckets *= 2
+        kept = np.arange(n)
+        while n_buckets * per_bucket + extra >= min_points:
+            n_points = n_buckets * per_bucket + extra
+            kept = kept[self.function(self.x[kept], self.y[kept], n_points)]
+            self.levels.append((n_points, kept))
+            n_buckets //= 2
+
+    def __len__(self):
+        return len(self.positions)
+
+    def indices(self, n_points):
+        """
+        the positions of the points to keep for a request of n_points, in order of increasing x
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        kept = np.arange(len(self.positions))
+        for level_points, level in self.levels:  # finest first
+            if level_points == n_points:
+                return self.positions[level]
+            if len(level) < 2 * n_points:  # coarser levels would leave buckets of the request empty
+                break
+            kept = level
+        return self.positions[kept[self.function(self.x[kept], self.y[kept], n_points)]]
@@ -0,0 +1,301 @@
+"""put many datasets on a shared x grid, e.g. to compare or average patterns
+
+The x and y values of all datasets are concatenated into flat arrays with offsets, as in `StructuredCollection`, and
+all datasets are interpolated onto the grid in one vectorized pass: a single `np.searchsorted` of every x value in the
+grid, a bincount and a cumulative sum give the interval of every grid point in every dataset.  The result is one dense
+2D array with a row per dataset, and a mask of the grid points outside of each dataset's x range.  The pass replaces a
+python loop over the datasets, which dominates for many short datasets.  Its temporaries are a few times the size of
+the output, the chunked mode bounds them for very many datasets and can write the values into a `np.memmap`.
+"""
+import numpy as np
+
+from .collection import StructuredCollection
+
+MAX_GRID_POINTS = 10 ** 7  # automatic grids larger than this are refused, pass n_points or step instead
+
+
+def _default_labels(df_or_cls, columns, x, y):
+    if x is None:
+        x = df_or_cls._x if df_or_cls._x else columns[0]
+    if y is None:
+        y = df_or_cls._y if df_or_cls._y else columns[1]
+    return x, y
+
+
+def gather(dfs, x=None, y=None):
+    """
+    the x and y values of many datasets as flat arrays with offsets, each dataset sorted by x and without non-finite x
+
+    Parameters
+    ----------
+    dfs : list of StructuredDataFrame or StructuredCollection
+    x : typing.Hashable, optional
+        a column label or column property name, by default the x column of each dataset
+    y : typing.Hashable, optional
+        by default the y column of each dataset
+
+    Returns
+    -------
+    x : np.ndarray
+    y : np.ndarray
+    offsets : np.ndarray
+        int64, length number of datasets + 1
+
+    """
+    if isinstance(dfs, StructuredCollection):
+        x, y = _default_labels(dfs.cls, list(dfs.columns), x, y)
+    if isinstance(dfs, StructuredCollection) and x in dfs.columns and y in dfs.columns:
+        x_values, y_values, offsets = dfs.columns[x], dfs.columns[y], dfs.offsets
+    else:
+        xs, ys = [], []
+        for df in dfs:
+            x_label, y_label = _default_labels(df, list(df.columns), x, y)
+            xs.append(df.array(x_label))
+            ys.append(df.array(y_label))
+        offsets = np.zeros(len(xs) + 1, dtype=np.int64)
+        np.cumsum([len(values) for values in xs], out=offsets[1:])
+        x_values = np.concatenate(xs).astype(float) if xs else np.empty(0)
+        y_values = np.concatenate(ys).astype(float) if ys else np.empty(0)
+
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    finite = np.isfinite(x_values)
+    if not finite.all():
+        x_values, y_values, rows = x_values[finite], y_values[finite], rows[finite]
+        offsets = np.searchsorted(rows, np.arange(len(offsets)), side="left").astype(np.int64)
+
+    steps = np.diff(x_values)
+    if np.any((steps < 0) & _within(offsets, len(steps))):
+        order = np.lexsort((x_values, rows))
+        x_values, y_values = x_values[order], y_values[order]
+    return np.asarray(x_values, dtype=float), np.asarray(y_values, dtype=float), offsets
+
+
+def _within(offsets, n_steps):
+    """mask of the steps of np.diff over concatenated datasets that lie within a dataset"""
+    within = np.ones(n_steps, dtype=bool)
+    boundaries = offsets[1:-1] - 1  # the step from the last point of a dataset to the first of the next
+    within[boundaries[(boundaries >= 0) & (boundaries < n_steps)]] = False
+    return within
+
+
+def _extent(x, offsets, log):
+    """the first and last x of each non-empty dataset and the smallest positive step within any dataset"""
+    if log:
+        if np.any(x <= 0):
+            raise ValueError("log grids need positive x values")
+        x = np.log(x)
+    filled = np.diff(offsets) > 0
+    steps = np.diff(x)
+    steps = steps[_within(offsets, len(steps)) & (steps > 0)]
+    return x[offsets[:-1][filled]], x[offsets[1:][filled] - 1], steps.min() if len(steps) else np.inf
+
+
+def _grid(lows, highs, min_step, mode, step, n_points, log):
+    if not len(lows):
+        raise ValueError("no data to build a grid from")
+    if mode == "union":
+        low, high = lows.min(), highs.max()
+    elif mode == "intersection":
+        low, high = lows.max(), highs.min()
+        if low > high:
+            raise ValueError("the datasets have no x range in common")
+    else:
+        raise ValueError('mode must be "union" or "intersection", not {:}'.format(mode))
+
+    if n_points is None:
+        if step is None:
+            if not np.isfinite(min_step):
+                raise ValueError("cannot determine a step, pass step or n_points")
+            step = min_step
+        elif log:
+            step = np.log(step)
+        n_points = int(np.floor((high - low) / step + 1e-9)) + 1
+        if n_points > MAX_GRID_POINTS:
+            raise ValueError("the automatic grid would have {:d} points, pass step or n_points".format(n_points))
+
+    grid = np.linspace(low, high, n_points)
+    return np.exp(grid) if log else grid
+
+
+def make_grid(x, offsets, mode="union", step=None, n_points=None, log=False):
+    """
+    an automatic grid covering many datasets
+
+    Parameters
+    ----------
+    x : np.ndarray
+        the x values of all datasets, as returned by `gather`
+    offsets : np.ndarray
+    mode : str
+        "union" spans from the smallest to the largest x of any dataset, "intersection" only the range that all
+        datasets cover
+    step : float, optional
+        the grid step, a ratio for log grids.  By default the smallest step between the x values of any dataset
+    n_points : int, optional
+        the number of grid points, overrides step
+    log : bool
+        logarithmically spaced points, e.g. for PSD diameters
+
+    Returns
+    -------
+    np.ndarray
+
+    """
+    return _grid(*_extent(x, offsets, log), mode=mode, step=step, n_points=n_points, log=log)
+
+
+def interpolate(x, y, offsets, grid, log=False, fill=np.nan):
+    """
+    linearly interpolate many datasets onto one grid in a single vectorized pass
+
+    Parameters
+    ----------
+    x, y, offsets : np.ndarray
+        as returned by `gather`
+    grid : np.ndarray
+        increasing
+    log : bool
+        interpolate in log(x), e.g. for PSD diameters
+    fill : float
+        the value of grid points outside of the x range of a dataset
+
+    Returns
+    -------
+    values : np.ndarray
+        datasets x grid points
+    mask : np.ndarray
+        True where the grid point is outside of the x range of the dataset
+
+    """
+    grid = np.asarray(grid, dtype=float)
+    n = len(offsets) - 1
+    lengths = np.diff(offsets)
+    starts = offsets[:-1]
+    if log:
+        x, grid = np.log(x), np.log(grid)
+
+    if not len(x):
+        return np.full((n, len(grid)), fill), np.ones((n, len(grid)), dtype=bool)
+
+    # the number of points of each dataset up to each grid point, from one search of all x values in the grid: a point
+    # lies at or below grid[k] when at most k grid points are smaller than it
+    position = np.searchsorted(grid, x, side="left")
+    rows = np.repeat(np.arange(n), lengths)
+    counts = np.bincount(rows * (len(grid) + 1) + position, minlength=n * (len(grid) + 1)).reshape(n, len(grid) + 1)
+    upper = np.cumsum(counts[:, :-1], axis=1)
+
+    # interpolate from the point before each grid point, the second last point for a grid point at the last x.  The
+    # slope after the last point of each dataset is 0, so datasets with a single point give that point's value.  The
+    # indices of empty datasets only need to be valid
+    steps = np.diff(x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.append(np.where(steps > 0, np.diff(y) / steps, 0.), 0.)
+    slope[offsets[1:][lengths > 0] - 1] = 0.
+    i0 = upper
+    i0 -= 1
+    np.clip(i0, 0, np.maximum(lengths - 2, 0)[:, np.newaxis], out=i0)
+    i0 += np.minimum(starts, len(x) - 1)[:, np.newaxis]
+    values = np.subtract(grid[np.newaxis, :], x[i0])
+    values *= slope[i0]
+    values += y[i0]
+
+    low = np.where(lengths > 0, x[np.minimum(starts, len(x) - 1)], np.inf)[:, np.newaxis]
+    high = np.where(lengths > 0, x[np.maximum(offsets[1:] - 1, 0)], -np.inf)[:, np.newaxis]
+    mask = (grid[np.newaxis, :] < low) | (grid[np.newaxis, :] > high)
+    values[mask] = fill
+    return values, mask
+
+
+def iter_resample(dfs, grid, x=None, y=None, chunksize=1000, log=False, fill=np.nan):
+    """
+    resample datasets onto a grid a chunk of datasets at a time, see `resample`
+
+    Yields
+    ------
+    rows : slice
+        the datasets of this chunk
+    values : np.ndarray
+    mask : np.ndarray
+
+    """
+    if not isinstance(dfs, StructuredCollection):
+        dfs = list(dfs)
+    for start in range(0, len(dfs), chunksize):
+        chunk = dfs[start:start + chunksize]
+        values, mask = interpolate(*gather(chunk, x, y), grid=grid, log=log, fill=fill)
+        yield slice(start, start + len(values)), values, mask
+
+
+def resample(dfs, x=None, y=None, grid=None, mode="union", step=None, n_points=None, log=False, fill=np.nan,
+             chunksize=None, out=None):
+    """
+    resample many datasets onto a shared x grid
+
+    Parameters
+    ----------
+    dfs : list of StructuredDataFrame or StructuredCollection
+    x : typing.Hashable, optional
+        a column label or column property name, e.g. "Q", by default the x column of each dataset
+    y : typing.Hashable, optional
+        by default the y column of each dataset
+    grid : array-like, optional
+        an explicit, increasing grid.  By default a grid is built from the data, see `make_grid`
+    mode : str
+        "union" or "intersection", for automatic grids
+    step : float, optional
+        for automatic grids, by default the smallest step of any dataset
+    n_points : int, optional
+        for automatic grids, overrides step
+    log : bool
+        a logarithmic automatic grid and interpolation in log(x), e.g. for PSD diameters
+    fill : float
+        the value of points outside of the x range of a dataset
+    chunksize : int, optional
+        resample this many datasets at a time to bound the memory of the temporaries
+    out : np.ndarray, optional
+        datasets x grid points array for the values, e.g. a `np.memmap` for collections too large for memory
+
+    Returns
+    -------
+    grid : np.ndarray
+    values : np.ndarray
+        one row per dataset
+    mask : np.ndarray
+        True for the points outside of the x range of each dataset
+
+    """
+    if not isinstance(dfs, StructuredCollection):
+        dfs = list(dfs)
+
+    if grid is None:
+        if chunksize is None:
+            gathered = gather(dfs, x, y)
+            grid = make_grid(gathered[0], gathered[2], mode, step, n_points, log)
+            values, mask = interpolate(*gathered, grid=grid, log=log, fill=fill)
+            if out is not None:
+                out[...] = values
+                values = out
+            return grid, values, mask
+        grid = _chunked_grid(dfs, x, y, chunksize, mode, step, n_points, log)
+    grid = np.asarray(grid, dtype=float)
+
+    if chunksize is None:
+        chunksize = max(len(dfs), 1)
+    values = out if out is not None else np.empty((len(dfs), len(grid)))
+    mask = np.empty((len(dfs), len(grid)), dtype=bool)
+    for rows, chunk_values, chunk_mask in iter_resample(dfs, grid, x, y, chunksize, log, fill):
+        values[rows] = chunk_values
+        mask[rows] = chunk_mask
+    return grid, values, mask
+
+
+def _chunked_grid(dfs, x, y, chunksize, mode, step, n_points, log):
+    """`make_grid` from the extents of chunks of datasets, without gathering all of them at once"""
+    lows, highs, min_step = [], [], np.inf
+    for start in range(0, len(dfs), chunksize):
+        x_values, y_values, offsets = gather(dfs[start:start + chunksize], x, y)
+        chunk_lows, chunk_highs, chunk_step = _extent(x_values, offsets, log)
+        lows.append(chunk_lows)
+        highs.append(chunk_highs)
+        min_step = min(min_step, chunk_step)
+    return _grid(np.concatenate(lows), np.concatenate(highs), min_step, mode, step, n_points, log)
@@ -1,12 +1,191 @@
 from collections import OrderedDict
 import uuid
 import typing
+import functools
 import json
 import os
+import io
+import struct
+import threading
+import contextlib
+from concurrent import futures
 
 import numpy as np
 import pandas
 from .. import util
+from .. import exceptions
+from . import decimation
+
+DFTXT_CHUNK_ROWS = 2 ** 14  # rows formatted at a time when writing .df files
+RDF_MAGIC = b"RADIERDF"  # first bytes of a binary .rdf file
+RDF_ALIGNMENT = 64  # byte alignment of the data section and of each column array in .rdf files
+RDF_DTYPE_KINDS = "biufcM"  # bool, integer, float, complex and datetime columns can be stored in .rdf files
+
+
+_propagation = threading.local()
+
+
+@contextlib.contextmanager
+def metadata_propagation(enabled=True):
+    """
+    turn the copying of metadata to the results of pandas operations on or off in this thread, e.g. off for the
+    temporary frames of an analysis loop, whose results then get the class defaults of the metadata
+
+    Parameters
+    ----------
+    enabled : bool
+
+    """
+    previous = getattr(_propagation, "enabled", True)
+    _propagation.enabled = enabled
+    try:
+        yield
+    finally:
+        _propagation.enabled = previous
+
+
+def rdf_align(offset):
+    """round a byte offset up to the .rdf alignment"""
+    return -(-offset // RDF_ALIGNMENT) * RDF_ALIGNMENT
+
+
+def _same_value(a, b):
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):  # e.g. arrays in the metadata
+        return False
+
+
+def _array_address(values):
+    return values.__array_interface__["data"][0], values.shape, values.strides
+
+
+def _data_address(series):
+    values = series.values
+    if not isinstance(values, np.ndarray):
+        return id(values)
+    return _array_address(values)
+
+
+class column_property(object):
+    """
+    a read-only property computed from columns, and optionally metadata, of a StructuredDataFrame and memoized per
+    instance, for the `_column_properties` that the visualizations read on every redraw
+
+    The cached value is reused while the index is the same object, each dependency column still points at the same
+    data and each dependency metadata value is unchanged.  The instance keeps a view of the dependency columns, so
+    with the copy-on-write of pandas >= 3 any in-place write to them copies the data and so invalidates the cache.
+    Older pandas writes in place through `.loc`, `.iat` etc. without a copy, call `clear_column_cache` after those.
+
+    Usage::
+
+        @column_property(columns=["twotheta"], metadata=["wavelength"])
+        def Q(self):
+            ...
+
+    Attributes
+    ----------
+    hits : int
+    misses : int
+        computations, including the first one
+    invalidations : int
+        computations that replaced an out of date cached value
+
+    """
+
+    def __init__(self, columns=(), metadata=(), function=None):
+        self.columns = tuple(columns)
+        self.metadata = tuple(metadata)
+        self.function = None
+        self.name = None
+        self.owner = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        if function is not None:
+            self(function)
+
+    def __call__(self, function):
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
+        return self
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.owner = owner
+        column_property_descriptors.append(self)
+
+    def _state(self, instance):
+        return (
+            instance.index,
+            [instance[column] for column in self.columns],
+            [instance.metadata.get(key) for key in self.metadata],
+        )
+
+    def _is_current(self, instance, state):
+        index, columns, metadata = state
+        if instance.index is not index:
+            return False
+        for column, held in zip(self.columns, columns):
+            if column not in instance.columns or _data_address(instance[column]) != _data_address(held):
+                return False
+        return all(_same_value(instance.metadata.get(key), value) for key, value in zip(self.metadata, metadata))
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        cache = instance.__dict__.get("_column_cache")
+        if cache is None:
+            cache = dict()
+            object.__setattr__(instance, "_column_cache", cache)
+
+        entry = cache.get(self.name)
+        if entry is not None and self._is_current(instance, entry[0]):
+            self.hits += 1
+            value = entry[1]
+        else:
+            self.misses += 1
+            if entry is not None:
+                self.invalidations += 1
+            state = self._state(instance)
+            value = self.function(instance)
+            cache[self.name] = (state, value)
+
+        if isinstance(value, (pandas.Series, pandas.DataFrame)):
+            return value.copy(deep=False)  # so that renaming the result does not change the cached value
+        return value
+
+    def __set__(self, instance, value):
+        raise AttributeError("can't set attribute {:s}".format(self.name))
+
+    def stats(self):
+        return OrderedDict((("hits", self.hits), ("misses", self.misses), ("invalidations", self.invalidations)))
+
+
+column_property_descriptors = []  # type: typing.List[column_property]
+
+
+def column_cache_stats():
+    """
+    the hit and miss counters of every `column_property`
+
+    Returns
+    -------
+    OrderedDict
+        "Class.property": OrderedDict of hits, misses and invalidations
+
+    """
+    return OrderedDict(("{:s}.{:s}".format(descriptor.owner.__name__, descriptor.name), descriptor.stats())
+                       for descriptor in column_property_descriptors)
+
+
+def reset_column_cache_stats():
+    for descriptor in column_property_descriptors:
+        descriptor.hits = descriptor.misses = descriptor.invalidations = 0
 
 
 class StructuredDataFrame(pandas.DataFrame):
@@ -77,7 +256,7 @@ class StructuredDataFrame(pandas.DataFrame):
 
     label = "StructuredDataFrame"
 
-    _metadata = "metadata"
+    _metadata = ["metadata"]
     _required_metadata = OrderedDict((
         ("name", ""),
         ("date", util.iso_date_string),  # evaluate date-now if none is provided
@@ -105,8 +284,14 @@ class StructuredDataFrame(pandas.DataFrame):
 
         """
         super(StructuredDataFrame, self).__init__(data, index, columns, dtype, copy)
-        self.metadata = OrderedDict()
-        self._uuid = None  # type: str
+        self._init_metadata(metadata)
+        if not self.is_valid():
+            raise Exception
+
+    def _init_metadata(self, metadata):
+        """set the metadata and uuid attributes, filling in defaults for the required metadata"""
+        object.__setattr__(self, "metadata", OrderedDict())
+        object.__setattr__(self, "_uuid", None)
 
         for meta_key, meta_val in self._required_metadata.items():
             val = metadata.pop(meta_key, meta_val)
@@ -116,8 +301,65 @@ class StructuredDataFrame(pandas.DataFrame):
 
         # TODO: implement json checker for metadata
         self.metadata.update(metadata)
-        if not self.is_valid():
-            raise Exception
+
+    @classmethod
+    def deferred(cls, load_data, **metadata):
+        """create an instance that holds only metadata, and loads its data on first access
+
+        The instance is a fully functional StructuredDataFrame, but the columns are not read until any attribute of
+        the underlying pandas DataFrame is first accessed.  This allows for instance browsing the metadata of many
+        large data-files without parsing their data-blocks.
+
+        Parameters
+        ----------
+        load_data : function
+            a function taking no arguments that returns a StructuredDataFrame of this class with the full data
+        metadata
+            keyword arguments specifically for the metadata.  Must be JSON compatible
+
+        Returns
+        -------
+        StructuredDataFrame
+
+        """
+        df = cls.__new__(cls)
+        df._init_metadata(metadata)
+        object.__setattr__(df, "_load_data", load_data)
+        return df
+
+    @property
+    def is_deferred(self):
+        """True if this instance was created by `deferred` and its data has not been loaded yet"""
+        return "_load_data" in self.__dict__
+
+    def _load_deferred(self):
+        """load the data of a deferred instance, metadata not present in this instance is added from the loaded one
+
+        Errors of the loader are raised as a LoaderException, never as an AttributeError that `__getattr__` would
+        hide, and the instance stays deferred so that the next access tries again
+        """
+        load_data = self.__dict__["_load_data"]
+        try:
+            df = load_data()  # type: StructuredDataFrame
+        except exceptions.RadieException:
+            raise
+        except Exception as e:
+            raise exceptions.LoaderException("could not load the data of {:}: {:}".format(
+                self.metadata.get("name"), e)) from e
+        del self.__dict__["_load_data"]
+        for key, value in df.__dict__.items():
+            if key not in ("metadata", "_uuid"):
+                object.__setattr__(self, key, value)
+        for key, value in df.metadata.items():
+            self.metadata.setdefault(key, value)
+
+    def __getattr__(self, name):
+        # only reached when normal attribute lookup fails.  The pandas internals of a deferred instance are not set
+        # until the data is loaded, so the first access of any of them triggers the load
+        if name.startswith("_") and "_load_data" in self.__dict__:
+            self._load_deferred()
+            return object.__getattribute__(self, name)
+        return super(StructuredDataFrame, self).__getattr__(name)
 
     def is_valid(self):
         """determine if the data and metadata match the specifications of the
@@ -155,7 +397,7 @@ class StructuredDataFrame(pandas.DataFrame):
     @property
     def x(self):
         if not self._x:
-            return self.ix[:, 0]
+            return self.iloc[:, 0]
         else:
             return self[self._x]
 
@@ -169,7 +411,7 @@ class StructuredDataFrame(pandas.DataFrame):
     @property
     def y(self):
         if not self._y:
-            return self.ix[:, 1]
+            return self.iloc[:, 1]
         else:
             return self[self._y]
 
@@ -186,7 +428,7 @@ class StructuredDataFrame(pandas.DataFrame):
     @property
     def z(self):
         if not self._z:
-            return self.ix[:, 2]
+            return self.iloc[:, 2]
         else:
             return self[self._z]
 
@@ -200,6 +442,113 @@ class StructuredDataFrame(pandas.DataFrame):
         else:
             return self.columns.get_loc(self._z)
 
+    def _column_array(self, position):
+        """the values of the column at a position as a read-only numpy view, without building a Series"""
+        get_column_array = getattr(self, "_get_column_array", None)  # pandas >= 1.3
+        if get_column_array is not None:
+            values = get_column_array(position)
+        else:
+            values = self.iloc[:, position].values
+        if isinstance(values, np.ndarray):
+            values = values.view()
+            values.flags.writeable = False  # a view into the dataframe, writes must go through pandas
+        return values
+
+    def array(self, key):
+        """
+        the values of a column or of a column property as a numpy array.  Columns are returned as read-only views of
+        the data without constructing a pandas Series
+
+        Parameters
+        ----------
+        key : typing.Hashable
+            a column label or the name of one of the `_column_properties`
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        if key in self._column_properties and key not in self.columns:
+            return np.asarray(getattr(self, key))
+        position = self.columns.get_loc(key)
+        if not isinstance(position, (int, np.integer)):  # duplicate labels
+            return self[key].values
+        return self._column_array(position)
+
+    def xyz_arrays(self):
+        """
+        the x, y and z values as numpy arrays, see `array`
+
+        Returns
+        -------
+        x, y, z : np.ndarray or None
+            None for y and z if the dataframe has too few columns
+
+        """
+        if self._x:
+            x = self.array(self._x)
+        else:
+            x = self._column_array(0)
+        arrays = [x]
+        for key, position in ((self._y, self.y_col), (self._z, self.z_col)):
+            if key:
+                arrays.append(self.array(key))
+            elif position is None:
+                arrays.append(None)
+            else:
+                arrays.append(self._column_array(position))
+        return tuple(arrays)
+
+    def decimate(self, n_points, method="minmax", x=None, y=None, pyramid=False):
+        """
+        a reduced copy for display that keeps the peaks and extremes of y, see `radie.structures.decimation`
+
+        Parameters
+        ----------
+        n_points : int
+            the maximum number of rows to keep
+        method : str
+            "minmax" keeps the smallest and largest y of each x interval, "lttb" the point of each x interval that
+            forms the largest triangle with its neighbours
+        x : typing.Hashable, optional
+            a column label or column property name, by default the x column
+        y : typing.Hashable, optional
+            by default the y column
+        pyramid : bool
+            build and keep precomputed decimations of this x and y at halving resolutions, so that repeated requests
+            at different resolutions only reduce the nearest level.  The pyramid is rebuilt when the columns change
+
+        Returns
+        -------
+        StructuredDataFrame
+            the kept rows in order of increasing x, rows with non-finite x are dropped
+
+        """
+        if method not in decimation.methods:
+            raise ValueError("method must be one of {:s}".format(", ".join(decimation.methods)))
+        if x is None:
+            x = self._x if self._x else self.columns[0]
+        if y is None:
+            if self.y_col is None:
+                raise ValueError("{:s} has no y column, specify y".format(type(self).__name__))
+            y = self._y if self._y else self.columns[self.y_col]
+        x_values, y_values = self.array(x), self.array(y)
+
+        if not pyramid:
+            return self.iloc[decimation.decimate_indices(x_values, y_values, n_points, method)]
+
+        # as for `column_property`, the cache keeps the source columns so that copy-on-write copies them on a write
+        sources = [self[key] if key in self.columns else x_values if key is x else y_values for key in (x, y)]
+        addresses = [_data_address(source) if isinstance(source, pandas.Series) else _array_address(source)
+                     for source in sources]
+        pyramids = self.__dict__.setdefault("_decimation_pyramids", dict())
+        cached = pyramids.get((method, x, y))
+        if cached is None or cached[0] is not self.index or cached[2] != addresses:
+            cached = (self.index, sources, addresses, decimation.DecimationPyramid(x_values, y_values, method))
+            pyramids[(method, x, y)] = cached
+        return self.iloc[cached[3].indices(n_points)]
+
     @classmethod
     def required_metadata(cls):
         return set(cls._required_metadata)
@@ -243,6 +592,12 @@ class StructuredDataFrame(pandas.DataFrame):
         """append a Loader object to this classes list of known loaders"""
         cls._loaders.append(loader)
 
+    def clear_column_cache(self):
+        """discard the memoized values of the `column_property` attributes and the decimation pyramids of this
+        instance"""
+        self.__dict__.pop("_column_cache", None)
+        self.__dict__.pop("_decimation_pyramids", None)
+
     def column_accessors(self):
         """
         return a list of 2-element tuples containing string labels and lambda
@@ -272,29 +627,56 @@ class StructuredDataFrame(pandas.DataFrame):
 
         return accessors
 
-    def savetxt(self, filename, overwrite=False):
+    def savetxt(self, filename, overwrite=False, float_format=None, chunksize=DFTXT_CHUNK_ROWS):
         """
         save an ascii version of the dataframe, with metadata included
         in comment lines above the datablock
 
+        The datablock is written directly to the file in chunks of rows, and a filename ending in .gz, .bz2 or .xz
+        (e.g. data.df.gz) is compressed on the fly
+
         Parameters
         ----------
         filename : str
         overwrite : bool
+        float_format : str or callable, optional
+            format for the float values, e.g. "%.6g", see pandas.DataFrame.to_csv
+        chunksize : int
+            the number of rows to format at a time
 
         """
-
+        compression = util.compression_extension(filename)
+        filename = filename[:len(filename) - len(compression)]
         if not filename.endswith(".df"):
             filename += ".df"
+        filename += compression
 
         if os.path.isfile(filename) and overwrite is not True:
             raise FileExistsError(
                 "You must specify overwrite to be True to overwrite the file")
 
-        with open(filename, "w") as fid:
-            fid.write(self.serialize())
+        with util.open_compressed(filename, "w") as fid:
+            self.write_txt(fid, float_format, chunksize)
+
+    def write_txt(self, fid, float_format=None, chunksize=DFTXT_CHUNK_ROWS):
+        """
+        write the ascii representation of the StructuredDataFrame to an open text file, see `savetxt`
+
+        Parameters
+        ----------
+        fid : io.TextIOBase
+        float_format : str or callable, optional
+        chunksize : int
+
+        """
+        meta = OrderedDict()
+        meta["file-type"] = "Radie txt version1"
+        meta["class"] = self.__class__.__name__
+        meta.update(self.metadata)
+        fid.write("# " + json.dumps(meta, indent=2).replace("\n", "\n# ") + "\n")
+        self.to_csv(fid, index=None, float_format=float_format, chunksize=chunksize)
 
-    def serialize(self):
+    def serialize(self, float_format=None):
         """return a string representation of the StructuredDataFrame, with metadata
             included
 
@@ -303,14 +685,97 @@ class StructuredDataFrame(pandas.DataFrame):
         str
 
         """
-        meta = OrderedDict()
-        meta["file-type"] = "Radie txt version1"
-        meta["class"] = self.__class__.__name__
-        meta.update(self.metadata)
-        meta_block = "# " + json.dumps(meta, indent=2).replace("\n", "\n# ")
-        data_block = self.to_csv(index=None)
+        buffer = io.StringIO()
+        self.write_txt(buffer, float_format)
+        return buffer.getvalue()
+
+    def save_binary(self, filename, overwrite=False):
+        """
+        save a binary version of the dataframe (.rdf) that can be read back without parsing
+
+        The file holds a json header with the class, metadata and column layout, followed by each column as a
+        contiguous little-endian array.  `radie.loaders.load_rdf` memory-maps the columns, so opening even a very
+        large file costs close to nothing and values are only read from disk as they are accessed.
 
-        return meta_block + '\n' + data_block
+        The layout of the file is the 8 byte `RDF_MAGIC`, the length of the json header as a little-endian uint64, the
+        utf-8 json header, and then the data section starting at the next multiple of `RDF_ALIGNMENT` bytes.  Column
+        offsets in the header are relative to the start of the data section.
+
+        Parameters
+        ----------
+        filename : str
+        overwrite : bool
+
+        """
+
+        if not filename.endswith(".rdf"):
+            filename += ".rdf"
+
+        if os.path.isfile(filename) and overwrite is not True:
+            raise FileExistsError(
+                "You must specify overwrite to be True to overwrite the file")
+
+        with open(filename, "wb") as fid:
+            self.write_binary(fid)
+
+    def write_binary(self, fid):
+        """
+        write the binary (.rdf) representation of the dataframe at the current position of an open file, see
+        `save_binary`.  The position must be a multiple of `RDF_ALIGNMENT` for the column arrays to be aligned
+
+        Parameters
+        ----------
+        fid : io.BufferedIOBase
+            file opened for writing in binary mode
+
+        """
+
+        def column_array(values):
+            values = np.asarray(values)
+            if values.dtype.kind not in RDF_DTYPE_KINDS:
+                raise TypeError("column of dtype {:} cannot be saved in binary format".format(values.dtype))
+            return np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+
+        def column_label(label):
+            if isinstance(label, (np.integer, int)) and not isinstance(label, bool):
+                return int(label)
+            elif isinstance(label, str):
+                return label
+            raise TypeError("only string and integer column labels can be saved in binary format")
+
+        arrays = []
+        columns = []
+        offset = 0
+        for i, label in enumerate(self.columns):
+            arr = column_array(self.iloc[:, i].values)
+            columns.append(OrderedDict((
+                ("name", column_label(label)), ("dtype", arr.dtype.str), ("offset", offset)
+            )))
+            arrays.append(arr)
+            offset = rdf_align(offset + arr.nbytes)
+
+        index = None
+        if not (isinstance(self.index, pandas.RangeIndex) and self.index.start == 0 and self.index.step == 1):
+            arr = column_array(self.index.values)
+            index = OrderedDict((("dtype", arr.dtype.str), ("offset", offset)))
+            arrays.append(arr)
+
+        header = OrderedDict()
+        header["file-type"] = "Radie binary version1"
+        header["class"] = self.__class__.__name__
+        header["metadata"] = self.metadata
+        header["length"] = len(self)
+        header["columns"] = columns
+        header["index"] = index
+        header_bytes = json.dumps(header).encode("utf-8")
+
+        fid.write(RDF_MAGIC)
+        fid.write(struct.pack("<Q", len(header_bytes)))
+        fid.write(header_bytes)
+        data_start = rdf_align(fid.tell())
+        for arr in arrays:
+            fid.write(b"\x00" * (rdf_align(fid.tell() - data_start) - (fid.tell() - data_start)))
+            fid.write(arr.view(np.uint8))
 
     @classmethod
     def from_clipboard(cls, *args, **kwargs):
@@ -321,9 +786,156 @@ class StructuredDataFrame(pandas.DataFrame):
 
     @property
     def _constructor(self):
-        return self.__class__
+        """the factory pandas calls for the results of operations, e.g. dropna and transpose, which skips __init__ like
+        `_constructor_from_mgr`"""
+        return functools.partial(_construct_result, self.__class__)
+
+    @classmethod
+    def _metadata_defaults(cls):
+        """the required metadata with its default values, without evaluating defaults that are functions (the date)"""
+        template = cls.__dict__.get("_metadata_template")
+        if template is None:
+            template = OrderedDict((key, None if callable(value) else value)
+                                   for key, value in cls._required_metadata.items())
+            cls._metadata_template = template
+        return template.copy()
+
+    def _constructor_from_mgr(self, mgr, axes):
+        """the fast path of pandas >= 2.1 for the results of operations, which skips __init__ with its validation and
+        date stamp.  The metadata is filled in by `__finalize__`.  Results without the required columns are plain
+        DataFrames"""
+        df = self.__class__._from_mgr(mgr, axes=axes)
+        if not self.required_columns().issubset(df.columns):
+            return pandas.DataFrame._from_mgr(mgr, axes=axes)
+        object.__setattr__(df, "metadata", self._metadata_defaults())
+        object.__setattr__(df, "_uuid", None)
+        return df
+
+    def __finalize__(self, other, method=None, **kwargs):
+        """copy the metadata of the StructuredDataFrame an operation was applied to, see `metadata_propagation`
+
+        Results of concat and merge take the metadata of the first StructuredDataFrame among the inputs.  Each result
+        gets its own copy of the metadata and no uuid
+        """
+        super(StructuredDataFrame, self).__finalize__(other, method=method, **kwargs)
+
+        source = other
+        if not isinstance(other, pandas.DataFrame):
+            inputs = getattr(other, "input_objs", None) or getattr(other, "objs", None) or \
+                [getattr(other, "left", None)]
+            source = next((obj for obj in inputs if isinstance(obj, StructuredDataFrame)), None)
+
+        if isinstance(source, StructuredDataFrame) and getattr(_propagation, "enabled", True):
+            object.__setattr__(self, "metadata", source.metadata.copy())
+        elif source is not None and self.__dict__.get("metadata") is source.__dict__.get("metadata"):
+            object.__setattr__(self, "metadata", self._metadata_defaults())  # not shared with the source
+        object.__setattr__(self, "_uuid", None)
+        return self
+
+    def __reduce__(self):
+        """pickle support, required for passing StructuredDataFrames between processes
+
+        pandas pickles `_metadata` attributes as a list of names, so we pickle a plain `DataFrame` of the data and
+        rebuild the instance from the class, the metadata and the uuid
+        """
+        return _unpickle, (self.__class__, pandas.DataFrame(self), dict(self.metadata), self._uuid)
 
     def rdplot(self, *args, **kwargs):
         """Subclasses may implement custom plotting functionality"""
         raise NotImplementedError(
             "only available for specific subclasses of StructuredDataFrame")
+
+
+def _construct_result(cls, *args, **kwargs):
+    """build the result of a pandas operation as `cls` without validation or date stamp, see
+    `StructuredDataFrame._constructor`.  Results without the required columns are plain DataFrames"""
+    df = pandas.DataFrame(*args, **kwargs)
+    if not cls.required_columns().issubset(df.columns):
+        return df
+    result = cls._from_mgr(df._mgr, axes=df._mgr.axes)
+    object.__setattr__(result, "metadata", cls._metadata_defaults())
+    object.__setattr__(result, "_uuid", None)
+    return result
+
+
+def _unpickle(cls, data, metadata, uuid_):
+    """rebuild a pickled StructuredDataFrame, see `StructuredDataFrame.__reduce__`"""
+    df = cls(data, **metadata)
+    df._uuid = uuid_
+    return df
+
+
+def _save_one(task):
+    """worker function for `save_many`"""
+    df, filename, binary, float_format = task  # type: StructuredDataFrame, str, bool, typing.Any
+    if binary:
+        df.save_binary(filename, overwrite=True)
+    else:
+        df.savetxt(filename, overwrite=True, float_format=float_format)
+    return filename
+
+
+def save_many(dfs, directory, workers=None, executor="process", binary=False, compression=None, float_format=None,
+              overwrite=False):
+    """
+    save many StructuredDataFrames to a directory in parallel, one file per dataframe named after metadata["name"]
+
+    Parameters
+    ----------
+    dfs : iterable of StructuredDataFrame
+    directory : str
+        created if it does not exist
+    workers : int, optional
+        the number of workers, defaults to the number of processors
+    executor : str
+        "process" for a process pool or "thread" for a thread pool
+    binary : bool
+        save binary .rdf files instead of .df text files
+    compression : str, optional
+        "gzip", "bz2" or "xz" to compress the .df files
+    float_format : str or callable, optional
+        see `StructuredDataFrame.savetxt`
+    overwrite : bool
+
+    Returns
+    -------
+    list of str
+        the filenames, in the order of dfs.  Names that occur more than once get a numeric suffix
+
+    """
+    dfs = list(dfs)
+    if binary:
+        extension = ".rdf"
+    elif compression:
+        extension = ".df" + util.COMPRESSION_EXTENSIONS[compression]
+    else:
+        extension = ".df"
+
+    os.makedirs(directory, exist_ok=True)
+    names = []
+    tasks = []
+    for df in dfs:  # type: StructuredDataFrame
+        name = util.file_name(df.metadata.get("name", "untitled"), names)
+        names.append(name)
+        filename = os.path.join(directory, name + extension)
+        if os.path.isfile(filename) and overwrite is not True:
+            raise FileExistsError("{:s} exists, you must specify overwrite to be True to overwrite files".format(
+                filename))
+        tasks.append((df, filename, binary, float_format))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+
+    if executor == "process":
+        pool_class = futures.ProcessPoolExecutor
+    elif executor == "thread":
+        pool_class = futures.ThreadPoolExecutor
+    else:
+        raise ValueError('executor must be "process" or "thread", not {:}'.format(executor))
+
+    if workers == 1:
+        return list(map(_save_one, tasks))
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with pool_class(max_workers=workers) as pool:
+        return list(pool.map(_save_one, tasks, chunksize=chunksize))
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import warnings
+
+import numpy as np
+
+from radie import archive
+from radie.structures.structureddataframe import StructuredDataFrame
+from radie.plugins.structures.powderdiffraction import PowderDiffraction
+
+
+def make_df(i):
+    return StructuredDataFrame(data={"x": np.arange(5.) + i, "y": np.arange(5.) * i}, name="df{:d}".format(i))
+
+
+def with_archive(check):
+    directory = tempfile.mkdtemp()
+    try:
+        check(os.path.join(directory, "test.rdfa"))
+    finally:
+        shutil.rmtree(directory)
+
+
+def names(fname):
+    return [entry["name"] for entry in archive.read_index(fname)]
+
+
+def test_round_trip_mixed_classes():
+    def check(fname):
+        xrd = PowderDiffraction(data={"twotheta": np.linspace(10, 80, 50), "intensity": np.random.rand(50)},
+                                name="xrd", wavelength=1.5406)
+        archive.save_archive([make_df(0), xrd], fname)
+        dfs = archive.load_archive(fname)
+        assert [type(df) for df in dfs] == [StructuredDataFrame, PowderDiffraction]
+        assert dfs[1].metadata["wavelength"] == 1.5406
+        assert np.array_equal(dfs[1]["intensity"].values, xrd["intensity"].values)
+        assert archive.load_archive(fname, select="xrd")[0].metadata["name"] == "xrd"
+    with_archive(check)
+
+
+def test_append():
+    def check(fname):
+        archive.save_archive([make_df(0)], fname)
+        for i in range(1, 4):
+            archive.append_archive([make_df(i)], fname)
+        assert names(fname) == ["df0", "df1", "df2", "df3"]
+        dfs = archive.load_archive(fname)
+        assert [df["x"].iloc[0] for df in dfs] == [0., 1., 2., 3.]
+    with_archive(check)
+
+
+def test_failed_append_leaves_archive_intact():
+    def check(fname):
+        df = make_df(0)
+        archive.save_archive([df], fname)
+        with open(fname, "rb") as fid:
+            contents = fid.read()
+
+        bad = StructuredDataFrame(data={"x": np.arange(3.), "y": ["a", "b", "c"]}, name="bad")
+        try:
+            archive.append_archive([make_df(1), bad], fname)
+        except TypeError:
+            pass
+        with open(fname, "rb") as fid:
+            assert fid.read() == contents
+        assert df.uuid is None
+
+        copy = shutil.copyfileobj
+
+        def fail(*args, **kwargs):
+            raise OSError("No space left on device")
+        shutil.copyfileobj = fail
+        try:
+            archive.append_archive([make_df(1)], fname)
+        except OSError:
+            pass
+        finally:
+            shutil.copyfileobj = copy
+        with open(fname, "rb") as fid:
+            assert fid.read() == contents
+    with_archive(check)
+
+
+def test_interrupted_append_is_ignored():
+    def check(fname):
+        archive.save_archive([make_df(0), make_df(1)], fname)
+        size = os.path.getsize(fname)
+        archive.append_archive([make_df(2), make_df(3)], fname)
+        with open(fname, "r+b") as fid:
+            fid.truncate(size + (os.path.getsize(fname) - size) // 2)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            assert names(fname) == ["df0", "df1"]
+            archive.append_archive([make_df(4)], fname)
+        assert names(fname) == ["df0", "df1", "df4"]
+        assert archive.load_archive(fname, select="df4")[0]["x"].iloc[0] == 4.
+    with_archive(check)
+
+
+if __name__ == "__main__":
+    test_round_trip_mixed_classes()
+    test_append()
+    test_failed_append_leaves_archive_intact()
+    test_interrupted_append_is_ignored()
@@ -0,0 +1,62 @@
+import os
+import glob
+import tempfile
+
+import numpy as np
+
+from radie import loaders
+from radie.structures.structureddataframe import StructuredDataFrame
+
+
+def cached_load(check):
+    with tempfile.TemporaryDirectory() as directory:
+        fname = os.path.join(directory, "data.df")
+        df = StructuredDataFrame(data={"x": np.arange(100.), "y": np.arange(100.) ** 2}, name="cached")
+        df.savetxt(fname)
+        cache = loaders.enable_cache(os.path.join(directory, "cache"))
+        try:
+            check(fname, df, cache)
+        finally:
+            loaders.disable_cache()
+
+
+def test_hit_after_store():
+    def check(fname, df, cache):
+        first = loaders.load_file(fname)
+        second = loaders.load_file(fname)
+        assert cache.stats()["hits"] == 1
+        assert np.array_equal(second["y"].values, df["y"].values)
+        assert second.metadata["name"] == first.metadata["name"]
+    cached_load(check)
+
+
+def test_truncated_entry_is_a_miss():
+    def check(fname, df, cache):
+        loaders.load_file(fname)
+        entries = glob.glob(os.path.join(cache.directory, "*.npz"))
+        assert len(entries) == 1
+        with open(entries[0], "r+b") as fid:
+            fid.truncate(os.path.getsize(entries[0]) // 2)
+
+        reloaded = loaders.load_file(fname)
+        assert np.array_equal(reloaded["y"].values, df["y"].values)
+        assert cache.stats()["hits"] == 0
+        reloaded = loaders.load_file(fname)  # stored again after the corrupt entry was removed
+        assert cache.stats()["hits"] == 1
+        assert cache.size() == os.path.getsize(entries[0])
+    cached_load(check)
+
+
+def test_replaced_entry_size():
+    def check(fname, df, cache):
+        loader = loaders.loaders[".df"][0]
+        for _ in range(5):
+            cache.put(fname, loader, df)
+        assert cache._size == cache.size()
+    cached_load(check)
+
+
+if __name__ == "__main__":
+    test_hit_after_store()
+    test_truncated_entry_is_a_miss()
+    test_replaced_entry_size()
@@ -0,0 +1,61 @@
+import numpy as np
+
+from radie.structures.collection import StructuredCollection
+from radie.plugins.structures.powderdiffraction import PowderDiffraction
+
+
+def make_patterns(lengths, seed=0):
+    rng = np.random.default_rng(seed)
+    return [PowderDiffraction(data={"twotheta": np.sort(rng.uniform(10, 80, n)), "intensity": rng.normal(size=n)},
+                              name="pattern{:d}".format(i), wavelength=1.5406 + i)
+            for i, n in enumerate(lengths)]
+
+
+def reference(df, label, reduction):
+    """a reduction of one member with numpy, NaN or -1 for empty members as `StructuredCollection.reduce`"""
+    values = df[label].values
+    if reduction == "count":
+        return len(values)
+    if not len(values):
+        return {"sum": 0., "argmin": -1, "argmax": -1}.get(reduction, np.nan)
+    return getattr(np, reduction)(values)
+
+
+def test_reductions_match_members():
+    dfs = make_patterns([5, 0, 1, 17, 3])
+    collection = StructuredCollection.from_dataframes(dfs)
+    assert len(collection) == len(dfs)
+    for label in ("twotheta", "intensity"):
+        for reduction in ("sum", "mean", "min", "max", "var", "std", "argmin", "argmax", "count"):
+            expected = np.array([reference(df, label, reduction) for df in dfs], dtype=float)
+            assert np.allclose(collection.reduce(label, reduction), expected, equal_nan=True), (label, reduction)
+
+
+def test_at_extreme():
+    dfs = make_patterns([4, 9, 0, 6])
+    collection = StructuredCollection.from_dataframes(dfs)
+    expected = [df["twotheta"].values[np.argmax(df["intensity"].values)] if len(df) else np.nan for df in dfs]
+    assert np.allclose(collection.at_extreme("twotheta", "intensity"), expected, equal_nan=True)
+
+
+def test_members_and_selections():
+    dfs = make_patterns([3, 6, 2, 5])
+    collection = StructuredCollection.from_dataframes(dfs)
+    for i, df in enumerate(dfs):
+        member = collection[i]
+        assert type(member) is PowderDiffraction
+        assert np.array_equal(member.values, df.values)
+        assert member.metadata["name"] == df.metadata["name"]
+        assert member.metadata["wavelength"] == df.metadata["wavelength"]
+
+    for selection, indices in ((collection[1:3], [1, 2]), (collection[::2], [0, 2]), (collection.take([3, 0]), [3, 0]),
+                               (collection.take(np.array([False, True, False, True])), [1, 3])):
+        assert [df.metadata["name"] for df in selection] == [dfs[i].metadata["name"] for i in indices]
+        for df, i in zip(selection, indices):
+            assert np.array_equal(df.values, dfs[i].values)
+
+
+if __name__ == "__main__":
+    test_reductions_match_members()
+    test_at_extreme()
+    test_members_and_selections()
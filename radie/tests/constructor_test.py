@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+from radie.structures.structureddataframe import StructuredDataFrame
+from radie.plugins.structures.powderdiffraction import PowderDiffraction
+
+df = PowderDiffraction(data={"twotheta": np.arange(5.), "intensity": [1., np.nan, 3., 4., 5.]},
+                       name="constructor test", wavelength=1.5406)
+sdf = StructuredDataFrame(data={"x": np.arange(3.), "y": np.arange(3.)}, name="no required columns")
+
+for label, source, result in (
+        ("dropna", df, df.dropna()),
+        ("boolean mask", df, df[df.twotheta > 1]),
+        ("transpose", sdf, sdf.T),
+        ("transpose twice", sdf, sdf.T.T),
+):
+    assert type(result) is type(source), label
+    assert result.metadata == source.metadata, label
+    assert result.metadata is not source.metadata, label
+
+# results that lost the required columns are plain DataFrames
+assert type(df.T) is pd.DataFrame
+assert type(df[["twotheta"]]) is pd.DataFrame
+print("ok")
@@ -0,0 +1,89 @@
+import os
+import tempfile
+
+from radie import loaders
+
+
+def write_csv(fname, preamble_lines=5000, rows=20000, gap_row=None, header="a,b,c"):
+    with open(fname, "w") as fid:
+        for i in range(preamble_lines):
+            fid.write("metadata line {:d}: some value\n".format(i))
+        if header:
+            fid.write(header + "\n")
+        for i in range(rows):
+            if i == gap_row:
+                fid.write("{:d},,1.0\n".format(i))  # an incomplete row inside the datablock
+            else:
+                fid.write("{:d},{:f},{:f}\n".format(i, i * 0.5, i * 0.25))
+
+
+def break_row_at_first_probe(fname):
+    """replace the data row where the backwards search from the sniffed chunk first probes with an incomplete row of
+    the same length, returns the row number"""
+    with open(fname, "rb") as fid:
+        contents = fid.read()
+    head = contents[:loaders.CSV_SMALL_FILE]
+    head = head[:head.rfind(b"\n") + 1]
+    chunk_offset = contents.index(b"\n", int(len(contents) * 0.8)) + 1
+    row_start = contents.index(b"\n", chunk_offset - len(head) - 1) + 1
+    row_end = contents.index(b"\n", row_start)
+    row = contents[row_start:row_end]
+    number = row.split(b",")[0]
+    broken = number + b",,1." + b"0" * (len(row) - len(number) - 4)
+    with open(fname, "wb") as fid:
+        fid.write(contents[:row_start] + broken + contents[row_end:])
+    return int(number)
+
+
+def check_load(break_probe=False, **kwargs):
+    with tempfile.TemporaryDirectory() as directory:
+        fname = os.path.join(directory, "data.csv")
+        write_csv(fname, **kwargs)
+        assert os.path.getsize(fname) > loaders.CSV_SMALL_FILE
+        if break_probe:
+            break_row_at_first_probe(fname)
+        return loaders.load_csv(fname)
+
+
+def test_long_preamble():
+    df = check_load()
+    assert list(df.columns) == ["a", "b", "c"]
+    assert len(df) == 20000
+    assert df["a"].iloc[0] == 0 and df["a"].iloc[-1] == 19999
+
+
+def test_gap_row_at_search_probe():
+    df = check_load(break_probe=True)
+    assert list(df.columns) == ["a", "b", "c"]
+    assert len(df) == 20000
+    assert df["b"].isna().sum() == 1
+
+
+def test_gap_row_short_preamble():
+    df = check_load(preamble_lines=5, gap_row=12478)
+    assert list(df.columns) == ["a", "b", "c"]
+    assert len(df) == 20000
+
+
+def test_gap_row_without_header():
+    df = check_load(header=None, break_probe=True)
+    assert len(df) == 20000
+
+
+def test_scan_for_run_across_blocks():
+    with tempfile.TemporaryDirectory() as directory:
+        fname = os.path.join(directory, "data.csv")
+        write_csv(fname, preamble_lines=20000, rows=200, header=None)
+        pattern = loaders.csv_run_pattern(",", [True, True, True])
+        with open(fname, "rb") as fid:
+            offset = loaders._scan_for_run(fid, "utf-8", pattern)
+            fid.seek(offset)
+            assert fid.readline() == b"0,0.000000,0.000000\n"
+
+
+if __name__ == "__main__":
+    test_long_preamble()
+    test_gap_row_at_search_probe()
+    test_gap_row_short_preamble()
+    test_gap_row_without_header()
+    test_scan_for_run_across_blocks()
@@ -0,0 +1,60 @@
+import numpy as np
+
+from radie.structures import decimation
+from radie.structures.structureddataframe import StructuredDataFrame
+
+
+def reference_minmax(x, y, n_points):
+    """the first and last point and the first smallest and largest y of each bucket of equal x width, one by one"""
+    n_buckets = (n_points - 2) // 2
+    edges = x[0] + (x[-1] - x[0]) * (np.arange(n_buckets + 1) / n_buckets)
+    kept = {0, len(x) - 1}
+    for k in range(n_buckets):
+        inside = np.flatnonzero((x >= edges[k]) & ((x < edges[k + 1]) | (k == n_buckets - 1)))
+        if len(inside) and not np.all(np.isnan(y[inside])):
+            kept.add(inside[np.nanargmin(y[inside])])
+            kept.add(inside[np.nanargmax(y[inside])])
+    return np.array(sorted(kept))
+
+
+def make_series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.cumsum(rng.exponential(size=n) * np.where(np.arange(n) < n // 3, 0.1, 1.))  # two different spacings
+    y = rng.normal(size=n)
+    y[rng.integers(0, n, 20)] = np.nan
+    return x, y
+
+
+def test_minmax_matches_reference():
+    x, y = make_series(5000)
+    for n_points in (4, 10, 101, 1000):
+        assert np.array_equal(decimation.minmax(x, y, n_points), reference_minmax(x, y, n_points)), n_points
+
+
+def test_lttb_keeps_one_point_per_bucket():
+    x, y = make_series(5000)
+    kept = decimation.lttb(x, y, 200)
+    assert len(kept) <= 200 and kept[0] == 0 and kept[-1] == len(x) - 1
+    assert np.all(np.diff(kept) > 0)
+
+
+def test_decimate_unsorted_and_pyramid():
+    x, y = make_series(20000, seed=1)
+    order = np.random.default_rng(2).permutation(len(x))
+    df = StructuredDataFrame(data={"x": x[order], "y": y[order]})
+    for n_points in (300, 1000, 256):
+        expected = reference_minmax(x, y, n_points)
+        for pyramid in (False, True):
+            reduced = df.decimate(n_points, pyramid=pyramid)
+            assert len(reduced) <= n_points
+            assert np.all(np.diff(reduced["x"].values) >= 0)
+            assert np.nanmax(reduced["y"].values) == np.nanmax(y)
+            assert np.nanmin(reduced["y"].values) == np.nanmin(y)
+            if not pyramid:
+                assert np.array_equal(reduced["x"].values, x[expected])
+
+
+if __name__ == "__main__":
+    test_minmax_matches_reference()
+    test_lttb_keeps_one_point_per_bucket()
+    test_decimate_unsorted_and_pyramid()
@@ -0,0 +1,38 @@
+import numpy as np
+
+from radie import exceptions
+from radie.structures.structureddataframe import StructuredDataFrame
+
+
+def test_deferred_load():
+    def load_data():
+        return StructuredDataFrame(data={"x": np.arange(3.), "y": np.arange(3.)}, name="loaded", extra=1)
+
+    df = StructuredDataFrame.deferred(load_data, name="deferred")
+    assert df.is_deferred
+    assert list(df.columns) == ["x", "y"]
+    assert not df.is_deferred
+    assert df.metadata["name"] == "deferred" and df.metadata["extra"] == 1
+
+
+def test_deferred_load_error_is_not_hidden():
+    attempts = []
+
+    def load_data():
+        attempts.append(1)
+        raise AttributeError("broken parser")
+
+    df = StructuredDataFrame.deferred(load_data, name="broken")
+    for attempt in range(2):  # the instance stays deferred, the next access tries again
+        try:
+            df.columns
+        except exceptions.LoaderException as e:
+            assert "broken parser" in str(e)
+        else:
+            raise AssertionError("the loader error should have been raised")
+    assert len(attempts) == 2 and df.is_deferred
+
+
+if __name__ == "__main__":
+    test_deferred_load()
+    test_deferred_load_error_is_not_hidden()
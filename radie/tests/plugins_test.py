@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import threading
+
+
+# plugin modules for the LazyRegistry tests, they register into the registry of the host module
+HOST = """
+from radie.plugins import LazyRegistry
+registry = LazyRegistry()
+imports = []
+failing = set()  # plugins that raise on import
+
+def register(key, value):
+    with registry.lock:
+        registry[key] = registry.registered(key, []) + [value]
+"""
+PLUGIN = """
+import time
+import lazy_registry_host as host
+host.imports.append(__name__)
+time.sleep({delay:f})
+if __name__ in host.failing:
+    raise ImportError(__name__)
+for key in {keys!r}:
+    host.register(key, __name__)
+"""
+
+# prints the registrations of the plugins as json, after reporting which plugin modules the import of radie imported
+REGISTRATIONS = """
+import sys, json, radie
+from radie import plugins, structures, loaders
+prefixes = (plugins.STRUCTURES_PKG + ".", plugins.LOADERS_PKG + ".")
+imported = sorted(name for name in sys.modules if name.startswith(prefixes))
+print(json.dumps({
+    "imported": imported,
+    "manifest": plugins.manifest_path(),
+    "structures": sorted(structures.structures.keys()),
+    "loaders": [[ext, [loader._load.__module__ + "." + loader._load.__name__ for loader in loaders_]]
+                for ext, loaders_ in sorted(loaders.loaders.items())],
+}))
+"""
+
+
+def registrations(home, eager=False):
+    """the registrations of the plugins in a fresh interpreter with its manifest in home"""
+    env = dict(os.environ, HOME=home, USERPROFILE=home, RADIE_EAGER_PLUGINS="1" if eager else "0")
+    output = subprocess.run([sys.executable, "-c", REGISTRATIONS], capture_output=True, text=True, check=True,
+                            env=env).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class PluginModules(object):
+    """write plugin modules to a temporary directory on sys.path, and remove them again"""
+
+    def __init__(self, **plugins):
+        self.directory = tempfile.mkdtemp()
+        self.names = ["lazy_registry_host"] + list(plugins.keys())
+        with open(os.path.join(self.directory, "lazy_registry_host.py"), "w") as fid:
+            fid.write(HOST)
+        for name, (keys, delay) in plugins.items():
+            with open(os.path.join(self.directory, name + ".py"), "w") as fid:
+                fid.write(PLUGIN.format(keys=keys, delay=delay))
+
+    def __enter__(self):
+        sys.path.insert(0, self.directory)
+        import lazy_registry_host
+        return lazy_registry_host
+
+    def __exit__(self, *args):
+        sys.path.remove(self.directory)
+        for name in self.names:
+            sys.modules.pop(name, None)
+        shutil.rmtree(self.directory)
+
+
+def test_lookup_imports_key():
+    with PluginModules(plugin_a=([".a"], 0)) as host:
+        host.registry.defer({".a": ["plugin_a"]})
+        assert host.imports == []
+        assert host.registry[".a"] == ["plugin_a"]
+        assert host.registry.pending() == []
+
+
+def test_order_independent_of_lookup_order():
+    with PluginModules(plugin_a=([".raw"], 0), plugin_b=([".raw", ".fxye"], 0)) as host:
+        host.registry.defer({".raw": ["plugin_a", "plugin_b"], ".fxye": ["plugin_b"]})
+        assert host.registry[".fxye"] == ["plugin_b"]
+        assert host.registry[".raw"] == ["plugin_a", "plugin_b"]
+
+
+def test_failed_import_stays_pending():
+    with PluginModules(plugin_a=([".a"], 0)) as host:
+        host.failing.add("plugin_a")
+        host.registry.defer({".a": ["plugin_a"]})
+        try:
+            host.registry[".a"]
+        except ImportError:
+            pass
+        else:
+            raise AssertionError("the plugin should have failed to import")
+        assert host.registry.pending() == [".a"]
+
+        host.failing.remove("plugin_a")  # the plugin imports on the next attempt
+        assert ".a" in host.registry
+        assert host.registry[".a"] == ["plugin_a"]
+
+
+def test_lookup_while_plugin_imported_directly():
+    with PluginModules(plugin_a=([".a"], 0.2)) as host:
+        host.registry.defer({".a": ["plugin_a"]})
+        results = []
+        direct = threading.Thread(target=__import__, args=("plugin_a",), daemon=True)
+        lookup = threading.Thread(target=lambda: results.append(host.registry[".a"]), daemon=True)
+        direct.start()
+        while "plugin_a" not in host.imports:
+            pass
+        lookup.start()
+        direct.join(5)
+        lookup.join(5)
+        assert not direct.is_alive() and not lookup.is_alive(), "deadlock"
+        assert results == [["plugin_a"]]
+
+
+def test_manifest_rebuild_matches_eager_import():
+    with tempfile.TemporaryDirectory() as home:
+        built = registrations(home)  # no manifest yet, every plugin is imported to build it
+        assert os.path.isfile(built["manifest"])
+        lazy = registrations(home)
+        assert lazy["imported"] == []
+        eager = registrations(home, eager=True)
+        assert eager["imported"]
+        for result in (built, lazy):
+            assert result["structures"] == eager["structures"]
+            assert result["loaders"] == eager["loaders"]
+
+
+def test_stale_manifest_is_rebuilt():
+    from radie import plugins
+
+    with tempfile.TemporaryDirectory() as home:
+        manifest_directory = plugins.manifest_directory
+        plugins.manifest_directory = home
+        try:
+            fingerprint = plugins.manifest_fingerprint()
+            assert plugins.read_manifest(fingerprint) is None
+            manifest = {"structures": {}, "loaders": {".x": ["radie.plugins.loaders.x"]}}
+            assert plugins.write_manifest(manifest, fingerprint)
+            assert plugins.read_manifest(fingerprint) == manifest
+
+            # a changed plugin file changes the fingerprint, the cached manifest no longer applies
+            name = sorted(name for name in os.listdir(plugins.loaders_dir) if name.endswith(".py"))[0]
+            plugin_file = os.path.join(plugins.loaders_dir, name)
+            stat = os.stat(plugin_file)
+            os.utime(plugin_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            try:
+                changed = plugins.manifest_fingerprint()
+            finally:
+                os.utime(plugin_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            assert changed != fingerprint
+            assert plugins.read_manifest(changed) is None
+            assert plugins.manifest_fingerprint() == fingerprint
+
+            with open(plugins.manifest_path(), "w") as fid:
+                fid.write("{not json")
+            assert plugins.read_manifest(fingerprint) is None
+            plugins.clear_manifest()
+            assert not os.path.exists(plugins.manifest_path())
+        finally:
+            plugins.manifest_directory = manifest_directory
+
+
+if __name__ == "__main__":
+    test_lookup_imports_key()
+    test_order_independent_of_lookup_order()
+    test_failed_import_stays_pending()
+    test_lookup_while_plugin_imported_directly()
+    test_manifest_rebuild_matches_eager_import()
+    test_stale_manifest_is_rebuilt()
@@ -0,0 +1,32 @@
+import numpy as np
+
+from radie.plugins.structures import powderdiffraction_profiles as profiles
+
+
+def fit_bounded_peaks(eta_low, eta_high):
+    rng = np.random.default_rng(2)
+    n = 200
+    x = np.linspace(20, 40, 400)[np.newaxis, :].repeat(n, axis=0)
+    true = np.column_stack([rng.uniform(28, 32, n), rng.uniform(0.2, 1.5, n), rng.uniform(10, 1000, n),
+                            rng.uniform(eta_low, eta_high, n), rng.uniform(0, 50, n), np.zeros(n)])
+    y = profiles.model(true, x)
+    initial = np.column_stack([true[:, 0] + 0.02, true[:, 1] * 1.2, true[:, 2] * 0.9,
+                               np.full(n, 0.5), np.zeros(n), np.zeros(n)])
+    return profiles.levenberg_marquardt(x, y, np.ones_like(y), initial)
+
+
+def test_converges_with_eta_on_upper_bound():
+    params, diagnostics = fit_bounded_peaks(1.05, 1.5)  # the best fit has eta = 1
+    assert np.all(diagnostics["status"] == "converged")
+    assert np.all(params[:, 3] == 1.)
+
+
+def test_converges_with_eta_on_lower_bound():
+    params, diagnostics = fit_bounded_peaks(-0.5, -0.05)  # the best fit has eta = 0
+    assert np.all(diagnostics["status"] == "converged")
+    assert np.all(params[:, 3] == 0.)
+
+
+if __name__ == "__main__":
+    test_converges_with_eta_on_upper_bound()
+    test_converges_with_eta_on_lower_bound()
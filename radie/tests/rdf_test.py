@@ -0,0 +1,94 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas
+
+from radie import loaders
+from radie.structures.structureddataframe import StructuredDataFrame, RDF_ALIGNMENT
+from radie.plugins.structures.powderdiffraction import PowderDiffraction
+
+
+def round_trip(df, mmap=True):
+    with tempfile.TemporaryDirectory() as directory:
+        fname = os.path.join(directory, "data.rdf")
+        df.save_binary(fname)
+        loaded = loaders.load_rdf(fname, mmap=mmap)
+        if mmap:
+            loaded = loaded.copy()  # release the memory maps before the file is removed
+        return loaded
+
+
+def assert_same(loaded, df):
+    assert type(loaded) is type(df)
+    assert list(loaded.columns) == list(df.columns)
+    for i in range(len(df.columns)):
+        assert loaded.iloc[:, i].dtype == df.iloc[:, i].dtype
+        assert np.array_equal(loaded.iloc[:, i].values, df.iloc[:, i].values, equal_nan=df.iloc[:, i].dtype.kind == "f")
+    assert np.array_equal(loaded.index.values, df.index.values)
+    assert loaded.metadata == df.metadata
+
+
+def test_single_dtype_block():
+    df = StructuredDataFrame(data={"x": np.linspace(0, 1, 101), "y": np.random.rand(101)}, name="block")
+    df.iloc[3, 1] = np.nan
+    for mmap in (True, False):
+        assert_same(round_trip(df, mmap), df)
+
+
+def test_mixed_dtypes_and_index():
+    df = StructuredDataFrame(data={
+        "float": np.random.rand(7),
+        "int": np.arange(7, dtype=np.int32) - 3,
+        "bool": np.arange(7) % 2 == 0,
+        "complex": np.arange(7) * (1 + 2j),
+        "time": pandas.date_range("2020-01-01", periods=7, freq="h").values,
+    }, index=np.arange(7) * 10, name="mixed")
+    for mmap in (True, False):
+        assert_same(round_trip(df, mmap), df)
+
+
+def test_structure_class_and_metadata():
+    df = PowderDiffraction(data={"twotheta": np.linspace(10, 80, 50), "intensity": np.random.rand(50)},
+                           name="xrd", wavelength=1.5406)
+    loaded = round_trip(df)
+    assert_same(loaded, df)
+    assert loaded.metadata["wavelength"] == 1.5406
+
+
+def test_empty():
+    df = StructuredDataFrame(data={"x": np.zeros(0), "y": np.zeros(0)}, name="empty")
+    assert_same(round_trip(df), df)
+
+
+def test_columns_are_aligned_and_load_file_detects_format():
+    df = StructuredDataFrame(data={"x": np.arange(3.), "n": np.arange(3, dtype=np.int8)}, name="aligned")
+    with tempfile.TemporaryDirectory() as directory:
+        fname = os.path.join(directory, "data.rdf")
+        df.save_binary(fname)
+        loaded = loaders.load_rdf(fname)
+        for i in range(len(df.columns)):
+            assert loaded.iloc[:, i].values.ctypes.data % RDF_ALIGNMENT == 0 or not loaded.iloc[:, i].values.size
+        del loaded
+        assert_same(loaders.load_file(fname).copy(), df)
+        assert loaders.load_rdf_metadata(fname)["name"] == "aligned"
+
+
+def test_object_column_is_refused():
+    df = StructuredDataFrame(data={"x": np.arange(3.), "y": ["a", "b", "c"]}, name="text")
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            df.save_binary(os.path.join(directory, "data.rdf"))
+        except TypeError:
+            pass
+        else:
+            raise AssertionError("object columns cannot be saved in binary format")
+
+
+if __name__ == "__main__":
+    test_single_dtype_block()
+    test_mixed_dtypes_and_index()
+    test_structure_class_and_metadata()
+    test_empty()
+    test_columns_are_aligned_and_load_file_detects_format()
+    test_object_column_is_refused()
@@ -0,0 +1,76 @@
+import numpy as np
+
+from radie.structures import resampling
+from radie.structures.collection import StructuredCollection
+from radie.structures.structureddataframe import StructuredDataFrame
+
+
+def make_dfs(seed=0):
+    """datasets with different ranges, unsorted x, a non-finite x, a single point and no points"""
+    rng = np.random.default_rng(seed)
+    dfs = []
+    for low, high, n in ((0., 10., 50), (2., 5., 20), (-3., 4., 33), (7., 12., 8)):
+        x = rng.uniform(low, high, n)
+        x[[0, -1]] = low, high
+        dfs.append(StructuredDataFrame(data={"x": x, "y": rng.normal(size=n)}))
+    dfs[2].iloc[5, 0] = np.nan
+    dfs.append(StructuredDataFrame(data={"x": [3.], "y": [1.5]}))
+    dfs.append(StructuredDataFrame(data={"x": np.zeros(0), "y": np.zeros(0)}))
+    return dfs
+
+
+def reference(df, grid, fill=np.nan, log=False):
+    """np.interp of one dataset, fill outside of its x range"""
+    x, y = df["x"].values, df["y"].values
+    finite = np.isfinite(x)
+    x, y = x[finite], y[finite]
+    order = np.argsort(x)
+    x, y = x[order], y[order]
+    if not len(x):
+        return np.full(len(grid), fill)
+    if log:
+        values = np.interp(np.log(grid), np.log(x), y)
+    else:
+        values = np.interp(grid, x, y)
+    values[(grid < x[0]) | (grid > x[-1])] = fill
+    return values
+
+
+def test_matches_np_interp():
+    dfs = make_dfs()
+    grid = np.linspace(-5, 13, 301)
+    expected = np.array([reference(df, grid, fill=-1.) for df in dfs])
+    for chunksize in (None, 2):
+        result_grid, values, mask = resampling.resample(dfs, grid=grid, fill=-1., chunksize=chunksize)
+        assert np.array_equal(result_grid, grid)
+        assert np.allclose(values, expected)
+        assert np.array_equal(mask, values == -1.)
+
+
+def test_log_interpolation():
+    dfs = [df for df in make_dfs() if len(df)]
+    for df in dfs:
+        df["x"] = np.exp(df["x"].values / 4.)
+    grid = np.geomspace(0.2, 30, 200)
+    values = resampling.resample(dfs, grid=grid, log=True)[1]
+    assert np.allclose(values, [reference(df, grid, log=True) for df in dfs], equal_nan=True)
+
+
+def test_automatic_grid_and_collection():
+    dfs = make_dfs()[:4]
+    dfs[2] = dfs[2].dropna()
+    collection = StructuredCollection.from_dataframes(dfs)
+    grid, values, mask = collection[:3].resample(n_points=101, mode="intersection")
+    assert grid[0] == 2. and grid[-1] == 4. and len(grid) == 101
+    assert not mask.any()
+    assert np.allclose(values, [reference(df, grid) for df in dfs[:3]])
+
+    grid, values, mask = resampling.resample(dfs, step=0.5)
+    assert grid[0] == -3. and np.allclose(np.diff(grid), 0.5)
+    assert np.allclose(values, [reference(df, grid) for df in dfs], equal_nan=True)
+
+
+if __name__ == "__main__":
+    test_matches_np_interp()
+    test_log_interpolation()
+    test_automatic_grid_and_collection()
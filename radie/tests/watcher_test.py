@@ -0,0 +1,35 @@
+import os
+import sys
+import struct
+import tempfile
+import subprocess
+
+from radie import watcher
+from radie.plugins.loaders import powderdiffraction_bruker_raw as bruker_raw
+
+
+def write_raw_head(fname, status):
+    with open(fname, "wb") as fid:
+        fid.write(b"RAW1.01\x00" + struct.pack("<i", status) + b"\x00" * 100)
+
+
+def test_raw_completion_check():
+    with tempfile.TemporaryDirectory() as directory:
+        fname = os.path.join(directory, "scan.raw")
+        write_raw_head(fname, bruker_raw.RAW_FILE_STATUS_ACTIVE)
+        assert not watcher.file_is_complete(fname)
+        write_raw_head(fname, 1)
+        assert watcher.file_is_complete(fname)
+        assert watcher.file_is_complete(os.path.join(directory, "no_check.csv"))
+        assert not watcher.file_is_complete(os.path.join(directory, "missing.raw"))
+
+
+def test_loader_plugin_does_not_import_watcher():
+    code = "import sys, radie; radie.loaders.loaders['.raw']; print('radie.watcher' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
+
+
+if __name__ == "__main__":
+    test_raw_completion_check()
+    test_loader_plugin_does_not_import_watcher()
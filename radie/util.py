@@ -1,7 +1,17 @@
 import re
+import os
+import gzip
+import bz2
+import lzma
+import zlib
+from collections import OrderedDict
 from datetime import datetime
 import time
 
+# compression name: file extension, for the transparently compressed file formats
+COMPRESSION_EXTENSIONS = OrderedDict((("gzip", ".gz"), ("bz2", ".bz2"), ("xz", ".xz")))
+_compressed_openers = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
 
 def excel_sheet_name(name, names_list=[], length=31):
     pattern = "[\\/\*\[\]:\?%&]+"
@@ -25,3 +35,71 @@ def iso_date_string(dtime=None):
     elif not isinstance(dtime, datetime):
         dtime = datetime.now()
     return dtime.isoformat()
+
+
+def file_name(name, names_list=(), replacement="_"):
+    """make a name safe to use as a file name, adding a numeric suffix if the name is already in names_list"""
+    clean_name = re.sub(r'[\\/:*?"<>|\x00-\x1f]+', replacement, str(name)).strip(" .") or "untitled"
+
+    if clean_name in names_list:
+        base_name = clean_name
+        i = 1
+        while clean_name in names_list:
+            clean_name = base_name + "-{:02d}".format(i)
+            i += 1
+
+    return clean_name
+
+
+def compression_extension(filename):
+    """return the compression extension of a filename (".gz", ".bz2" or ".xz"), or an empty string"""
+    ext = os.path.splitext(filename)[1].lower()
+    return ext if ext in _compressed_openers else ""
+
+
+def open_compressed(filename, mode="r"):
+    """
+    open a file, transparently compressing or decompressing gzip, bz2 and xz files as chosen by the file extension
+
+    Parameters
+    ----------
+    filename : str
+    mode : str
+        the mode as for the builtin open, text mode unless "b" is specified
+
+    Returns
+    -------
+    file object
+
+    """
+    opener = _compressed_openers.get(compression_extension(filename))
+    if opener is None:
+        return open(filename, mode)
+    if "b" not in mode and "t" not in mode:
+        mode += "t"
+    return opener(filename, mode)
+
+
+def decompress_head(head_bytes):
+    """
+    decompress as much as possible of the first bytes of a gzip, bz2 or xz compressed file
+
+    Returns
+    -------
+    bytes or None
+        the decompressed head, or None if head_bytes is not compressed in a recognized format or is corrupt
+
+    """
+    if head_bytes.startswith(b"\x1f\x8b"):
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    elif head_bytes.startswith(b"BZh"):
+        decompressor = bz2.BZ2Decompressor()
+    elif head_bytes.startswith(b"\xfd7zXZ\x00"):
+        decompressor = lzma.LZMADecompressor()
+    else:
+        return None
+
+    try:
+        return decompressor.decompress(head_bytes)
+    except (zlib.error, OSError, lzma.LZMAError, EOFError):
+        return None
@@ -0,0 +1,326 @@
+"""watch instrument output folders and load new data-files as they appear
+
+A `FolderWatcher` scans a directory at a fixed interval, or as soon as the directory changes when linux inotify is
+available, and hands new or modified files to `radie.loaders.load_file` on a pool of workers.  A file is only loaded
+once its size and modification time have stopped changing for `settle_time` seconds and the completion checks of the
+loaders for its extension, if any, agree that the instrument has finished writing it.  Loader plugins supply
+completion checks with the `completion_check` argument of `radie.loaders.Loader`, e.g. the Bruker RAW plugin checks
+the "file status" in the header of .raw files.
+
+Results are passed to a callback, or put on the `FolderWatcher.results` queue for consumers like the Qt MainWindow
+that must handle them in their own thread.
+"""
+import os
+import sys
+import time
+import fnmatch
+import functools
+import queue
+import select
+import threading
+import ctypes
+import ctypes.util
+from collections import OrderedDict
+from concurrent import futures
+
+from . import loaders
+from .structures.structureddataframe import StructuredDataFrame
+
+def file_is_complete(fname):
+    """
+    run the completion checks of the loaders for the extension of a file, skipping loaders whose probe rejects the
+    file.  Files without a check are always complete
+
+    Parameters
+    ----------
+    fname : str
+
+    Returns
+    -------
+    bool
+
+    """
+    ext = os.path.splitext(fname)[1]
+    checked = [loader for loader in loaders.loaders.get(ext, []) if loader.can_check_completion]
+    if not checked:
+        return True
+    try:
+        return all(loader.is_complete(fname) for loader in loaders.rank_loaders(checked, loaders.read_head(fname)))
+    except OSError:
+        return False
+
+
+def _load(fname, lazy):
+    """worker function for the `FolderWatcher`, return a (list of dataframes, exception) pair instead of raising"""
+    try:
+        dfs = loaders.load_file(fname, lazy=lazy)
+    except Exception as e:
+        return [], e
+    if isinstance(dfs, StructuredDataFrame):
+        dfs = [dfs]
+    return dfs, None
+
+
+class Inotify(object):
+    """minimal ctypes binding to linux inotify, used only to wake the watcher as soon as a directory changes"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    EVENTS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on linux")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.EVENTS)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), "could not watch {:s}".format(path))
+        return wd
+
+    def wait(self, timeout):
+        """block until an event arrives or the timeout expires, return True if there were events"""
+        readable = select.select([self.fd], [], [], timeout)[0]
+        if not readable:
+            return False
+        try:
+            while os.read(self.fd, 65536):  # the events are discarded, the watcher rescans the directory
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FolderWatcher(object):
+    """load the data-files that appear in a directory in the background
+
+    Attributes
+    ----------
+    directory : str
+    results : queue.Queue
+        (filename, list of StructuredDataFrame, exception or None) tuples, when no callback is given
+
+    """
+
+    def __init__(self, directory, callback=None, patterns=None, recursive=False, interval=1.0, settle_time=2.0,
+                 include_existing=False, workers=None, executor="thread", use_inotify=None, lazy=False):
+        """
+        Parameters
+        ----------
+        directory : str
+        callback : function, optional
+            called from a worker thread as callback(filename, dfs, error) for each loaded file, with dfs a list of
+            StructuredDataFrames and error None, or an empty list and the exception.  By default results are put on
+            the `results` queue
+        patterns : list of str, optional
+            fnmatch patterns of the file names to load, by default files with an extension of a registered loader
+        recursive : bool
+            also watch sub-directories
+        interval : float
+            seconds between scans of the directory
+        settle_time : float
+            seconds that the size and modification time of a file must be unchanged before it is loaded
+        include_existing : bool
+            also load the files that are in the directory when the watcher starts
+        workers : int, optional
+            the number of workers, default is the number of processors
+        executor : str
+            "thread" for a thread pool, or "process" for a process pool
+        use_inotify : bool, optional
+            wake up on inotify events instead of only at each interval, by default used when available
+        lazy : bool
+            load only the metadata up front, see `radie.loaders.load_file`.  Not supported with a process pool
+        """
+        self.directory = directory
+        self.callback = callback
+        self.patterns = patterns
+        self.recursive = recursive
+        self.interval = interval
+        self.settle_time = settle_time
+        self.include_existing = include_existing
+        self.workers = workers or os.cpu_count() or 1
+        self.use_inotify = use_inotify
+        self.lazy = lazy
+        self.results = queue.Queue()
+
+        if executor == "process":
+            if lazy:
+                raise ValueError("lazy loading is not supported with a process pool")
+            self._pool_class = futures.ProcessPoolExecutor
+        elif executor == "thread":
+            self._pool_class = futures.ThreadPoolExecutor
+        else:
+            raise ValueError('executor must be "process" or "thread", not {:}'.format(executor))
+
+        self._seen = dict()  # path: (size, mtime) of the version of the file that was loaded
+        self._pending = OrderedDict()  # path: ((size, mtime), time at which this version was first seen)
+        self._pool = None  # type: futures.Executor
+        self._inotify = None  # type: Inotify
+        self._thread = None  # type: threading.Thread
+        self._stop = threading.Event()
+
+    def matches(self, name):
+        """check if a file name should be loaded"""
+        if self.patterns is None:
+            return os.path.splitext(name)[1] in loaders.loaders
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+
+    def _directories(self):
+        directories = [self.directory]
+        if self.recursive:
+            for root, dirs, files in os.walk(self.directory):
+                directories.extend(os.path.join(root, d) for d in dirs)
+        return directories
+
+    def scan(self):
+        """
+        return the size and modification time of each matching file in the directory
+
+        Returns
+        -------
+        dict
+            path: (size, mtime_ns)
+
+        """
+        stamps = dict()
+        directories = [self.directory]
+        while directories:
+            try:
+                entries = list(os.scandir(directories.pop()))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        if self.recursive:
+                            directories.append(entry.path)
+                    elif self.matches(entry.name):
+                        stat = entry.stat()
+                        stamps[entry.path] = (stat.st_size, stat.st_mtime_ns)
+                except OSError:
+                    continue  # removed during the scan
+        return stamps
+
+    def poll(self):
+        """
+        scan the directory once and submit the files that are ready for loading.  A new or modified file must be seen
+        unchanged in two scans at least `settle_time` apart and pass its completion check
+
+        Returns
+        -------
+        list of str
+            the submitted files
+
+        """
+        now = time.monotonic()
+        stamps = self.scan()
+
+        ready = []
+        for path, stamp in stamps.items():
+            if self._seen.get(path) == stamp:
+                continue
+            pending = self._pending.get(path)
+            if pending is None or pending[0] != stamp:
+                self._pending[path] = (stamp, now)
+            elif now - pending[1] >= self.settle_time and file_is_complete(path):
+                del self._pending[path]
+                self._seen[path] = stamp
+                ready.append(path)
+
+        for path in list(self._pending.keys()):
+            if path not in stamps:
+                del self._pending[path]
+
+        for path in ready:
+            self._submit(path)
+        return ready
+
+    def _submit(self, path):
+        if self._pool is None:
+            self._pool = self._pool_class(max_workers=self.workers)
+        future = self._pool.submit(_load, path, self.lazy)
+        future.add_done_callback(functools.partial(self._deliver, path))
+
+    def _deliver(self, path, future):
+        dfs, error = future.result()
+        if self.callback is not None:
+            self.callback(path, dfs, error)
+        else:
+            self.results.put((path, dfs, error))
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll()
+            if self._inotify is not None:
+                if self._inotify.wait(self.interval):
+                    # coalesce the bursts of events from a file that is being written
+                    self._stop.wait(min(self.interval, 0.1))
+            else:
+                self._stop.wait(self.interval)
+
+    def start(self):
+        """start watching in a background thread"""
+        if self._thread is not None:
+            raise RuntimeError("the watcher is already running")
+        if not os.path.isdir(self.directory):
+            raise NotADirectoryError(self.directory)
+
+        if not self.include_existing:
+            self._seen.update(self.scan())
+
+        if self.use_inotify is not False:
+            try:
+                self._inotify = Inotify()
+                for directory in self._directories():
+                    self._inotify.add_watch(directory)
+            except OSError:
+                if self._inotify is not None:
+                    self._inotify.close()
+                self._inotify = None
+                if self.use_inotify:
+                    raise
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="radie-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """
+        stop watching
+
+        Parameters
+        ----------
+        wait : bool
+            wait for the files that are already submitted to finish loading
+
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -41,11 +41,18 @@ setup(
         'Intended Audience :: Science/Research',
         'License :: OSI Approved :: GNU General Public License v2 (GPLv2)',
         'Programming Language :: Python',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Topic :: Scientific/Engineering :: Visualization',
     ],
     keywords='data visualization',
     packages=find_packages(exclude=['contrib', 'docs', 'tests*']),
-    python_requires='>=3.5',
+    python_requires='>=3.7',
     install_requires=[
         'numpy',
         'pandas',
@@ -59,5 +66,7 @@ setup(
         'radie.plugins.visualizations': ['icons/*.svg'],
     },
     data_files=[],
-    entry_points={},
+    entry_points={
+        "console_scripts": ["radie = radie.__main__:main"],
+    },
 )